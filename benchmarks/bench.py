@@ -0,0 +1,241 @@
+"""Benchmarks for the hot paths of `dynamic_dt`.
+Times parsing, formatting, conversion and arithmetic on inputs drawn from every input class documented in the README, reporting operations per second and memory allocated per operation. Results can be written as JSON and compared against a stored baseline; the exit status is 1 if any benchmark regressed by more than the tolerance.
+A fixed reference workload that does not use dynamic_dt is timed immediately before every timing run of every benchmark, and each benchmark is recorded as the median over several runs of its speed relative to the reference it was interleaved with, together with the spread of those ratios. Interleaving cancels out drifts in the speed of the machine, and comparisons are made between these ratios, so that a baseline recorded on one machine remains meaningful on another. Each benchmark's tolerance is widened beyond the minimum given to what the measured spread of both the baseline and the current run can explain, so that noise alone does not fail the comparison.
+
+Usage (with the package importable, e.g. after `pip install -e .`):
+	python benchmarks/bench.py                             # print results, compare against benchmarks/baseline.json
+	python benchmarks/bench.py --json results.json        # also write results as JSON
+	python benchmarks/bench.py --save-baseline            # record the current results as the new baseline
+	python benchmarks/bench.py -k parse --tolerance 0.3   # only benchmarks whose name contains "parse", allowing at least 30% slowdowns
+	python benchmarks/bench.py --runs 11                  # take medians over more runs, for a tighter tolerance
+"""
+import argparse
+import fractions
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from dynamic_dt import DynamicDT, TimeDelta, get_timezone
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Fixed reference time (the README's 2024-12-08), so that relative inputs do the same work on every run
+TIMESTAMP = 1733638407
+# Inputs for `DynamicDT.parse`, one per input class documented in the README
+PARSE_INPUTS = dict(
+	iso="2024-12-08T06:13:27.7125025Z",
+	iso_offset="2024-12-08T06:13:27+05:30",
+	yyyymmdd="20240101",
+	unix="1700000000",
+	discord="<t:1672531200:F>",
+	slashed="1961/01/29",
+	bce="300-06-09 bce 6pm aqtt",
+	huge_year="-123456789/05/11",
+	named_month_tz="3 october 2016 in edt",
+	relative_tz="next thursday acdt",
+	relative_delta="2 hours before last december 22nd, utc-12",
+	nested_delta="one minute before two hours after sixty two years before three hundred and twelve thousand and seventy one nanoseconds before a million years after tomorrow",
+	lunar="the next full moon after",
+	now_offset="now+1h utc-1.5",
+	subsecond="1 yoctosecond from now",
+)
+# Inputs for `DynamicDT.parse_delta`
+DELTA_INPUTS = dict(
+	abbreviated="-14d6h56m7s +2mo",
+	words="one hundred and twenty three days",
+	huge="9876543210 years, -1 attoseconds",
+	clock="1:30:00",
+)
+
+
+# Scales a median absolute deviation to the standard deviation it estimates for normally distributed noise
+MAD_TO_STDEV = 1.4826
+# Scales the standard error of a mean to that of a median
+MEDIAN_STDERR = 1.2533
+# The number of standard errors of the difference between two medians that a slowdown must exceed to count as a regression
+SIGMAS = 3
+# Pattern matched by the reference workload
+REFERENCE_RE = re.compile(r"([0-9]{4})-([0-9]{2})")
+
+
+def reference_workload():
+	"A fixed pure-Python workload independent of dynamic_dt, exercising the same kinds of operations (Fraction arithmetic, string formatting, regex matching and dict lookups), used to calibrate for the speed of the machine."
+	total = fractions.Fraction(0)
+	table = {}
+	for i in range(1, 40):
+		total += fractions.Fraction(i, i + 1)
+		key = f"{i * 37:04d}-{i % 12 + 1:02d}"
+		table[key] = int(REFERENCE_RE.match(key).group(2)) + len(table)
+	return total, table
+
+
+def build_benchmarks():
+	"Returns a dict of benchmark names to zero-argument callables, each performing one operation."
+	benchmarks = {}
+	for name, s in PARSE_INPUTS.items():
+		benchmarks["parse_" + name] = lambda s=s: DynamicDT.parse(s, timestamp=TIMESTAMP)
+	for name, s in DELTA_INPUTS.items():
+		benchmarks["parse_delta_" + name] = lambda s=s: DynamicDT.parse_delta(s)
+	recent = DynamicDT.parse(PARSE_INPUTS["iso"])
+	huge = DynamicDT.parse(PARSE_INPUTS["now_offset"], timestamp=TIMESTAMP) + DynamicDT.parse_delta(DELTA_INPUTS["huge"])
+	bce = DynamicDT.parse(PARSE_INPUTS["bce"], timestamp=TIMESTAMP)
+	for name, dt in dict(recent=recent, huge=huge, bce=bce).items():
+		benchmarks["as_iso_" + name] = dt.as_iso
+		benchmarks["as_time_" + name] = dt.as_time
+	pacific = get_timezone("pacific")
+	benchmarks["fromtimestamp_recent"] = lambda: DynamicDT.fromtimestamp(TIMESTAMP, tz=pacific)
+	benchmarks["fromtimestamp_ancient"] = lambda: DynamicDT.fromtimestamp(-100000000000, tz=pacific)
+	later = DynamicDT.parse("now+1h", timestamp=TIMESTAMP)
+	benchmarks["sub_datetime"] = lambda: later - recent
+	benchmarks["sub_huge"] = lambda: huge - bce
+	benchmarks["sub_delta"] = lambda: later - TimeDelta(days=3, hours=4)
+	benchmarks["normalise"] = lambda: TimeDelta(years=1, months=14, days=-40, hours=30, minutes=-90, seconds=1234567).normalise()
+	return benchmarks
+
+
+def calibrate(func, min_time):
+	"Returns the number of calls to a callable that take at least `min_time` seconds."
+	func()
+	number = 1
+	while True:
+		elapsed = time_calls(func, number)
+		if elapsed >= min_time / 4:
+			break
+		number *= 4
+	return max(1, round(number * min_time / elapsed))
+
+
+def time_calls(func, number):
+	"Returns the time taken by `number` consecutive calls to a callable, in seconds."
+	t = time.perf_counter()
+	for _ in range(number):
+		func()
+	return time.perf_counter() - t
+
+
+def measure_alloc(func, calls=16):
+	"Returns the peak memory traced during one call to a callable, and the memory blocks still held after it (usually 0), each averaged over several calls."
+	tracemalloc.start()
+	try:
+		peak = blocks = 0
+		for _ in range(calls):
+			start, _ = tracemalloc.get_traced_memory()
+			tracemalloc.reset_peak()
+			before = sys.getallocatedblocks()
+			func()
+			blocks += sys.getallocatedblocks() - before
+			peak += tracemalloc.get_traced_memory()[1] - start
+	finally:
+		tracemalloc.stop()
+	return peak / calls, blocks / calls
+
+
+def measure(func, reference, reference_number, min_time=0.05, runs=7):
+	"""Times a callable against the reference workload, interleaving a timing run of the reference before each of its own.
+	Args:
+		func (Callable): The operation to time.
+		reference (Callable): The reference workload.
+		reference_number (int): The number of calls to the reference in each of its runs, as given by `calibrate`.
+		min_time (float): The minimum duration of each run, in seconds; the number of calls per run is calibrated to reach it.
+		runs (int): The number of interleaved pairs of runs.
+	Returns:
+		dict: `ops_per_sec` and `ns_per_op` (medians over the runs), `relative` (the median ratio of its rate to the reference's rate in the run before), `spread` (the relative standard deviation of those ratios, estimated from their median absolute deviation), `runs`, `alloc_bytes_per_op` and `alloc_blocks_per_op`.
+	"""
+	number = calibrate(func, min_time)
+	rates = []
+	ratios = []
+	for _ in range(runs):
+		reference_rate = reference_number / time_calls(reference, reference_number)
+		rate = number / time_calls(func, number)
+		rates.append(rate)
+		ratios.append(rate / reference_rate)
+	relative = statistics.median(ratios)
+	spread = MAD_TO_STDEV * statistics.median(abs(r - relative) for r in ratios) / relative
+	rate = statistics.median(rates)
+	peak, blocks = measure_alloc(func)
+	return dict(
+		ops_per_sec=round(rate, 1),
+		ns_per_op=round(1e9 / rate, 1),
+		relative=round(relative, 6),
+		spread=round(spread, 4),
+		runs=runs,
+		alloc_bytes_per_op=round(peak, 1),
+		alloc_blocks_per_op=round(blocks, 2),
+	)
+
+
+def allowed_slowdown(result, expected, tolerance):
+	"Returns the slowdown tolerated for one benchmark: at least `tolerance`, widened to `SIGMAS` standard errors of the difference between the baseline's and the current median, as estimated from their spreads."
+	stderr = MEDIAN_STDERR * ((result["spread"] ** 2 / result["runs"]) + (expected["spread"] ** 2 / expected["runs"])) ** 0.5
+	return max(tolerance, SIGMAS * stderr)
+
+
+def compare(results, baseline, tolerance):
+	"Returns the names of benchmarks whose speed relative to the reference workload fell by more than their allowed slowdown from the baseline's, printing a comparison table."
+	regressions = []
+	print(f"\n{'benchmark':<28} {'baseline':>10} {'current':>10} {'ratio':>7} {'allowed':>8}")
+	for name, result in results.items():
+		expected = baseline.get(name)
+		if not expected or "relative" not in expected:
+			continue
+		ratio = result["relative"] / expected["relative"]
+		allowed = allowed_slowdown(result, expected, tolerance)
+		flag = ""
+		if ratio < 1 - allowed:
+			regressions.append(name)
+			flag = "  REGRESSED"
+		print(f"{name:<28} {expected['relative']:>10.4f} {result['relative']:>10.4f} {ratio:>7.2f} {-allowed:>8.0%}{flag}")
+	return regressions
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Benchmarks for the hot paths of dynamic_dt.")
+	parser.add_argument("-k", dest="filter", default="", help="only run benchmarks whose name contains this string")
+	parser.add_argument("--json", help="write the results to this file as JSON")
+	parser.add_argument("--baseline", default=BASELINE, help="the baseline results to compare against")
+	parser.add_argument("--save-baseline", action="store_true", help="write the results to the baseline file instead of comparing")
+	parser.add_argument("--tolerance", type=float, default=0.1, help="the minimum slowdown relative to the baseline tolerated before failing, widened per benchmark to what the measured noise can explain (default 0.1)")
+	parser.add_argument("--min-time", type=float, default=0.05, help="the minimum duration of each timing run, in seconds")
+	parser.add_argument("--runs", type=int, default=7, help="the number of interleaved timing runs of each benchmark (default 7)")
+	args = parser.parse_args(argv)
+
+	reference_number = calibrate(reference_workload, args.min_time)
+	results = {}
+	print(f"{'benchmark':<28} {'ops/sec':>12} {'ns/op':>12} {'relative':>10} {'spread':>7} {'bytes/op':>10} {'blocks/op':>10}")
+	for name, func in build_benchmarks().items():
+		if args.filter not in name:
+			continue
+		results[name] = result = measure(func, reference_workload, reference_number, min_time=args.min_time, runs=args.runs)
+		print(f"{name:<28} {result['ops_per_sec']:>12,.0f} {result['ns_per_op']:>12,.0f} {result['relative']:>10.4f} {result['spread']:>7.1%} {result['alloc_bytes_per_op']:>10,.0f} {result['alloc_blocks_per_op']:>10.1f}")
+	report = dict(
+		python=platform.python_version(),
+		implementation=platform.python_implementation(),
+		machine=platform.machine(),
+		results=results,
+	)
+	if args.json:
+		with open(args.json, "w") as f:
+			json.dump(report, f, indent="\t")
+	if args.save_baseline:
+		with open(args.baseline, "w") as f:
+			json.dump(report, f, indent="\t")
+		return 0
+	if not os.path.exists(args.baseline):
+		return 0
+	with open(args.baseline) as f:
+		baseline = json.load(f)
+	if not any("relative" in result for result in baseline["results"].values()):
+		print("\nThe baseline has no measurements relative to the reference workload, so there is nothing to compare against; re-save it with --save-baseline.")
+		return 0
+	regressions = compare(results, baseline["results"], args.tolerance)
+	if regressions:
+		print(f"\n{len(regressions)} regression(s) beyond their allowed slowdown: {', '.join(regressions)}")
+		return 1
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
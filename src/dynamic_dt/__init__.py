@@ -1,10 +1,14 @@
-import copy
+import bisect
+import collections
 import datetime
 import fractions
 import functools
+import importlib
+import json
 import math
 import os
 import re
+import sys
 import time
 import dateutil
 import pytz
@@ -16,6 +20,8 @@ ERA = YEAR * ERA_YEARS
 
 num_re = re.compile(r"[+-]?([0-9]*\.)?[0-9\s]+")
 ts_re = re.compile(r"<t:[+-]?[0-9]+[^0-9]")
+# Strict ISO 8601 / RFC 3339, extended to the signed years of any length and arbitrary-precision fractions emitted by `DynamicDT.as_iso`
+iso_re = re.compile(r"([+-]?[0-9]{4,})-([0-9]{2})-([0-9]{2})(?:[Tt ]([0-9]{2}):([0-9]{2})(?::([0-9]{2})(?:[.,]([0-9]+))?)?)?(?:([Zz])|([+-])([0-9]{1,2})(?::?([0-9]{2}))?)?")
 def is_number(s):
 	"More powerful version of s.isnumeric() that accepts negatives and floats."
 	return num_re.fullmatch(s.removesuffix("."))
@@ -72,23 +78,138 @@ def parse_num(s):
 	else:
 		return round_min(fractions.Fraction(s))
 
+NUMBER_UNITS = "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen sixteen seventeen eighteen nineteen".split()
+NUMBER_TENS = "twenty thirty forty fifty sixty seventy eighty ninety".split()
+NUMBER_SCALES = "thousand million billion trillion quadrillion quintillion sextillion septillion octillion nonillion decillion".split()
+ORDINAL_UNITS = "zeroth first second third fourth fifth sixth seventh eighth ninth tenth eleventh twelfth thirteenth fourteenth fifteenth sixteenth seventeenth eighteenth nineteenth".split()
+# Maps each English number word to its value and whether it is an ordinal
+NUMBER_WORDS = {
+	**{w: (i, False) for i, w in enumerate(NUMBER_UNITS)},
+	**{w: (i, True) for i, w in enumerate(ORDINAL_UNITS)},
+	**{w: (i * 10 + 20, False) for i, w in enumerate(NUMBER_TENS)},
+	**{w[:-1] + "ieth": (i * 10 + 20, True) for i, w in enumerate(NUMBER_TENS)},
+	"hundred": (100, False),
+	"hundredth": (100, True),
+	**{w: (1000 ** (i + 1), False) for i, w in enumerate(NUMBER_SCALES)},
+	**{w + "th": (1000 ** (i + 1), True) for i, w in enumerate(NUMBER_SCALES)},
+}
+NUMBER_SIGNS = ("minus", "negative")
+ordinal_re = re.compile(r"([0-9]+)(?:st|nd|rd|th)")
+
+@functools.lru_cache(maxsize=4096)
+def _number_word_fallback(word):
+	"Looks up a word missing from `NUMBER_WORDS` with `number_parser`, which also knows other languages. Cached, as it is much slower than the table."
+	try:
+		import number_parser
+	except ImportError:
+		return
+	n = number_parser.parse_number(word)
+	if n is not None:
+		return n, False
+	n = number_parser.parse_ordinal(word)
+	if n is not None:
+		return n, True
+
+def number_word(word):
+	"Returns the value of a single number word or digit ordinal (e.g. \"twelve\", \"twentieth\", \"22nd\") and whether it is an ordinal, or None."
+	try:
+		return NUMBER_WORDS[word]
+	except KeyError:
+		pass
+	if m := ordinal_re.fullmatch(word):
+		return int(m.group(1)), True
+	if word.isalpha():
+		return _number_word_fallback(word)
+
+def match_number_words(tokens, start=0, stop=None):
+	"""Finds the longest run of tokens from `start` that reads as a number, in a single pass over them.
+	Handles scales ("three hundred and twelve thousand and seventy one"), "a" or "an" before a scale ("a million"), a leading "minus" or "negative", hyphenated words ("twenty-one"), ordinals ("twenty second", "22nd") and digits followed by scales ("5 thousand"). Adjacent numbers that cannot combine are read as consecutive digits, so "twenty twenty four" is 2024.
+	Args:
+		tokens (list[str]): The words to read.
+		start (int): The index to start reading from.
+		stop (int, optional): The index to stop reading at. Defaults to the end of `tokens`.
+	Returns:
+		tuple[number, int] | None: The value and the index one past its last token, or None if no number starts at `start`.
+	"""
+	sign = 1
+	chunks = []
+	# The completed scale groups, the part below the smallest scale so far, and that scale
+	total = current = scale = 0
+	seen = False
+	# Set after "and", "a" or a sign, when the next word must continue the number
+	pending = None
+	best = None
+	for i in range(start, len(tokens) if stop is None else stop):
+		token = tokens[i].casefold()
+		if token in NUMBER_SIGNS:
+			if i != start:
+				break
+			sign, pending = -1, "sign"
+			continue
+		if token in ("a", "an"):
+			if seen or pending == "a":
+				break
+			pending = "a"
+			continue
+		if token == "and":
+			if not seen or pending:
+				break
+			pending = "and"
+			continue
+		if num_re.fullmatch(token):
+			if seen or chunks or pending == "a":
+				break
+			current, seen, pending = parse_num(token), True, None
+			best = (sign * current, i + 1)
+			continue
+		words = token.split("-") if "-" in token[1:] and token[0].isalpha() else (token,)
+		ordinal = False
+		for word in words:
+			found = number_word(word)
+			if not found or ordinal:
+				break
+			n, ordinal = found
+			if n >= 100 and str(n).rstrip("0") == "1":
+				if not seen:
+					current = 1
+				if n == 100:
+					if current >= 100 or not current:
+						break
+					current *= n
+				elif n > scale:
+					total, current, scale = (total + current) * n, 0, n
+				elif current:
+					total, current = total + current * n, 0
+				else:
+					break
+			elif pending == "a":
+				break
+			elif not seen:
+				current = n
+			elif n < 100 and (current % 100 == 0 or n < 10 and current % 10 == 0 and current % 100 >= 20):
+				current += n
+			elif pending == "and" or not isinstance(total + current, int):
+				break
+			else:
+				chunks.append(total + current)
+				total, current, scale = 0, n, 0
+			seen, pending = True, None
+		else:
+			best = (sign * (int("".join(map(str, chunks + [total + current]))) if chunks else round_min(total + current)), i + 1)
+			if not ordinal:
+				continue
+		break
+	return best
+
 def parse_num_long(s):
 	"Parses natural language as numbers."
 	if num_re.fullmatch(s):
 		return parse_num(s)
-	import number_parser
-	s2 = number_parser.parse(s)
-	tokens = [w for w in s2.split() if w != "a"]
-	i = 0
-	while i < len(tokens) - 1:
-		left, right = tokens[i], tokens[i + 1]
-		llen, rlen = len(left.lstrip("-0")), len(right.lstrip("-0"))
-		if rlen - llen >= 2:
-			tokens[i + 1] = str(int(left) * int(right))
-			tokens.pop(i)
-			continue
-		i += 1
-	return int("".join(tokens))
+	tokens = s.split()
+	found = match_number_words(tokens)
+	if not found or found[1] < len(tokens):
+		raise ValueError(f"Invalid number: {repr(s)}")
+	return found[0]
 
 def strnum(num):
 	return str(round_min(round(num, 6)))
@@ -147,10 +268,22 @@ lunar_phases = {k: fractions.Fraction(v) for k, v in dict(
 	waning_crescent=0.875,
 ).items()}
 lunar_phase_names = {k.replace("_", " "): v for k, v in lunar_phases.items()}
+# Mean synodic month in days, and in seconds
+LUNATION = fractions.Fraction("29.5305888531")
+LUNATION_SECONDS = LUNATION * 86400
+def lunar_phase_ticks(ticks, denominator=1):
+	"Returns the lunar phase at a unix timestamp given as an integer count of `1/denominator` seconds, as an exact fraction of the cycle from new moon, using only integer arithmetic."
+	period = LUNATION_SECONDS.numerator * denominator
+	return fractions.Fraction((ticks - LUNATION_0 * denominator) * LUNATION_SECONDS.denominator % period, period)
 def get_lunar_phase(dt):
-	days = to_fraction(dt.timestamp_exact() - LUNATION_0, 86400)
-	lunations = days / fractions.Fraction("29.5305888531")
-	return lunations % 1
+	if dt.tick_denominator:
+		return lunar_phase_ticks(dt.timestamp_ticks(), dt.tick_denominator)
+	ts = dt.timestamp_exact()
+	if type(ts) is int:
+		return lunar_phase_ticks(ts)
+	if not isinstance(ts, fractions.Fraction):
+		ts = fractions.Fraction(ts)
+	return lunar_phase_ticks(ts.numerator, ts.denominator)
 def closest_lunar_phase(dt, target_phase=0, mode=None):
 	phase = get_lunar_phase(dt)
 	phase_diff = (target_phase - phase)
@@ -166,48 +299,188 @@ def closest_lunar_phase(dt, target_phase=0, mode=None):
 				phase_diff += 1
 			if phase_diff > 0.5:
 				phase_diff -= 1
-	return dt + phase_diff * fractions.Fraction("29.5305888531") * 86400
-
-TIMEZONES = {}
-# Update timezone abbreviations list using pytz
-for tz in pytz.all_timezones:
-	tzinfo = pytz.timezone(tz)
-	TIMEZONES[tz.casefold()] = tzinfo
-	if "/" in tz and not tz.startswith("Etc/"):
-		TIMEZONES[tz.rsplit("/", 1)[-1].casefold()] = tzinfo
-	if hasattr(tzinfo, "_tzinfos"):
-		temp = {}
-		for k, v in tzinfo._tzinfos.items():
-			if isinstance(k, tuple):
-				assert len(k) == 3, k
-				base, offset, name = k
-				if name != "LMT" and re.search(r"[A-Za-z]", name):
-					tzinfo2 = pytz._FixedOffset(round(base.total_seconds() / 60))
-					tzinfo2.canonical_name = name
-					temp[name.casefold()] = tzinfo2
-		for tz in temp:
-			if "st" in tz and tz.replace("st", "dt") in temp:
-				TIMEZONES[tz.replace("st", "t")] = tzinfo
-		TIMEZONES.update(temp)
-# Parse timezone abbreviations list from Wikipedia
+	return dt + phase_diff * LUNATION_SECONDS
+
 # Source: https://en.wikipedia.org/wiki/List_of_time_zone_abbreviations
-self_dir = os.path.dirname(os.path.abspath(__file__))
-rel_path = "wikipedia_data.txt"
-abs_file_path = os.path.join(self_dir, rel_path)
-with open(abs_file_path, "r", encoding="utf-8") as f:
-	timezone_abbreviations_table = f.read()
-for line in timezone_abbreviations_table.splitlines():
-	info = line.split("\t")
-	name = info[0].split("(", 1)[0].strip()
-	abb = name.casefold()
-	if len(abb) >= 3 and abb not in TIMEZONES:
-		temp = info[-1].replace("\\", "/")
-		curr = sorted([round((1 - (i[3] == "−") * 2) * (time_parse(i[4:]) if ":" in i else float(i[4:]) * 60)) for i in temp.split("/") if i.startswith("UTC")])
-		if len(curr) == 1:
-			curr = curr[0]
-		tzinfo = pytz._FixedOffset(curr)
+WIKIPEDIA_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wikipedia_data.txt")
+TIMEZONE_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "timezone_index.json")
+TIMEZONE_INDEX_FORMAT = 1
+
+def user_cache_dir() -> str:
+	"Returns the per-user cache directory of the package, following the platform's conventions (and `XDG_CACHE_HOME` where set)."
+	if os.name == "nt":
+		base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+	elif sys.platform == "darwin":
+		base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+	else:
+		base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+	return os.path.join(base, "dynamic_dt")
+
+# Where an index rebuilt at runtime is kept; the package directory itself is never written to
+TIMEZONE_CACHE_PATH = os.path.join(user_cache_dir(), "timezone_index.json")
+
+def build_timezone_index() -> dict:
+	"""Builds the timezone alias index from pytz and the Wikipedia abbreviations list.
+	Keys are casefolded names or abbreviations; values are either a pytz zone name, or a `[minutes, canonical_name]` pair describing a fixed offset.
+	"""
+	index = {}
+	# Update timezone abbreviations list using pytz
+	for tz in pytz.all_timezones:
+		tzinfo = pytz.timezone(tz)
+		index[tz.casefold()] = tz
+		if "/" in tz and not tz.startswith("Etc/"):
+			index[tz.rsplit("/", 1)[-1].casefold()] = tz
+		if hasattr(tzinfo, "_tzinfos"):
+			temp = {}
+			for k, v in tzinfo._tzinfos.items():
+				if isinstance(k, tuple):
+					assert len(k) == 3, k
+					base, offset, name = k
+					if name != "LMT" and re.search(r"[A-Za-z]", name):
+						temp[name.casefold()] = [round(base.total_seconds() / 60), name]
+			for abb in temp:
+				if "st" in abb and abb.replace("st", "dt") in temp:
+					index[abb.replace("st", "t")] = tz
+			index.update(temp)
+	# Parse timezone abbreviations list from Wikipedia
+	with open(WIKIPEDIA_DATA_PATH, "r", encoding="utf-8") as f:
+		timezone_abbreviations_table = f.read()
+	for line in timezone_abbreviations_table.splitlines():
+		info = line.split("\t")
+		name = info[0].split("(", 1)[0].strip()
+		abb = name.casefold()
+		if len(abb) >= 3 and abb not in index:
+			temp = info[-1].replace("\\", "/")
+			curr = sorted([round((1 - (i[3] == "−") * 2) * (time_parse(i[4:]) if ":" in i else float(i[4:]) * 60)) for i in temp.split("/") if i.startswith("UTC")])
+			if len(curr) == 1:
+				curr = curr[0]
+			index[abb] = [curr, name]
+	return index
+
+def save_timezone_index(index=None, path=TIMEZONE_INDEX_PATH):
+	"Writes a timezone alias index (building one if not provided) to disk, tagged with the current pytz version. The file is written to a temporary name and then moved into place, so that concurrent readers never see a partial index."
+	if index is None:
+		index = build_timezone_index()
+	data = dict(format=TIMEZONE_INDEX_FORMAT, pytz=pytz.__version__, timezones=index)
+	directory = os.path.dirname(path)
+	if directory:
+		os.makedirs(directory, exist_ok=True)
+	temp = f"{path}.{os.getpid()}.tmp"
+	try:
+		with open(temp, "w", encoding="utf-8") as f:
+			json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+		os.replace(temp, path)
+	finally:
+		if os.path.exists(temp):
+			os.remove(temp)
+	return index
+
+def load_timezone_index(path=TIMEZONE_INDEX_PATH, version=None) -> dict | None:
+	"Reads a prebuilt timezone alias index, returning None if it is missing, unreadable, of a different format, or (if `version` is given) built against a different pytz version."
+	try:
+		with open(path, "rb") as f:
+			data = json.loads(f.read())
+	except (OSError, ValueError):
+		return
+	if not isinstance(data, dict) or data.get("format") != TIMEZONE_INDEX_FORMAT or not isinstance(data.get("timezones"), dict):
+		return
+	if version is not None and data.get("pytz") != version:
+		return
+	return data["timezones"]
+
+class TimezoneRegistry(dict):
+	"""Lazily populated mapping of casefolded timezone names and abbreviations to tzinfo objects.
+	Names are looked up in the prebuilt index shipped with the package (see `build_timezone_index`), and tzinfo objects are only constructed for names that are actually requested. The index is used whatever the installed pytz version; zone names are validated when resolved, and zones added by newer pytz releases are found by their own names. Only if the index is missing or unreadable is it rebuilt, once, and cached in the user's cache directory for the installed pytz version.
+	"""
+
+	def __init__(self, path=TIMEZONE_INDEX_PATH, cache_path=TIMEZONE_CACHE_PATH):
+		super().__init__()
+		self.path = path
+		self.cache_path = cache_path
+		self.loaded = False
+		self._index = None
+		self._zone_names = None
+
+	def index(self) -> dict:
+		"Returns the raw alias index, reading (or regenerating) it on first use."
+		if self._index is None:
+			index = load_timezone_index(self.path)
+			if index is None:
+				index = load_timezone_index(self.cache_path, version=pytz.__version__)
+			if index is None:
+				index = build_timezone_index()
+				try:
+					save_timezone_index(index, path=self.cache_path)
+				except OSError:
+					pass
+			self._index = index
+		return self._index
+
+	def zone_names(self) -> dict:
+		"Returns the casefolded names of every zone known to the installed pytz, for zones missing from the index."
+		if self._zone_names is None:
+			self._zone_names = {tz.casefold(): tz for tz in pytz.all_timezones}
+		return self._zone_names
+
+	@staticmethod
+	def resolve(entry) -> datetime.tzinfo:
+		"Constructs the tzinfo object described by an index entry."
+		if isinstance(entry, str):
+			return pytz.timezone(entry)
+		minutes, name = entry
+		tzinfo = pytz._FixedOffset(minutes)
 		tzinfo.canonical_name = name
-		TIMEZONES[abb] = tzinfo
+		return tzinfo
+
+	def load(self):
+		"Resolves every entry in the index. Only needed for iteration; lookups resolve individual names on demand."
+		if self.loaded:
+			return self
+		for k in self.index():
+			try:
+				self[k]
+			except KeyError:
+				pass
+		self.loaded = True
+		return self
+
+	def __missing__(self, key):
+		entry = self.index().get(key)
+		if entry is None:
+			entry = self.zone_names()[key]
+		# Zones removed from the installed pytz raise UnknownTimeZoneError, a KeyError
+		tzinfo = self[key] = self.resolve(entry)
+		return tzinfo
+
+	def __contains__(self, key):
+		try:
+			self[key]
+		except KeyError:
+			return False
+		return True
+
+	def __iter__(self):
+		return dict.__iter__(self.load())
+
+	def __len__(self):
+		return len(self.index())
+
+	def get(self, key, default=None):
+		try:
+			return self[key]
+		except KeyError:
+			return default
+
+	def keys(self):
+		return dict.keys(self.load())
+
+	def values(self):
+		return dict.values(self.load())
+
+	def items(self):
+		return dict.items(self.load())
+
+TIMEZONES = TimezoneRegistry()
 
 def get_name(tzinfo):
 	"Gets the canonical name of a timezone where possible, returning UTC±X when ambiguous."
@@ -217,7 +490,7 @@ def get_name(tzinfo):
 		try:
 			return tzinfo.canonical_name
 		except AttributeError:
-			offset = round(tzinfo._offset.total_seconds() / 60)
+			offset = round(tzinfo.utcoffset(None).total_seconds() / 60)
 			negative, offset = offset < 0, abs(offset)
 			hours = offset / 60
 			if hours.is_integer():
@@ -228,15 +501,190 @@ def get_name(tzinfo):
 			return "UTC" + "+-"[negative] + hourdisp
 	return tzinfo.__class__.__name__
 
+# How long the current offset of a zone without a transition table is memoised for, in seconds
+OFFSET_CACHE_SECONDS = 900
+# pytz expands recurring daylight saving rules into transitions up to this year; zones whose transitions stop earlier no longer follow any
+RULE_HORIZON_YEAR = 2037
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# Years of transitions preceding the final one that an extrapolated rule must reproduce
+RULE_CHECK_YEARS = 10
+
+def rule_day(year, month, weekday, after=None) -> int:
+	"Gets the day of the month of the first given weekday on or after day `after`, or of the last one in the month if `after` is None, as in tz database rules such as `Sun>=8` and `lastSun`."
+	if after is None:
+		after = month_days(year, month) - 6
+	return after + (weekday - datetime.date(year, month, after).weekday()) % 7
+
+class OffsetTable:
+	"""The UTC offsets of a timezone over time, as parallel lists of transition timestamps, offsets in seconds and the tzinfo representing each, resolved by binary search.
+	Built from pytz's `_utc_transition_times` where available, or as a single entry for fixed-offset zones; other zones (`transitions is None`) fall back to asking the tzinfo. Instants before the first transition use the first offset, as pytz does.
+	For zones still following recurring daylight saving rules, the rules of the final year pytz has transitions for are extrapolated into a 400-year cycle starting the following year; since the Gregorian calendar repeats exactly every `ERA` seconds, any later instant resolves with one lookup into the cycle, so far-future (and era-shifted) instants get the offset their own date would have rather than that of a proxy year.
+	The current offset is memoised until the next transition or the end of the current `OFFSET_CACHE_SECONDS` bucket, whichever comes first.
+	"""
+
+	__slots__ = ("tzinfo", "transitions", "offsets", "infos", "cycle_built", "cycle_start", "cycle_transitions", "cycle_offsets", "cycle_infos", "current", "valid_from", "valid_until")
+
+	def __init__(self, tzinfo):
+		self.tzinfo = tzinfo
+		self.transitions = self.offsets = self.infos = None
+		self.cycle_built = False
+		self.cycle_start = self.cycle_transitions = self.cycle_offsets = self.cycle_infos = None
+		utc_transitions = getattr(tzinfo, "_utc_transition_times", None)
+		if utc_transitions:
+			# The first transition is at datetime.min, which stands in for the start of time
+			self.transitions = [-math.inf] + [(t - EPOCH) // datetime.timedelta(seconds=1) for t in utc_transitions[1:]]
+			self.offsets = [round(info[0].total_seconds()) for info in tzinfo._transition_info]
+			tzinfos = getattr(tzinfo, "_tzinfos", {})
+			self.infos = [tzinfos.get(info, tzinfo) for info in tzinfo._transition_info]
+		else:
+			try:
+				offset = tzinfo.utcoffset(None)
+			except Exception:
+				offset = None
+			if offset is not None:
+				self.transitions, self.offsets, self.infos = [-math.inf], [round(offset.total_seconds())], [tzinfo]
+		self.current = None
+		self.valid_from = self.valid_until = 0
+
+	def _rule_transition(self, rule, year) -> int:
+		month, after, weekday, seconds, utc, i = rule
+		day = datetime.datetime(year, month, rule_day(year, month, weekday, after))
+		return (day - EPOCH) // datetime.timedelta(seconds=1) + seconds - (0 if utc else self.offsets[i - 1])
+
+	def _find_rule(self, i, year, actual):
+		"Finds a rule, in the form of the tz database's `lastSun`/`Sun>=8` day specifiers in either local or UTC time, that reproduces the i-th transition and its counterparts in the preceding `RULE_CHECK_YEARS` years."
+		for utc in (False, True):
+			when = EPOCH + datetime.timedelta(seconds=self.transitions[i] + (0 if utc else self.offsets[i - 1]))
+			seconds = when.hour * 3600 + when.minute * 60 + when.second
+			for after in (None, *range(max(1, when.day - 6), when.day + 1)):
+				rule = (when.month, after, when.weekday(), seconds, utc, i)
+				try:
+					if all(self._rule_transition(rule, y) in actual for y in range(year - RULE_CHECK_YEARS, year + 1)):
+						return rule
+				except ValueError:
+					pass
+
+	def build_cycle(self):
+		"Extrapolates the zone's final yearly transitions into the 400-year cycle used beyond the last transition. Left empty where the zone no longer has recurring rules, or where they cannot be expressed as tz database day rules. Built on first use, since most lookups never need it."
+		self.cycle_built = True
+		last = len(self.transitions) - 1
+		if last < 2:
+			return
+		year = (EPOCH + datetime.timedelta(seconds=self.transitions[last])).year
+		if year < RULE_HORIZON_YEAR:
+			return
+		actual = set(self.transitions)
+		rules = []
+		i = last
+		while i > 0 and (EPOCH + datetime.timedelta(seconds=self.transitions[i])).year == year:
+			rule = self._find_rule(i, year, actual)
+			if not rule:
+				return
+			rules.append(rule)
+			i -= 1
+		if len(rules) < 2:
+			return
+		rules.reverse()
+		self.cycle_start = (datetime.datetime(year + 1, 1, 1) - EPOCH) // datetime.timedelta(seconds=1)
+		self.cycle_transitions, self.cycle_offsets, self.cycle_infos = [0], [self.offsets[last]], [self.infos[last]]
+		for y in range(year + 1, year + 1 + ERA_YEARS):
+			for rule in rules:
+				t = self._rule_transition(rule, y) - self.cycle_start
+				if 0 < t < ERA:
+					self.cycle_transitions.append(t)
+					self.cycle_offsets.append(self.offsets[rule[-1]])
+					self.cycle_infos.append(self.infos[rule[-1]])
+
+	def lookup(self, ts) -> tuple:
+		"Returns the offset in effect at a unix timestamp, and the tzinfo representing it. Requires `transitions`."
+		if not self.cycle_built and ts > self.transitions[-1]:
+			self.build_cycle()
+		if self.cycle_start is not None and ts >= self.cycle_start:
+			i = bisect.bisect_right(self.cycle_transitions, (ts - self.cycle_start) % ERA) - 1
+			return self.cycle_offsets[i], self.cycle_infos[i]
+		i = max(0, bisect.bisect_right(self.transitions, ts) - 1)
+		return self.offsets[i], self.infos[i]
+
+	def at(self, ts) -> int:
+		"Returns the offset in effect at a unix timestamp."
+		if self.transitions is None:
+			return round(datetime.datetime.fromtimestamp(ts, tz=self.tzinfo).utcoffset().total_seconds())
+		return self.lookup(ts)[0]
+
+	def now(self) -> int:
+		"Returns the offset currently in effect."
+		t = time.time()
+		if not self.valid_from <= t < self.valid_until:
+			bucket = t // OFFSET_CACHE_SECONDS * OFFSET_CACHE_SECONDS
+			self.valid_from, self.valid_until = bucket, bucket + OFFSET_CACHE_SECONDS
+			self.current = self.at(t)
+			if self.transitions is not None and (self.cycle_start is None or t < self.cycle_start):
+				i = max(0, bisect.bisect_right(self.transitions, t) - 1)
+				self.valid_from = max(self.valid_from, self.transitions[i])
+				if i + 1 < len(self.transitions):
+					self.valid_until = min(self.valid_until, self.transitions[i + 1])
+		return self.current
+
+OFFSET_TABLES = {}
+
+def get_offset_table(tzinfo) -> OffsetTable:
+	"Gets the (cached) `OffsetTable` of a timezone."
+	# pytz returns a separate tzinfo instance for every offset a zone has had, all sharing one transition table
+	key = tzinfo.zone if isinstance(tzinfo, pytz.tzinfo.DstTzInfo) else tzinfo
+	try:
+		return OFFSET_TABLES[key]
+	except KeyError:
+		table = OFFSET_TABLES[key] = OffsetTable(tzinfo)
+		return table
+	except TypeError:
+		# Unhashable tzinfo (e.g. dateutil zones); these have no transition table to cache anyway
+		return OffsetTable(tzinfo)
+
+def split_era(ts, tz=None) -> tuple:
+	"Converts whole unix seconds into an era shift in years (a multiple of `ERA_YEARS`) and a datetime in the years 1970-2369 showing the wall-clock time in `tz`. Zones with an `OffsetTable` are resolved from it, giving every instant the offset in effect at its own date."
+	if tz is not None:
+		if hasattr(tz, "_utc_transition_times"):
+			offset, tz = get_offset_table(tz).lookup(ts)
+		else:
+			# Fixed-offset zones need no table
+			offset = tz.utcoffset(None)
+			offset = None if offset is None else round(offset.total_seconds())
+		if offset is not None:
+			offs, wall = divmod(ts + offset, ERA)
+			return offs * ERA_YEARS, (EPOCH + datetime.timedelta(seconds=wall)).replace(tzinfo=tz)
+	offs, ts = divmod(ts, ERA)
+	return offs * ERA_YEARS, datetime.datetime.fromtimestamp(ts, tz=tz)
+
 def get_offset(tzinfo, dt=None):
-	"Gets the total offset of a timezone from UTC, in seconds."
+	"Gets the total offset of a timezone from UTC, in seconds, at the time of `dt` (which may be a `DynamicDT` of any year) or currently if omitted."
 	if tzinfo == datetime.timezone.utc:
 		return 0
 	if isinstance(tzinfo, pytz._FixedOffset):
 		return tzinfo._minutes * 60
+	if not hasattr(tzinfo, "_utc_transition_times") and (offset := tzinfo.utcoffset(None)) is not None:
+		return offset.total_seconds()
+	table = get_offset_table(tzinfo)
 	if dt:
-		return tzinfo.utcoffset(dt).total_seconds()
-	return datetime.datetime.now(tz=tzinfo).utcoffset().total_seconds()
+		if dt.tzinfo is None:
+			# Naive values are wall-clock times in the zone, which only the tzinfo itself can resolve
+			return tzinfo.utcoffset(dt._dt if isinstance(dt, DynamicDT) else dt).total_seconds()
+		ts = dt.sort_key()[0] if isinstance(dt, DynamicDT) else dt.timestamp()
+		return float(table.at(ts))
+	return float(table.now())
+
+def resolve_wall(wall, tzinfo) -> int:
+	"Converts a wall-clock time in a timezone, given as seconds since 1970-01-01 00:00 local time, to unix seconds. Times skipped by a daylight saving transition move forward by its length."
+	table = get_offset_table(tzinfo)
+	offset = table.at(wall)
+	ts = wall - offset
+	second = table.at(ts)
+	if second != offset:
+		ts = wall - second
+		if table.at(ts) != second:
+			# In a gap; keep the offset from before it
+			ts = wall - offset
+	return ts
 
 def retrieve_tz(tz):
 	"Gets a timezone from a string, retrying with the last part of the string if the first attempt fails."
@@ -268,8 +716,8 @@ def get_timezone(tz) -> pytz.BaseTzInfo:
 	for op in ("+-"):
 		try:
 			i = a.index(op)
-			v = time_parse(a[i:], default="h")
-			m += v
+			v = time_parse(a[i + 1:], default="h")
+			m += -v if op == "-" else v
 		except ValueError:
 			continue
 		else:
@@ -331,11 +779,328 @@ UNIT_YEAR = 31556925
 UNIT_MONTH = fractions.Fraction(46751, 1536)
 
 
+class DeltaGrammar:
+	"""Compiled unit vocabulary used by `DynamicDT.parse_delta`.
+	Holds the unit aliases, their conversions into `TimeDelta` fields, and the regex matching concatenated abbreviations such as "1mo3d4h30m57s". Everything is built once; use `add_unit` to extend the vocabulary.
+	"""
+
+	def __init__(self, timechecks, abbreviations, special_values, subsecond_values):
+		self.timechecks = dict(timechecks)
+		self.abbreviation_names = list(abbreviations)
+		self.special_values = dict(special_values)
+		self.subsecond_values = dict(subsecond_values)
+		self.compile()
+
+	def compile(self):
+		"Rebuilds the lookup tables and abbreviation regex from the current vocabulary."
+		self.timeunits = {u: k for k, v in self.timechecks.items() for u in v}
+		self.abbreviations = {k: self.timeunits[k] for k in self.abbreviation_names}
+		self.abbrevs = re.compile(r"^(?:[+-]?([0-9]*[.])?[0-9]+(?:" + "|".join(map(re.escape, self.abbreviations)) + "))+$")
+		# Memoised `classify_word` results, which depend on the vocabulary
+		self.word_kinds = {}
+		return self
+
+	def add_unit(self, name, aliases, abbreviations=(), base=None, multiplier=1, subsecond=None):
+		"""Registers a new unit, or extends an existing one.
+		Args:
+			name (str): The canonical unit name; must be a `TimeDelta` field unless `base` or `subsecond` is given.
+			aliases (Iterable[str]): Words that refer to this unit, e.g. ("jiffy", "jiffies").
+			abbreviations (Iterable[str]): Aliases that may also be concatenated directly after a number, e.g. "5jf".
+			base (str, optional): The `TimeDelta` field this unit is expressed in, e.g. "days" for weeks.
+			multiplier (number): How many `base` units make up one of this unit.
+			subsecond (number, optional): How many of this unit make up one second, for units smaller than a second.
+		"""
+		aliases = tuple(aliases)
+		self.timechecks[name] = self.timechecks.get(name, ()) + aliases
+		for abb in abbreviations:
+			if abb not in self.timechecks[name]:
+				self.timechecks[name] += (abb,)
+			if abb not in self.abbreviation_names:
+				self.abbreviation_names.append(abb)
+		if base is not None:
+			self.special_values[name] = (base, multiplier)
+		if subsecond is not None:
+			self.subsecond_values[name] = subsecond
+		return self.compile()
+
+	def convert(self, unit, num):
+		"Converts an amount of a unit into a `(field, amount)` pair, where field is a `TimeDelta` attribute."
+		if unit in self.special_values:
+			unit, mult = self.special_values[unit]
+			num *= mult
+		if unit in self.subsecond_values:
+			return "fraction", to_fraction(num, self.subsecond_values[unit])
+		return unit, num
+
+DELTA_GRAMMAR = DeltaGrammar(
+	timechecks={
+		"galactic years": ("gy", "galactic year", "galactic years"),
+		"megaanna": ("my", "myr", "megaannum", "megaanna"),
+		"millennia": ("ml", "ky", "millennium", "millennia"),
+		"centuries": ("c", "century", "centuries"),
+		"decades": ("dc", "decade", "decades"),
+		"years": ("y", "yr", "year", "years"),
+		"months": ("mo", "mth", "mos", "mths", "month", "months"),
+		"fortnights": ("fortnight", "fortnights"),
+		"weeks": ("w", "wk", "week", "wks", "weeks"),
+		"days": ("d", "day", "days"),
+		"hours": ("h", "hr", "hour", "hrs", "hours"),
+		"minutes": ("m", "min", "minute", "mins", "minutes"),
+		"seconds": ("s", "sec", "second", "secs", "seconds"),
+		"milliseconds": ("ms", "milli", "millisecond", "millis", "milliseconds"),
+		"microseconds": ("μ", "us", "μs", "micro", "microsecond", "micros", "microseconds"),
+		"nanoseconds": ("ns", "nano", "nanosecond", "nanos", "nanoseconds"),
+		"picoseconds": ("ps", "pico", "picosecond", "picos", "picoseconds"),
+		"femtoseconds": ("fs", "femto", "femtosecond", "femtos", "femtoseconds"),
+		"attoseconds": ("as", "atto", "attosecond", "attos", "attoseconds"),
+		"zeptoseconds": ("zs", "zepto", "zeptosecond", "zeptos", "zeptoseconds"),
+		"yoctoseconds": ("ys", "yocto", "yoctosecond", "yoctos", "yoctoseconds"),
+		"rontoseconds": ("rs", "ronto", "rontosecond", "rontos", "rontoseconds"),
+		"quectoseconds": ("qs", "quecto", "quectosecond", "quectos", "quectoseconds"),
+		"plancks": ("planck", "plancks"),
+	},
+	abbreviations=(
+		"gy",
+		"my", "myr",
+		"ml", "ky",
+		"c",
+		"dc",
+		"y", "yr",
+		"mo", "mth", "mos", "mths",
+		"w", "wk", "wks",
+		"d",
+		"h", "hr", "hrs",
+		"m", "min", "mins",
+		"s", "sec", "secs",
+		"ms",
+		"μ", "μs", "us",
+		"ns",
+		"ps",
+		"fs",
+		"as",
+		"zs",
+		"ys",
+		"rs",
+		"qs",
+	),
+	special_values={
+		"galactic years": ("years", UNIT_GALACTIC_YEAR),
+		"megaanna": ("years", 1000000),
+		"millennia": ("years", 1000),
+		"centuries": ("years", 100),
+		"decades": ("years", 10),
+		"fortnights": ("days", 14),
+		"weeks": ("days", 7),
+	},
+	subsecond_values=dict(
+		milliseconds=1e3,
+		microseconds=1e6,
+		nanoseconds=1e9,
+		picoseconds=1e12,
+		femtoseconds=1e15,
+		attoseconds=1e18,
+		zeptoseconds=1e21,
+		yoctoseconds=10 ** 24,
+		rontoseconds=10 ** 27,
+		quectoseconds=10 ** 30,
+		plancks=539 * 10 ** 42,
+	),
+)
+
+# Keywords recognised by `lex`; direction words map to whether they negate the preceding delta
+DIRECTION_WORDS = {"before": True, "ago": True, "to": True, "until": True, "till": True, "after": False, "past": False, "in": False, "from": False}
+RELATIVE_WORDS = ("last", "previous", "next", "this", "today", "tomorrow", "yesterday", "unix")
+ERA_WORDS = {"bce": "bce", "bc": "bce", "ad": "ce", "ce": "ce"}
+NUMBER_GLUE = ("a", "an", "and", *NUMBER_SIGNS)
+LUNAR_PHASE_STARTS = {k.split()[0] for k in lunar_phase_names}
+year_re = re.compile(r"[+-]?[0-9]{3,}")
+date_literal_re = re.compile(r"[+-]?[0-9]+[\-/\\.][0-9]+[\-/\\.][0-9]+")
+# Vocabulary of `match_date_words`, matching that of `dateutil.parser.parse`
+MONTH_WORDS = {name: i for i, names in enumerate((
+	("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",), ("jun", "june"),
+	("jul", "july"), ("aug", "august"), ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+), 1) for name in names}
+WEEKDAY_WORDS = {name: i for i, names in enumerate((
+	("mon", "monday"), ("tue", "tuesday"), ("wed", "wednesday"), ("thu", "thursday"), ("fri", "friday"), ("sat", "saturday"), ("sun", "sunday"),
+)) for name in names}
+MERIDIEM_WORDS = {"am": 0, "a.m.": 0, "pm": 12, "p.m.": 12}
+DATE_JUMP_WORDS = ("at", "on", "and")
+# Clock times and bare numbers, e.g. "6", "6pm", "18:00", "6:30:15.25pm"
+clock_re = re.compile(r"([0-9]{1,2})(?::([0-9]{1,2})(?::([0-9]{1,2})(?:[.,]([0-9]+))?)?)?((?i:am|pm|a\.m\.|p\.m\.))?")
+# Days of the month, e.g. "22nd", "3."
+ordinal_day_re = re.compile(r"([0-9]{1,2})(?:st|nd|rd|th|\.)")
+# Month-first numeric dates with a literal year, e.g. "12/25/2024"; `DynamicDT.parse_plan` reads year-first ones itself
+numeric_date_re = re.compile(r"([0-9]{1,2})([/.-])([0-9]{1,2})\2([0-9]{3,})")
+
+
+class Token:
+	"""A word of input classified by `lex`.
+	`kind` is one of "number", "number_word", "unit", "abbreviation", "direction", "and", "relative", "era", "lunar_phase", "discord", "date" or "word"; `value` holds the number, canonical unit, negation flag, era or lunar phase it denotes, where applicable.
+	"""
+
+	__slots__ = ("kind", "text", "value")
+
+	def __init__(self, kind, text, value=None):
+		self.kind = kind
+		self.text = text
+		self.value = value
+
+	def __repr__(self):
+		return f"{self.__class__.__name__}({self.kind!r}, {self.text!r}, {self.value!r})"
+
+	def numeric(self):
+		"Whether this token can be part of a number, as read by `match_number_words`."
+		return self.kind in ("number", "number_word") or self.text in NUMBER_GLUE
+
+def lex(s, grammar=None, shorthands=False):
+	"""Splits a string into a stream of classified `Token`s in a single pass, for `DynamicDT.parse_plan` and `DynamicDT.parse_delta` to consume.
+	Commas separate words, and two-word lunar phases ("full moon") become one token. Time units take precedence over number words, so "second" is a unit.
+	Args:
+		s (str): The string to split.
+		grammar (DeltaGrammar, optional): The unit vocabulary. Defaults to `DELTA_GRAMMAR`.
+		shorthands (bool): Whether to normalise the "now", "now+1h", "noon", "midnight" and Discord timestamp forms accepted by `DynamicDT.parse`.
+	Returns:
+		list[Token]: The tokens, in input order.
+	"""
+	grammar = grammar or DELTA_GRAMMAR
+	kinds = grammar.word_kinds
+	words = s.replace(",", " ").split()
+	tokens = []
+	i = 0
+	while i < len(words):
+		word = words[i]
+		i += 1
+		if word in LUNAR_PHASE_STARTS and i < len(words) and (phase := lunar_phase_names.get(word + " " + words[i])) is not None:
+			tokens.append(Token("lunar_phase", word + " " + words[i], phase))
+			i += 1
+			continue
+		if shorthands:
+			if word == "now":
+				continue
+			if word.startswith("now+") or word.startswith("now-"):
+				word = word[3:]
+			elif word == "noon":
+				word = "12PM"
+			elif word == "midnight":
+				word = "12AM"
+			elif ts_re.match(word):
+				word = word.split(":", 1)[-1].replace(">", ":").split(":", 1)[0]
+				tokens.append(Token("discord", word + ".0", int(word)))
+				continue
+		try:
+			kind, value = kinds[word]
+		except KeyError:
+			if len(kinds) >= 65536:
+				kinds.clear()
+			kind, value = kinds[word] = classify_word(word, grammar)
+		tokens.append(Token(kind, word, value))
+	return tokens
+
+def classify_word(word, grammar=None):
+	"Returns the `(kind, value)` of a single word, as described in `Token`."
+	grammar = grammar or DELTA_GRAMMAR
+	if word in grammar.timeunits:
+		return "unit", grammar.timeunits[word]
+	if grammar.abbrevs.fullmatch(word):
+		return "abbreviation", None
+	if num_re.fullmatch(word):
+		return "number", None
+	if date_literal_re.fullmatch(word):
+		return "date", None
+	if word in DIRECTION_WORDS:
+		return "direction", DIRECTION_WORDS[word]
+	if word == "and":
+		return "and", None
+	if word in RELATIVE_WORDS:
+		return "relative", None
+	if word in ERA_WORDS:
+		return "era", ERA_WORDS[word]
+	if found := number_word(word) or "-" in word[1:] and match_number_words((word,)):
+		return "number_word", found[0]
+	return "word", None
+
+def match_date_words(words):
+	"""Reads the date and time fields from the words `DynamicDT.parse_plan` could not otherwise interpret, e.g. "3 october", "december 22nd", "thursday 6pm" or "12/25/2024 6:30:15.25 pm", in a single pass.
+	Interprets month and weekday names, 12 and 24-hour clocks, day ordinals and numeric dates the same way as `dateutil.parser.parse`; anything ambiguous or unrecognised is left to it.
+	Args:
+		words (list[str]): The words, in input order.
+	Returns:
+		tuple[dict, int | None] | None: The fields to replace and the weekday (0 being Monday) to advance to if no day was given, or None if the words are not understood.
+	"""
+	values = {}
+	weekday = day = None
+	i = 0
+	while i < len(words):
+		word = words[i]
+		i += 1
+		if word in DATE_JUMP_WORDS or word == "of" and i < len(words) and words[i] in MONTH_WORDS:
+			# dateutil reads "of" differently after a month name ("may of 12" being in 2012)
+			continue
+		if (found := MONTH_WORDS.get(word)) is not None:
+			if "month" in values:
+				return
+			values["month"] = found
+		elif (found := WEEKDAY_WORDS.get(word)) is not None:
+			if weekday is not None:
+				return
+			weekday = found
+		elif m := clock_re.fullmatch(word):
+			hour, minute, second, fraction, meridiem = m.groups()
+			if not meridiem and i < len(words) and words[i] in MERIDIEM_WORDS:
+				meridiem = words[i]
+				i += 1
+			if minute is None and not meridiem:
+				# A bare number is the day of the month
+				if day is not None:
+					return
+				day = int(hour)
+				continue
+			hour = int(hour)
+			if "hour" in values or hour > (12 if meridiem else 23):
+				return
+			values["hour"] = hour % 12 + MERIDIEM_WORDS[meridiem.casefold()] if meridiem else hour
+			if minute is not None:
+				if int(minute) > 59:
+					return
+				values["minute"] = int(minute)
+			if second is not None:
+				if int(second) > 59:
+					return
+				values["second"] = int(second)
+				values["microsecond"] = int((fraction or "")[:6].ljust(6, "0"))
+		elif m := ordinal_day_re.fullmatch(word):
+			if day is not None:
+				return
+			day = int(m.group(1))
+		elif m := numeric_date_re.fullmatch(word):
+			if day is not None or "month" in values or "year" in values:
+				return
+			month, _, day, year = m.groups()
+			month, day = int(month), int(day)
+			if month > 12:
+				month, day = day, month
+			if month > 12:
+				return
+			values["year"] = int(year)
+			values["month"] = month
+		else:
+			return
+	if day is not None:
+		if not 1 <= day <= 31:
+			return
+		values["day"] = day
+		weekday = None
+	elif not values and weekday is None:
+		return
+	return values, weekday
+
+
 @functools.total_ordering
 class TimeDelta:
 	"Custom timedelta class that can store both exact representations of years and months, as well as timestamp deltas in seconds. Where ambiguous, a galactic year is treated as exactly 226814000 years, a year is treated as exactly 31556925 seconds, and a month is treated as 46751/1536 (30.436848958[3]) days."
 
 	__slots__ = ("years", "months", "days", "hours", "minutes", "seconds", "fraction", "_total_seconds")
+	_fields = __slots__[:7]
 
 	def __init__(self, years=0, months=0, days=0, hours=0, minutes=0, seconds=0, fraction=0, total_seconds=None, **kwargs):
 		self.years = round_frac(years)
@@ -348,13 +1113,13 @@ class TimeDelta:
 		self._total_seconds = round_frac(total_seconds) if total_seconds else None
 
 	def __repr__(self):
-		return self.__class__.__name__ + repr(tuple(getattr(self, k) for k in self.__slots__))
+		return self.__class__.__name__ + repr(tuple(getattr(self, k) for k in TimeDelta.__slots__))
 
 	def __str__(self):
 		return self.to_string()
 
 	def to_string(self, precision=9):
-		self.normalise()
+		self = self.normalise()
 		neg_years = self.years < 0
 		gy, y = divmod(abs(self.years), UNIT_GALACTIC_YEAR)
 		my, y = divmod(y, 1000000)
@@ -393,10 +1158,10 @@ class TimeDelta:
 		return " ".join(map(str, out))
 
 	def to_dict(self):
-		return {k: getattr(self, k) for k in self.__slots__ if not k.startswith("_")}
+		return dict(zip(self._fields, self._values()))
 
 	def to_short(self):
-		self.normalise()
+		self = self.normalise()
 		gy, y = divmod(abs(self.years), UNIT_GALACTIC_YEAR)
 		my, y = divmod(y, 1000000)
 		ky, y = divmod(y, 1000)
@@ -422,17 +1187,44 @@ class TimeDelta:
 			out.append("0s")
 		return "".join(map(str, out))
 
+	def _values(self) -> tuple:
+		return (self.years, self.months, self.days, self.hours, self.minutes, self.seconds, self.fraction)
+
+	@classmethod
+	def _from_values(cls, values, total_seconds=None):
+		"Cheap constructor from already-rounded field values, bypassing `__init__`."
+		self = object.__new__(cls)
+		for k, v in zip(TimeDelta._fields, values):
+			object.__setattr__(self, k, v)
+		object.__setattr__(self, "_total_seconds", total_seconds)
+		return self
+
+	def to_bytes(self) -> bytes:
+		"Encodes the delta in the compact binary format of `dynamic_dt.codec`; use `dumps_many` to encode many values into one buffer."
+		from .codec import dumps_many
+		return dumps_many((self,))
+
+	@classmethod
+	def from_bytes(cls, data):
+		"Decodes a delta encoded by `to_bytes`, from bytes or any buffer such as a `memoryview`."
+		from .codec import loads_one
+		return loads_one(data, cls)
+
+	def frozen(self):
+		"Returns an immutable, hashable `FrozenTimeDelta` with the same fields."
+		return FrozenTimeDelta._from_values(self._values(), getattr(self, "_total_seconds", None))
+
 	def negate(self):
-		for k in self.__slots__:
+		"Negates the delta in place."
+		for k in TimeDelta.__slots__:
 			v = getattr(self, k)
 			if v:
 				setattr(self, k, -v)
 		return self
 
 	def __neg__(self):
-		obj = copy.deepcopy(self)
-		obj.negate()
-		return obj
+		ts = getattr(self, "_total_seconds", None)
+		return self._from_values(tuple(-v if v else v for v in self._values()), -ts if ts else ts)
 
 	def is_negative(self):
 		return self.total_seconds() < 0
@@ -457,63 +1249,46 @@ class TimeDelta:
 		return bool(self.total_seconds())
 
 	def __add__(self, other):
-		if isinstance(other, self.__class__):
-			for k in self.__slots__:
-				setattr(self, k, getattr(self, k) + getattr(other, k))
-			return self.normalise()
+		# Operators never modify either operand
+		if isinstance(other, TimeDelta):
+			return self._from_values(tuple(a + b for a, b in zip(self._values(), other._values()))).normalise()
+		years, months, days, hours, minutes, seconds, fraction = self._values()
 		if isinstance(other, datetime.timedelta):
-			self.days += other.days
-			self.seconds += other.seconds
-			self.fraction += to_fraction(other.microseconds, 1e6)
-			self._total_seconds = None
-			return self
+			return self._from_values((years, months, days + other.days, hours, minutes, seconds + other.seconds, fraction + to_fraction(other.microseconds, 1e6)))
 		if isinstance(other, (int, float)):
-			self.seconds += other
-			return self
+			return self._from_values((years, months, days, hours, minutes, seconds + other, fraction))
 		return NotImplemented
 
 	def __sub__(self, other):
-		if isinstance(other, self.__class__):
-			for k in self.__slots__:
-				setattr(self, k, getattr(self, k) - getattr(other, k))
-			return self.normalise()
-		if isinstance(other, datetime.timedelta):
-			self.days -= other.days
-			self.seconds -= other.seconds
-			self.fraction -= to_fraction(other.microseconds, 1e6)
-			self._total_seconds = None
-			return self
-		if isinstance(other, (int, float)):
-			self.seconds -= other
-			return self
+		if isinstance(other, (TimeDelta, datetime.timedelta, int, float)):
+			return self + -other
 		return NotImplemented
 
-	def normalise(self):
-		"""
-		Normalize the date and time components of the object.
-
-		This method adjusts the years, months, days, hours, minutes, seconds, and fraction
-		attributes of the object to ensure they are within their conventional ranges.
-		For example, if the number of months exceeds 12, it will be converted into years
-		and months. Similarly, if the number of days exceeds the number of days in a month,
-		it will be converted into months and days, and so on.
-
-		If the object represents a negative duration, it will be temporarily negated for
-		normalization and then negated again to restore its original sign.
-
-		Returns:
-			self: The normalized object.
-		"""
+	def _is_normal(self, values) -> bool:
+		"Returns whether the values are already left unchanged by `normalise` (integral, within range and all of one sign); a False result only means the full normalisation has to run."
+		if not all(v >= 0 for v in values):
+			if not all(v <= 0 for v in values) or not self.is_negative():
+				return False
+			values = [-v for v in values]
+		years, months, days, hours, minutes, seconds, fraction = values
+		return type(years) is type(months) is type(days) is type(hours) is type(minutes) is type(seconds) is int and months < 12 and hours < 24 and minutes < 60 and seconds < 60 and fraction < 1
+
+	def _normal_values(self) -> tuple:
+		"Returns the normalised field values without modifying the object; see `normalise`."
+		values = self._values()
+		if self._is_normal(values):
+			return values
 		negative = self.is_negative()
 		if negative:
-			self.negate()
-		years, years_partial = divmod(self.years, 1)
-		months, months_partial = divmod(self.months + years_partial * 12, 1)
-		days, days_partial = divmod(self.days + months_partial * UNIT_MONTH, 1)
-		hours, hours_partial = divmod(self.hours + days_partial * 24, 1)
-		minutes, minutes_partial = divmod(self.minutes + hours_partial * 60, 1)
-		seconds, seconds_partial = divmod(self.seconds + minutes_partial * 60, 1)
-		fraction = self.fraction + fractions.Fraction(seconds_partial)
+			values = [-v for v in values]
+		years, months, days, hours, minutes, seconds, fraction = values
+		years, years_partial = divmod(years, 1)
+		months, months_partial = divmod(months + years_partial * 12, 1)
+		days, days_partial = divmod(days + months_partial * UNIT_MONTH, 1)
+		hours, hours_partial = divmod(hours + days_partial * 24, 1)
+		minutes, minutes_partial = divmod(minutes + hours_partial * 60, 1)
+		seconds, seconds_partial = divmod(seconds + minutes_partial * 60, 1)
+		fraction = fraction + fractions.Fraction(seconds_partial)
 		if not 0 <= fraction < 1:
 			ext, fraction = divmod(fraction, 1)
 			seconds += ext
@@ -529,16 +1304,39 @@ class TimeDelta:
 		if months not in range(0, 12):
 			ext, months = divmod(months, 12)
 			years += ext
-		modified = years != self.years or months != self.months or days != self.days or hours != self.hours or minutes != self.minutes or seconds != self.seconds or fraction != self.fraction
-		if modified:
-			self.__init__(years=years, months=months, days=days, hours=hours, minutes=minutes, seconds=seconds, fraction=fraction)
+		normal = (years, months, days, hours, minutes, seconds, fraction)
+		if normal != tuple(values):
+			values = tuple(map(round_frac, normal))
 		if negative:
-			self.negate()
+			values = tuple(-v if v else v for v in values)
+		return tuple(values)
+
+	def normalise(self):
+		"""
+		Normalize the date and time components of the object.
+
+		This method adjusts the years, months, days, hours, minutes, seconds, and fraction
+		attributes of the object to ensure they are within their conventional ranges.
+		For example, if the number of months exceeds 12, it will be converted into years
+		and months. Similarly, if the number of days exceeds the number of days in a month,
+		it will be converted into months and days, and so on.
+
+		If the object represents a negative duration, it will be temporarily negated for
+		normalization and then negated again to restore its original sign.
+
+		Returns:
+			self: The normalized object.
+		"""
+		values = self._normal_values()
+		if values != self._values():
+			for k, v in zip(self._fields, values):
+				setattr(self, k, v)
+			self._total_seconds = None
 		return self
 	normalize = normalise
 
 	def __eq__(self, other):
-		if not isinstance(other, self.__class__):
+		if not isinstance(other, TimeDelta):
 			return False
 		return self.total_seconds() == (other.total_seconds() if hasattr(other, "total_seconds") else other)
 
@@ -546,6 +1344,51 @@ class TimeDelta:
 		return self.total_seconds() < (other.total_seconds() if hasattr(other, "total_seconds") else other)
 
 
+class FrozenTimeDelta(TimeDelta):
+	"An immutable, hashable `TimeDelta`. Arithmetic, `negate` and `normalise` return new instances (or the same instance where nothing changes), so values can be shared freely, e.g. as dictionary keys or across cached parse plans."
+
+	__slots__ = ()
+
+	def __init__(self, years=0, months=0, days=0, hours=0, minutes=0, seconds=0, fraction=0, total_seconds=None, **kwargs):
+		for k, v in zip(self._fields, (years, months, days, hours, minutes, seconds, fraction)):
+			object.__setattr__(self, k, round_frac(v))
+		object.__setattr__(self, "_total_seconds", round_frac(total_seconds) if total_seconds else None)
+
+	def __setattr__(self, k, v):
+		# Private caches may still be filled in lazily
+		if not k.startswith("_"):
+			raise AttributeError(f"{self.__class__.__name__} is immutable.")
+		object.__setattr__(self, k, v)
+
+	def __delattr__(self, k):
+		raise AttributeError(f"{self.__class__.__name__} is immutable.")
+
+	def __hash__(self):
+		return hash(self.total_seconds())
+
+	def __reduce__(self):
+		return (self.__class__._from_values, (self._values(), self._total_seconds))
+
+	def __copy__(self):
+		return self
+
+	def __deepcopy__(self, memo):
+		return self
+
+	def frozen(self):
+		return self
+
+	def negate(self):
+		"Returns the negated delta."
+		return -self
+
+	def normalise(self):
+		"Returns the normalised delta; see `TimeDelta.normalise`."
+		values = self._normal_values()
+		return self if values == self._values() else self._from_values(values)
+	normalize = normalise
+
+
 class TemporaryDT:
 	"""A temporary datetime object that does not perform its own logic, but can be used to set attributes and deltas before creating a DynamicDT object. Used to intercept dateutil's parser output to apply necessary adjustments."""
 
@@ -574,6 +1417,204 @@ class TemporaryDT:
 		return self
 
 
+class ParsePlan:
+	"""The reference-time-independent interpretation of a string, as produced by `DynamicDT.parse_plan`.
+	Holds everything `DynamicDT.parse` derives from the text itself (timezone, relative mode, era, delta offset, lunar phase, and the date/time fields to replace), so that only the steps depending on the reference time and default timezone need to be recomputed by `DynamicDT.from_plan`.
+	"""
+
+	__slots__ = ("tzinfo", "mode", "direction", "offset", "moon_phase", "moon_mode", "kind", "number", "last_unit", "preset", "unspec", "replaced_units", "values", "deltas", "parsed_as")
+
+	def __init__(self):
+		self.tzinfo = None
+		self.mode = "next"
+		self.direction = None
+		self.offset = None
+		self.moon_phase = None
+		self.moon_mode = None
+		self.kind = None
+		self.number = None
+		self.last_unit = None
+		self.preset = None
+		self.unspec = False
+		self.replaced_units = ()
+		self.values = {}
+		self.deltas = ()
+		self.parsed_as = []
+
+	def __repr__(self):
+		return self.__class__.__name__ + "(" + ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__) + ")"
+
+
+class ParseCache:
+	"""Bounded LRU cache of `ParsePlan` objects used by `DynamicDT.parse`, keyed on the casefolded, whitespace-normalised input string.
+	Disabled by default (`maxsize=0`); enable it with `PARSE_CACHE.resize(n)`. The `hits`, `misses` and `evictions` counters can be used to size it.
+	"""
+
+	def __init__(self, maxsize=0):
+		self.maxsize = maxsize
+		self.plans = collections.OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def get(self, key) -> ParsePlan | None:
+		if not self.maxsize:
+			return
+		try:
+			plan = self.plans[key]
+		except KeyError:
+			self.misses += 1
+			return
+		self.plans.move_to_end(key)
+		self.hits += 1
+		return plan
+
+	def put(self, key, plan):
+		if not self.maxsize:
+			return
+		self.plans[key] = plan
+		self.plans.move_to_end(key)
+		self.evict()
+
+	def evict(self):
+		while len(self.plans) > self.maxsize:
+			self.plans.popitem(last=False)
+			self.evictions += 1
+
+	def resize(self, maxsize):
+		"Changes the maximum amount of cached plans, evicting the least recently used ones if necessary. A size of 0 disables the cache."
+		self.maxsize = maxsize
+		self.evict()
+		return self
+
+	def clear(self):
+		"Removes all cached plans and resets the counters."
+		self.plans.clear()
+		self.hits = self.misses = self.evictions = 0
+		return self
+
+	def info(self) -> dict:
+		return dict(hits=self.hits, misses=self.misses, evictions=self.evictions, size=len(self.plans), maxsize=self.maxsize)
+
+	def __len__(self):
+		return len(self.plans)
+
+PARSE_CACHE = ParseCache()
+
+
+class ParseStage:
+	"Aggregated timings of one stage of `DynamicDT.parse`, as collected by `ParseProfiler`."
+
+	__slots__ = ("count", "total", "min", "max", "buckets")
+
+	def __init__(self):
+		self.count = 0
+		self.total = 0
+		self.min = None
+		self.max = 0
+		# Bucket i counts durations of i bits, i.e. between 2 ** (i - 1) and 2 ** i - 1 nanoseconds
+		self.buckets = [0] * 64
+
+	def add(self, ns):
+		self.count += 1
+		self.total += ns
+		if self.min is None or ns < self.min:
+			self.min = ns
+		if ns > self.max:
+			self.max = ns
+		self.buckets[min(ns.bit_length(), 63)] += 1
+
+	def percentile(self, q) -> int:
+		"Returns an upper bound for the given percentile (0-100) of the durations, in nanoseconds, accurate to the histogram's power-of-two buckets."
+		target = self.count * q / 100
+		seen = 0
+		for i, n in enumerate(self.buckets):
+			seen += n
+			if n and seen >= target:
+				return min(2 ** i - 1, self.max)
+		return self.max
+
+	def to_dict(self) -> dict:
+		return dict(
+			count=self.count,
+			total_ns=self.total,
+			mean_ns=self.total / self.count if self.count else 0,
+			min_ns=self.min or 0,
+			max_ns=self.max,
+			p50_ns=self.percentile(50),
+			p90_ns=self.percentile(90),
+			p99_ns=self.percentile(99),
+			histogram=[(2 ** i - 1, n) for i, n in enumerate(self.buckets) if n],
+		)
+
+
+class ParseProfiler:
+	"""Opt-in per-stage profiling of `DynamicDT.parse`, recording wall time and call counts across many parses.
+	Install one globally as `PARSE_PROFILER`, either with `install()` or as a context manager (`with ParseProfiler() as profiler: ...`); while none is installed, each stage only checks the global. The stages are:
+	- "parse": the whole of `parse`, and "iso": its ISO 8601 fast path.
+	- "plan": obtaining a `ParsePlan` via `PARSE_CACHE`, including the following stages of `parse_plan` on a miss:
+		"lex", "lunar" (lunar phase scan), "keywords" (relative keywords and eras), "timezone" (the first/last token search), "delta" (`parse_delta`), "number_words", "value" (numbers, literal dates and `match_date_words`) and "dateutil" (`dateutil.parser.parse`, for the forms `match_date_words` leaves to it).
+	- The stages of `from_plan`: "reference" (the reference time), "construct" (building the value of non-relative plans), "relative" (applying relative values and "last"/"next" modes), "lunar_phase" (finding the requested lunar phase) and "offset" (applying deltas and eras).
+	Durations are aggregated into power-of-two histograms per stage, so memory use does not grow with the number of parses. Not thread-safe; concurrent parses will interleave their records.
+	"""
+
+	__slots__ = ("stages", "previous")
+
+	def __init__(self):
+		self.stages = {}
+		self.previous = None
+
+	def record(self, stage, start) -> int:
+		"Records the time elapsed since `start` (a `time.perf_counter_ns` value) against a stage, returning the current time so that consecutive stages can be chained."
+		now = time.perf_counter_ns()
+		try:
+			entry = self.stages[stage]
+		except KeyError:
+			entry = self.stages[stage] = ParseStage()
+		entry.add(now - start)
+		return now
+
+	def install(self):
+		"Makes this the active profiler, until `uninstall` is called."
+		global PARSE_PROFILER
+		self.previous, PARSE_PROFILER = PARSE_PROFILER, self
+		return self
+
+	def uninstall(self):
+		"Restores the profiler that was active before `install`."
+		global PARSE_PROFILER
+		PARSE_PROFILER, self.previous = self.previous, None
+		return self
+
+	def __enter__(self):
+		return self.install()
+
+	def __exit__(self, *args):
+		self.uninstall()
+
+	def clear(self):
+		"Discards all recorded timings."
+		self.stages.clear()
+		return self
+
+	def histograms(self) -> dict:
+		"""Exports the aggregated timings, e.g. for `json.dump`.
+		Returns:
+			dict[str, dict]: For each stage, the `count`, `total_ns`, `mean_ns`, `min_ns`, `max_ns` and approximate `p50_ns`, `p90_ns` and `p99_ns` of its durations, and its `histogram` as a list of `(upper_bound_ns, count)` pairs for the non-empty buckets.
+		"""
+		return {k: v.to_dict() for k, v in self.stages.items()}
+
+	def report(self) -> str:
+		"Returns the aggregated timings as a human-readable table, slowest stages first."
+		lines = [f"{'stage':<14}{'calls':>10}{'total ms':>12}{'mean µs':>10}{'p50 µs':>10}{'p99 µs':>10}{'max µs':>10}"]
+		for k, v in sorted(self.stages.items(), key=lambda kv: -kv[1].total):
+			lines.append(f"{k:<14}{v.count:>10}{v.total / 1e6:>12.3f}{v.total / v.count / 1e3:>10.1f}{v.percentile(50) / 1e3:>10.1f}{v.percentile(99) / 1e3:>10.1f}{v.max / 1e3:>10.1f}")
+		return "\n".join(lines)
+
+# The active `ParseProfiler`, if any
+PARSE_PROFILER = None
+
+
 class DynamicDT(datetime.datetime):
 	"""A feature-rich `datetime.datetime` subclass that supports an extended year range,
 	high-precision fractional seconds, and robust natural language parsing.
@@ -610,7 +1651,9 @@ class DynamicDT(datetime.datetime):
 			parsed_as (list[str]): A list of strings indicating which parsing methods
 					were successfully used to create the object via the `.parse()` method.
 	"""
-	__slots__ = ("__weakref__", "_dt", "_offset", "_ts", "_fraction", "parsed_as")
+	__slots__ = ("__weakref__", "_dt", "_offset", "_ts", "_key", "_ticks", "_fraction", "parsed_as")
+	# Opt-in precision mode: when set to an integer (e.g. 10 ** 9 in `NanoDT`), sub-second precision is stored as an integer count of 1/tick_denominator second ticks rather than a Fraction, and arithmetic and comparisons between instances of the same precision become integer operations
+	tick_denominator = None
 
 	def __getstate__(self):
 		# Legacy state (kept for backward compatibility with existing pickles)
@@ -649,8 +1692,28 @@ class DynamicDT(datetime.datetime):
 	def __reduce_ex__(self, protocol):
 		return (self.__class__.fromtimestamp, (self.timestamp_exact(), self.tzinfo))
 
+	def to_bytes(self) -> bytes:
+		"Encodes the value in the compact binary format of `dynamic_dt.codec`; use `dumps_many` to encode many values into one buffer."
+		from .codec import dumps_many
+		return dumps_many((self,))
+
+	@classmethod
+	def from_bytes(cls, data):
+		"Decodes a value encoded by `to_bytes`, from bytes or any buffer such as a `memoryview`."
+		from .codec import loads_one
+		return loads_one(data, cls)
+
 	def copy(self):
-		return self.__class__.fromdatetime(self._dt).set_offset(self.offset)
+		# Shares the wrapped (immutable) datetime rather than reconstructing it, which also preserves the sub-microsecond fraction
+		obj = datetime.datetime.__new__(self.__class__, 1, 1, 1)
+		obj._dt = self._dt
+		obj._offset = self.offset
+		obj._fraction = getattr(self, "_fraction", 0)
+		obj._ts = getattr(self, "_ts", None)
+		obj._key = getattr(self, "_key", None)
+		obj._ticks = getattr(self, "_ticks", None)
+		obj.parsed_as = None
+		return obj
 
 	def __init__(self, *args, **kwargs):
 		self.parsed_as = None
@@ -666,6 +1729,8 @@ class DynamicDT(datetime.datetime):
 		self._dt = datetime.datetime(y, *args[1:], tzinfo=tzinfo, **kwargs)
 		us = self._dt.microsecond
 		if us:
+			# Microseconds are held in the fraction only, so that they are not counted twice
+			self._dt = self._dt.replace(microsecond=0)
 			usf = to_fraction(us, 1e6)
 			f = (f + usf) if f else usf
 		self.set_fraction(f)
@@ -698,6 +1763,9 @@ class DynamicDT(datetime.datetime):
 			return float(tsf)
 
 	def _timestamp_exact(self):
+		if self.tick_denominator:
+			ticks = self.timestamp_ticks()
+			return fractions.Fraction(ticks, self.tick_denominator) if ticks % self.tick_denominator else ticks // self.tick_denominator
 		offs = self.offset * YEAR
 		try:
 			ts = self._dt.timestamp()
@@ -718,6 +1786,20 @@ class DynamicDT(datetime.datetime):
 			self._ts = self._timestamp_exact()
 		return self._ts
 
+	def timestamp_ticks(self) -> int:
+		"Returns the full unix timestamp as an integer count of ticks. Only available when `tick_denominator` is set."
+		try:
+			if self._ticks is not None:
+				return self._ticks
+		except AttributeError:
+			pass
+		denominator = self.tick_denominator
+		if not denominator:
+			raise TypeError(f"{self.__class__.__name__} has no tick_denominator.")
+		# The fraction is already stored as a tick count, so this is cached alongside the sort key
+		self._ticks = self.sort_key()[0] * denominator + (getattr(self, "_fraction", 0) or 0)
+		return self._ticks
+
 	def timestamp_string(self, precision=9) -> str:
 		"Returns the full unix timestamp as a string."
 		return display_to_precision(self.timestamp_exact(), precision)
@@ -725,12 +1807,25 @@ class DynamicDT(datetime.datetime):
 	@property
 	def fraction(self) -> fractions.Fraction | int:
 		try:
-			return self.__getattribute__("_fraction") or 0
+			f = self.__getattribute__("_fraction") or 0
 		except AttributeError:
 			return 0
+		if f and self.tick_denominator:
+			return fractions.Fraction(f, self.tick_denominator)
+		return f
 
 	def set_fraction(self, frac):
-		self._fraction = fractions.Fraction(frac).limit_denominator(1 << 192) if frac else 0
+		if self.tick_denominator:
+			ticks = round(fractions.Fraction(frac) * self.tick_denominator) if frac else 0
+			if ticks >= self.tick_denominator:
+				# Rounded up to the next whole second
+				ticks -= self.tick_denominator
+				dt = self._dt + datetime.timedelta(seconds=1)
+				self._dt = dt.tzinfo.normalize(dt) if hasattr(dt.tzinfo, "normalize") else dt
+			self._fraction = ticks
+		else:
+			self._fraction = fractions.Fraction(frac).limit_denominator(1 << 192) if frac else 0
+		self._ts = self._key = self._ticks = None
 
 	@property
 	def offset(self) -> number:
@@ -743,12 +1838,26 @@ class DynamicDT(datetime.datetime):
 
 	def set_offset(self, offs):
 		self._offset = round(offs)
-		self._ts = None
+		self._ts = self._key = self._ticks = None
 		return self
 
+	def _tick_delta(self, other):
+		"Converts a fixed-length amount (number, timedelta or calendar-free TimeDelta) to ticks, or returns None if it has no fixed length."
+		if isinstance(other, TimeDelta):
+			if other.years or other.months:
+				return
+			other = (((other.days * 24) + other.hours) * 60 + other.minutes) * 60 + other.seconds + other.fraction
+		elif isinstance(other, datetime.timedelta):
+			other = fractions.Fraction(other.days * 86400 + other.seconds) + fractions.Fraction(other.microseconds, 10 ** 6)
+		elif not isinstance(other, number):
+			return
+		return round(fractions.Fraction(other) * self.tick_denominator)
+
 	def __add__(self, other):
 		if not other:
 			return self
+		if self.tick_denominator and (ticks := self._tick_delta(other)) is not None:
+			return self.fromticks(self.timestamp_ticks() + ticks, tz=self.tzinfo)
 		if isinstance(other, TimeDelta):
 			return self.copy().add(**other.to_dict())
 		if isinstance(other, dateutil.relativedelta.relativedelta):
@@ -766,8 +1875,10 @@ class DynamicDT(datetime.datetime):
 	def __sub__(self, other):
 		if not other:
 			return self
+		if self.tick_denominator and (ticks := self._tick_delta(other)) is not None:
+			return self.fromticks(self.timestamp_ticks() - ticks, tz=self.tzinfo)
 		if isinstance(other, TimeDelta):
-			return self.copy().add(**other.negate().to_dict())
+			return self.copy().add(**(-other).to_dict())
 		if isinstance(other, dateutil.relativedelta.relativedelta):
 			return self.__class__.fromdatetime(self._dt + other).set_offset(self.offset)
 		if hasattr(other, "total_seconds"):
@@ -824,32 +1935,83 @@ class DynamicDT(datetime.datetime):
 	def __rsub__(self, other):
 		return self.fromdatetime(other) - self
 
+	def sort_key(self) -> tuple:
+		"Returns an exact, cached `(whole_seconds, fraction)` key ordering instances chronologically; used by comparisons and hashing."
+		try:
+			if self._key is not None:
+				return self._key
+		except AttributeError:
+			pass
+		try:
+			# Floored, as any sub-second part is already counted in the fraction
+			ts = math.floor(self._dt.timestamp())
+		except (AttributeError, OSError):
+			ts = 0
+		self._key = (self.offset * YEAR + ts, self.fraction)
+		return self._key
+
+	def _same_ticks(self, other) -> bool:
+		"Whether both operands count ticks of the same size, so they can be compared as integer `timestamp_ticks()`."
+		return self.tick_denominator and getattr(other, "tick_denominator", None) == self.tick_denominator
+
+	def _other_key(self, other):
+		if isinstance(other, DynamicDT):
+			return other.sort_key()
+		if isinstance(other, datetime.datetime):
+			return DynamicDT.fromdatetime(other).sort_key()
+
+	def __hash__(self):
+		# Consistent with equality against the numeric timestamp
+		ts, f = self.sort_key()
+		return hash(ts + f) if f else hash(ts)
+
 	def __eq__(self, other):
-		if not isinstance(other, self.__class__):
-			if isinstance(other, number):
-				return self.timestamp_exact() == other
-			return False
-		return self.year == other.year and self.timestamp() == other.timestamp()
+		if self._same_ticks(other):
+			return self.timestamp_ticks() == other.timestamp_ticks()
+		if isinstance(other, DynamicDT):
+			return self.sort_key() == other.sort_key()
+		if isinstance(other, number):
+			return self.timestamp_exact() == other
+		return False
+
+	def __ne__(self, other):
+		return not self == other
 
 	def __lt__(self, other):
+		if self._same_ticks(other):
+			return self.timestamp_ticks() < other.timestamp_ticks()
 		if isinstance(other, number):
 			return self.timestamp_exact() < other
-		return self.year < other.year or self.timestamp() < other.timestamp()
-	
+		if (key := self._other_key(other)) is None:
+			return NotImplemented
+		return self.sort_key() < key
+
 	def __le__(self, other):
+		if self._same_ticks(other):
+			return self.timestamp_ticks() <= other.timestamp_ticks()
 		if isinstance(other, number):
 			return self.timestamp_exact() <= other
-		return self.year < other.year or self.timestamp() <= other.timestamp()
+		if (key := self._other_key(other)) is None:
+			return NotImplemented
+		return self.sort_key() <= key
 
 	def __gt__(self, other):
+		if self._same_ticks(other):
+			return self.timestamp_ticks() > other.timestamp_ticks()
 		if isinstance(other, number):
 			return self.timestamp_exact() > other
-		return self.year > other.year or self.timestamp() > other.timestamp()
-	
+		if (key := self._other_key(other)) is None:
+			return NotImplemented
+		return self.sort_key() > key
+
 	def __ge__(self, other):
+		if self._same_ticks(other):
+			return self.timestamp_ticks() >= other.timestamp_ticks()
 		if isinstance(other, number):
 			return self.timestamp_exact() >= other
-		return self.year > other.year or self.timestamp() >= other.timestamp()
+		if (key := self._other_key(other)) is None:
+			return NotImplemented
+		return self.sort_key() >= key
 
 	def add_years(self, years=1):
 		return self.replace(year=self.year + years)
@@ -989,7 +2151,11 @@ class DynamicDT(datetime.datetime):
 		y = abs(self.year)
 		time = f"{'%04d' % y}-{'%02d' % self.month}-{'%02d' % self.day} {'%02d' % self.hour}:{'%02d' % self.minute}:{'%02d' % self.second}"
 		if self.fraction:
-			time += display_to_precision(self.fraction, precision).lstrip("0")
+			frac = display_to_precision(self.fraction, precision)
+			if frac == "1":
+				# The fraction rounds up to a whole second at this precision
+				return (self + (1 - self.fraction)).as_time(precision)
+			time += frac.lstrip("0")
 		if self.year < 0:
 			time += " BCE"
 		if self.tzinfo:
@@ -1011,11 +2177,17 @@ class DynamicDT(datetime.datetime):
 			yr = "+-"[self.year < 0] + yr
 		time = f"{yr}-{'%02d' % self.month}-{'%02d' % self.day}T{'%02d' % self.hour}:{'%02d' % self.minute}:{'%02d' % self.second}"
 		if self.fraction:
-			time += display_to_precision(self.fraction, precision).lstrip("0")
-		offset = get_offset(self.tzinfo)
+			frac = display_to_precision(self.fraction, precision)
+			if frac == "1":
+				# The fraction rounds up to a whole second at this precision
+				return (self + (1 - self.fraction)).as_iso(precision)
+			time += frac.lstrip("0")
+		# The offset in effect at this instant, not the zone's current one
+		offset = get_offset(self.tzinfo, self) if self.tzinfo is not None else 0
 		if offset:
-			negative, offset = offset < 0, abs(offset)
-			time += "+-"[negative] + time_disp(offset).removesuffix(":00").removesuffix(":00")
+			negative, offset = offset < 0, round(abs(offset))
+			hours, minutes = divmod(offset // 60, 60)
+			time += "+-"[negative] + str(hours) + (f":{minutes:02}" if minutes else "")
 		else:
 			time += "Z"
 		return time
@@ -1039,18 +2211,57 @@ class DynamicDT(datetime.datetime):
 		else:
 			return f"`in {delta}`"
 
+	@classmethod
+	def fromisoformat(cls, s, tz=None):
+		"""Parses an ISO 8601 / RFC 3339 timestamp, such as those produced by `as_iso`.
+		Accepts signed years outside 0-9999 (e.g. "-0300-06-09" or "+1001962-12-09"), fractional seconds of any length, and UTC offsets written as "Z", "±H", "±HH:MM" or "±HHMM". Timestamps without an offset are given the timezone `tz`.
+		Raises:
+			ValueError: If the string is not a valid ISO timestamp.
+		"""
+		m = iso_re.fullmatch(cast_str(s).strip())
+		if not m:
+			raise ValueError(f"Invalid isoformat string: {repr(s)}")
+		return cls._fromisomatch(m, tz)
+
+	@classmethod
+	def _fromisomatch(cls, m, tz=None):
+		year, month, day, hour, minute, second, digits, z, sign, oh, om = m.groups()
+		if z:
+			tz = datetime.timezone.utc
+		elif sign:
+			offset = int(oh) * 60 + int(om or 0)
+			tz = pytz.FixedOffset(-offset if sign == "-" else offset)
+		fraction = fractions.Fraction(int(digits), 10 ** len(digits)) if digits else None
+		if isinstance(tz, pytz.tzinfo.DstTzInfo):
+			# Named zones need the offset in effect at this wall-clock time, which the tzinfo passed to the constructor does not give
+			wall = cls(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0), tzinfo=datetime.timezone.utc).sort_key()[0]
+			return cls.fromtimestamp(resolve_wall(wall, tz) + (fraction or 0), tz=tz)
+		return cls(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0), fraction=fraction, tzinfo=tz)
+
 	@classmethod
 	def utcfromtimestamp(cls, ts):
 		return cls.fromtimestamp(ts, tz=datetime.timezone.utc)
 
 	@classmethod
 	def fromtimestamp(cls, ts, tz=None):
-		offs, ots = divmod(round_min(ts), ERA)
-		ext, f = divmod(ots, 1)
-		dt = datetime.datetime.fromtimestamp(ext, tz=tz)
+		ext, f = divmod(round_min(ts), 1)
+		offs, dt = split_era(int(ext), tz)
 		self = cls(*dt.timetuple()[:6], fraction=f, tzinfo=dt.tzinfo)
-		self._offset += round(offs * ERA_YEARS)
-		self._ts = ts
+		self._offset += offs
+		if not cls.tick_denominator:
+			self._ts = ts
+		return self
+
+	@classmethod
+	def fromticks(cls, ticks, tz=None):
+		"Creates an instance from a unix timestamp given as an integer count of ticks. Only available when `tick_denominator` is set."
+		if not cls.tick_denominator:
+			raise TypeError(f"{cls.__name__} has no tick_denominator.")
+		ts, f = divmod(ticks, cls.tick_denominator)
+		offs, dt = split_era(ts, tz)
+		self = cls(*dt.timetuple()[:6], tzinfo=dt.tzinfo)
+		self._fraction = f
+		self._offset += offs
 		return self
 
 	@classmethod
@@ -1079,204 +2290,117 @@ class DynamicDT(datetime.datetime):
 	def parse_delta(cls, s, return_remainder=False):
 		if not isinstance(s, str):
 			s = str(s)
-		if s.startswith("in "):
-			s = s[3:]
+		delta, tokens = cls._parse_delta_tokens(lex(s.strip()))
+		if return_remainder:
+			return delta, " ".join(token.text for token in tokens)
+		if tokens:
+			raise ValueError([token.text for token in tokens])
+		return delta
+
+	@classmethod
+	def _parse_delta_tokens(cls, tokens):
+		"Implementation of `parse_delta` over a `lex` token stream; returns the delta and the list of unconsumed tokens."
+		if len(tokens) > 1 and tokens[0].text == "in":
+			tokens = tokens[1:]
 		try:
-			n = time_parse(s)
+			n = time_parse(" ".join(token.text for token in tokens))
 		except Exception:
 			pass
 		else:
-			td = TimeDelta(seconds=n)
-			if return_remainder:
-				return td, ""
-			return td
-		tokens = s.strip().replace(",", " ").split()
-		timechecks = {
-			"galactic years": ("gy", "galactic year", "galactic years"),
-			"megaanna": ("my", "myr", "megaannum", "megaanna"),
-			"millennia": ("ml", "ky", "millennium", "millennia"),
-			"centuries": ("c", "century", "centuries"),
-			"decades": ("dc", "decade", "decades"),
-			"years": ("y", "yr", "year", "years"),
-			"months": ("mo", "mth", "mos", "mths", "month", "months"),
-			"fortnights": ("fortnight", "fortnights"),
-			"weeks": ("w", "wk", "week", "wks", "weeks"),
-			"days": ("d", "day", "days"),
-			"hours": ("h", "hr", "hour", "hrs", "hours"),
-			"minutes": ("m", "min", "minute", "mins", "minutes"),
-			"seconds": ("s", "sec", "second", "secs", "seconds"),
-			"milliseconds": ("ms", "milli", "millisecond", "millis", "milliseconds"),
-			"microseconds": ("μ", "us", "μs", "micro", "microsecond", "micros", "microseconds"),
-			"nanoseconds": ("ns", "nano", "nanosecond", "nanos", "nanoseconds"),
-			"picoseconds": ("ps", "pico", "picosecond", "picos", "picoseconds"),
-			"femtoseconds": ("fs", "femto", "femtosecond", "femtos", "femtoseconds"),
-			"attoseconds": ("as", "atto", "attosecond", "attos", "attoseconds"),
-			"zeptoseconds": ("zs", "zepto", "zeptosecond", "zeptos", "zeptoseconds"),
-			"yoctoseconds": ("ys", "yocto", "yoctosecond", "yoctos", "yoctoseconds"),
-			"rontoseconds": ("rs", "ronto", "rontosecond", "rontos", "rontoseconds"),
-			"quectoseconds": ("qs", "quecto", "quectosecond", "quectos", "quectoseconds"),
-			"plancks": ("planck", "plancks"),
-		}
-		special_values = {
-			"galactic years": ("years", UNIT_GALACTIC_YEAR),
-			"megaanna": ("years", 1000000),
-			"millennia": ("years", 1000),
-			"fortnights": ("days", 14),
-			"weeks": ("days", 7),
-		}
-		subsecond_values = dict(
-			milliseconds=1e3,
-			microseconds=1e6,
-			nanoseconds=1e9,
-			picoseconds=1e12,
-			femtoseconds=1e15,
-			attoseconds=1e18,
-			zeptoseconds=1e21,
-			yoctoseconds=10 ** 24,
-			rontoseconds=10 ** 27,
-			quectoseconds=10 ** 30,
-			plancks=539 * 10 ** 42,
-		)
-		timeunits = {u: k for k, v in timechecks.items() for u in v}
-		abbreviations = {k: timeunits[k] for k in (
-			"gy",
-			"my", "myr",
-			"ml", "ky",
-			"c",
-			"dc",
-			"y", "yr",
-			"mo", "mth", "mos", "mths",
-			"w", "wk", "wks",
-			"d",
-			"h", "hr", "hrs",
-			"m", "min", "mins",
-			"s", "sec", "secs",
-			"ms",
-			"μ", "μs", "us",
-			"ns",
-			"ps",
-			"fs",
-			"as",
-			"zs",
-			"ys",
-			"rs",
-			"qs",
-		)}
-		abbrevs = re.compile(r"^(?:[+-]?([0-9]*[.])?[0-9]+(?:" + "|".join(abbreviations) + "))+$")
+			return TimeDelta(seconds=n), []
+		grammar = DELTA_GRAMMAR
+		abbreviations = grammar.abbreviations
 
 		delta = TimeDelta()
+		# Parse full abbreviations first (e.g. "1mo3d4h30m57s"), along with a direction keyword following them
+		rest = []
 		i = 0
 		while i < len(tokens):
 			token = tokens[i]
-			# Parse full abbreviations first (e.g. "1mo3d4h30m57s")
-			if abbrevs.fullmatch(token):
-				if token.startswith("-") and token[1:].count("-") == 0 and token[1:].count("+") == 0:
-					neg = True
-					token = token[1:]
-				else:
-					neg = False
-				tokens.pop(i)
-				num = 1
-				unit = None
-				while token:
-					match = num_re.match(token)
-					if not match:
-						search = num_re.search(token)
-						if search:
-							match, token = token[:search.start()], token[search.end():]
-							unit = abbreviations[match]
-							if neg:
-								num = -num
-							if unit in subsecond_values:
-								delta.fraction += to_fraction(num, subsecond_values[unit])
-							else:
-								setattr(delta, unit, num)
-							num = parse_num(search.group())
-							continue
-						match, token = token, ""
-						unit = abbreviations[match]
-					else:
-						token = token[match.end():]
-						num = parse_num(match.group())
-						continue
-					assert unit
-					if neg:
-						num = -num
-					if unit in special_values:
-						unit, mult = special_values[unit]
-						num *= mult
-					if unit in subsecond_values:
-						delta.fraction += to_fraction(num, subsecond_values[unit])
-					else:
-						setattr(delta, unit, num)
-				if i < len(tokens) - 1:
-					match tokens[i]:
-						case "before" | "ago" | "to" | "until" | "till":
-							delta.negate()
-							tokens.pop(i)
-						case "after" | "past" | "in" | "from":
-							tokens.pop(i)
-						case "and":
-							tokens.pop(i)
-				continue
 			i += 1
+			if token.kind != "abbreviation":
+				rest.append(token)
+				continue
+			token = token.text
+			if token.startswith("-") and token[1:].count("-") == 0 and token[1:].count("+") == 0:
+				neg = True
+				token = token[1:]
+			else:
+				neg = False
+			num = 1
+			unit = None
+			while token:
+				match = num_re.match(token)
+				if not match:
+					search = num_re.search(token)
+					if search:
+						match, token = token[:search.start()], token[search.end():]
+						if neg:
+							num = -num
+						unit, num = grammar.convert(abbreviations[match], num)
+						setattr(delta, unit, getattr(delta, unit) + num)
+						num = parse_num(search.group())
+						continue
+					match, token = token, ""
+					unit = abbreviations[match]
+				else:
+					token = token[match.end():]
+					num = parse_num(match.group())
+					continue
+				assert unit
+				if neg:
+					num = -num
+				unit, num = grammar.convert(unit, num)
+				setattr(delta, unit, getattr(delta, unit) + num)
+			if i < len(tokens) - 1 and tokens[i].kind in ("direction", "and"):
+				if tokens[i].value:
+					delta.negate()
+				i += 1
+
+		# Parse "<number> <unit>" components from right to left, each negated if followed by a "before" keyword (which also applies to the components preceding it, until another keyword)
+		texts = [token.text for token in rest]
+		consumed = [False] * len(rest)
 		neg = None
-		i = len(tokens) - 1
+		keyword = None
+		i = len(rest) - 1
 		while i >= 0:
-			# Parse "before" and "after" keywords at the end of a timeframe
-			match tokens[i]:
-				case "before" | "ago" | "to" | "until" | "till":
-					neg = True
-					i -= 1
-				case "after" | "past" | "in" | "from":
-					neg = False
-					i -= 1
-				case "and":
-					neg = neg or False
-					i -= 1
-			token = tokens[i]
-			# Retry from top if invalid timeunit detected
-			if token not in timeunits:
+			token = rest[i]
+			if token.kind == "direction":
+				neg = token.value
+				keyword = i
 				i -= 1
 				continue
-			# Greedy scan to include all non-timeunits before current one
-			k = i - 1
-			for k in range(i - 1, -1, -1):
-				if tokens[k] in timeunits:
-					k += 1
-					break
-			# Try each token until a detection succeeds, then add timedelta respecting before/after modes
+			if token.kind == "and":
+				neg = neg or False
+				keyword = i
+				i -= 1
+				continue
+			if token.kind != "unit":
+				i -= 1
+				continue
+			# The number must lie within the run of numeric tokens preceding the unit; find the earliest token from which the rest of the run reads as one
+			k = i
+			while k > 0 and rest[k - 1].numeric():
+				k -= 1
 			for j in range(k, i):
-				test = " ".join(tokens[j:i])
-				try:
-					if test in ("a", "an"):
-						num = 1
-					else:
-						num = parse_num_long(test)
-				except Exception:
-					pass
+				if texts[j] in ("a", "an") and j == i - 1:
+					num = 1
 				else:
-					if num is not None:
-						if neg:
-							num = -num
-						unit = timeunits[token]
-						if unit in special_values:
-							unit, mult = special_values[unit]
-							num *= mult
-						if unit in subsecond_values:
-							delta.fraction += to_fraction(num, subsecond_values[unit])
-						else:
-							setattr(delta, unit, getattr(delta, unit) + num)
-						tokens = tokens[:j] + tokens[i + 1 + (neg is not None):]
-						i = j
+					found = match_number_words(texts, j, i)
+					if not found or found[1] < i:
 						continue
+					num = found[0]
+				if neg:
+					num = -num
+				unit, num = grammar.convert(token.value, num)
+				setattr(delta, unit, getattr(delta, unit) + num)
+				consumed[j:i + 1] = [True] * (i + 1 - j)
+				if keyword == i + 1:
+					consumed[keyword] = True
+				i = j
+				break
 			i -= 1
-
-		if return_remainder:
-			return delta, " ".join(tokens)
-		if tokens:
-			raise ValueError(tokens)
-		return delta
+		return delta, [token for token, c in zip(rest, consumed) if not c]
 
 	@classmethod
 	def parse(cls, s="", timestamp=None, timezone=None):
@@ -1305,104 +2429,250 @@ class DynamicDT(datetime.datetime):
 			DynamicDT: A new DynamicDT object representing the parsed date and time.
 				The `parsed_as` attribute of the returned object contains a list of
 				strings indicating which parsing rules were successfully applied.
+		The text-dependent part of the work is done by `parse_plan`, and may be cached across calls via `PARSE_CACHE`.
+		"""
+		profiler = PARSE_PROFILER
+		if profiler:
+			start = t = time.perf_counter_ns()
+		self = cls._parse_iso(s, timezone)
+		if profiler:
+			t = profiler.record("iso", t)
+		if self is None:
+			plan = cls._plan(s)
+			if profiler:
+				profiler.record("plan", t)
+			self = cls.from_plan(plan, timestamp=timestamp, timezone=timezone)
+		if profiler:
+			profiler.record("parse", start)
+		return self
+
+	@classmethod
+	def parse_many(cls, strings, timestamp=None, timezone=None, errors="raise", failures=None):
+		"""Parses many strings against a shared reference time and default timezone, yielding results lazily in input order.
+		The reference time (captured once at the start if not given), the default timezone, and the reference `DynamicDT` for each timezone encountered are resolved once for the whole batch rather than per item. Repeated strings reuse their `ParsePlan`, through `PARSE_CACHE` if enabled or a batch-local cache otherwise.
+		Args:
+			strings (Iterable[str]): The strings to parse.
+			timestamp (number, optional): The reference unix timestamp for relative parsing. Defaults to the current time.
+			timezone (str | tzinfo, optional): The default timezone, as in `parse`.
+			errors (str): What to do when an item fails to parse; "raise" propagates the exception, "skip" omits the item, and "none" yields None in its place.
+			failures (list, optional): If provided, an `(index, string, exception)` tuple is appended for every item that failed to parse.
+		Yields:
+			DynamicDT | None: The parsed values.
 		"""
+		if errors not in ("raise", "skip", "none"):
+			raise ValueError(f"errors must be one of \"raise\", \"skip\" or \"none\", got {repr(errors)}")
+		if not timestamp:
+			timestamp = cls.unix()
+		if timezone:
+			timezone = get_timezone(timezone)
+		anchors = {}
+		cache = PARSE_CACHE if PARSE_CACHE.maxsize else ParseCache(1024)
+		for i, s in enumerate(strings):
+			try:
+				self = cls._parse_iso(s, timezone)
+				if self is None:
+					self = cls.from_plan(cls._plan(s, cache), timestamp=timestamp, timezone=timezone, anchors=anchors)
+			except Exception as ex:
+				if errors == "raise":
+					raise
+				if failures is not None:
+					failures.append((i, s, ex))
+				if errors == "none":
+					yield None
+				continue
+			yield self
+
+	@classmethod
+	def parse_parallel(cls, strings, workers=None, chunksize=1024, timestamp=None, timezone=None, errors="raise", failures=None):
+		"""Parses many strings using a pool of worker processes, yielding results lazily in input order.
+		Input is consumed in chunks of `chunksize` strings, with at most two chunks per worker in flight at a time, so arbitrarily large iterables can be streamed. Workers send back compact `__getstate__` tuples rather than pickled `DynamicDT` objects.
+		Args:
+			strings (Iterable[str]): The strings to parse.
+			workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+			chunksize (int): The number of strings sent to a worker at a time.
+			timestamp, timezone, errors, failures: As in `parse_many`. The reference time is captured once, so every worker parses against the same instant.
+		Yields:
+			DynamicDT | None: The parsed values.
+		"""
+		if errors not in ("raise", "skip", "none"):
+			raise ValueError(f"errors must be one of \"raise\", \"skip\" or \"none\", got {repr(errors)}")
+		if not timestamp:
+			timestamp = cls.unix()
+		workers = workers or os.cpu_count() or 1
+		import concurrent.futures
+		import itertools
+		strings = iter(strings)
+		pending = collections.deque()
+		executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker)
+
+		def submit():
+			chunk = list(itertools.islice(strings, chunksize))
+			if chunk:
+				pending.append((chunk, executor.submit(_parse_chunk, cls, chunk, timestamp, timezone)))
+
+		try:
+			for _ in range(workers * 2):
+				submit()
+			i = 0
+			while pending:
+				chunk, future = pending.popleft()
+				results = future.result()
+				submit()
+				for s, result in zip(chunk, results):
+					if isinstance(result, BaseException):
+						if errors == "raise":
+							raise result
+						if failures is not None:
+							failures.append((i, s, result))
+						if errors == "none":
+							yield None
+					else:
+						yield cls.fromstate(*result)
+					i += 1
+		finally:
+			executor.shutdown(wait=True, cancel_futures=True)
+
+	@classmethod
+	def fromstate(cls, state, parsed_as=None):
+		"Reconstructs a `DynamicDT` from the tuple returned by `__getstate__`."
+		self = datetime.datetime.__new__(cls, 1, 1, 1)
+		self.__setstate__(state)
+		self.parsed_as = parsed_as
+		return self
+
+	@classmethod
+	def _parse_iso(cls, s, timezone=None):
+		"Fast path for `parse`; returns None unless the string is a valid ISO 8601 timestamp."
+		if not isinstance(s, str) or not s or not s[-1].isalnum() or not (m := iso_re.fullmatch(s.strip())):
+			return
+		try:
+			self = cls._fromisomatch(m, (get_timezone(timezone) if timezone else datetime.timezone.utc) if not (m[8] or m[9]) else None)
+		except ValueError:
+			return
+		self.parsed_as = ["iso"]
+		return self
+
+	@classmethod
+	def _plan(cls, s, cache=None) -> ParsePlan:
+		"Returns the `ParsePlan` for a string, going through a `ParseCache` (by default `PARSE_CACHE`)."
 		if not isinstance(s, str):
-			s = str(s)
-		tokens = s.casefold().strip().replace(",", " ").split()
-		parsed_as = []
+			s = cast_str(s)
+		if cache is None:
+			cache = PARSE_CACHE
+		key = " ".join(s.casefold().replace(",", " ").split())
+		plan = cache.get(key)
+		if plan is None:
+			plan = cls.parse_plan(key)
+			cache.put(key, plan)
+		return plan
+
+	@classmethod
+	def _reference(cls, timestamp, tzinfo, anchors=None):
+		"Returns the reference time for relative parsing, reusing a previously constructed one from `anchors` (a dict keyed by tzinfo) where possible."
+		if anchors is not None:
+			try:
+				return anchors[tzinfo].copy()
+			except KeyError:
+				pass
+		if timestamp:
+			self = cls.fromtimestamp(timestamp, tz=tzinfo)
+		else:
+			self = cls.now(tz=tzinfo)
+		if anchors is not None:
+			anchors[tzinfo] = self.copy()
+		return self
+
+	@classmethod
+	def parse_plan(cls, s) -> ParsePlan:
+		"""Interprets a string without reference to the current time or default timezone.
+		Args:
+			s (str): The string to parse.
+		Raises:
+			ValueError: If the string cannot be interpreted.
+		Returns:
+			ParsePlan: The interpretation, to be completed using `from_plan`.
+		"""
+		profiler = PARSE_PROFILER
+		if profiler:
+			t = time.perf_counter_ns()
+		tokens = lex(s.casefold().strip(), shorthands=True)
+		plan = ParsePlan()
+		parsed_as = plan.parsed_as
+		if profiler:
+			t = profiler.record("lex", t)
 
 		moon_phase = None
 		moon_mode = None
-		for k, v in lunar_phase_names.items():
-			words = k.split()
-			try:
-				i = tokens.index(words.pop(0))
-			except ValueError:
-				continue
-			if len(tokens) - i - 1 >= len(words) and all(tokens[i + j] == w for j, w in enumerate(words, 1)):
-				moon_phase = v
-				j = i + len(words)
-				tokens = tokens[:i] + tokens[j + 1:]
-				if len(tokens) and i > 0:
-					match tokens[i - 1]:
-						case "next":
-							moon_mode = "next"
-							tokens.pop(i - 1)
-							i -= 1
-						case "last":
-							moon_mode = "last"
-							tokens.pop(i - 1)
-							i -= 1
-						case "this":
-							moon_mode = None
-							tokens.pop(i - 1)
-							i -= 1
-					if tokens[i - 1] == "the":
+		phases = [i for i, token in enumerate(tokens) if token.kind == "lunar_phase"]
+		if phases:
+			# The earliest phase in the lunar cycle takes precedence if several are mentioned
+			i = min(phases, key=lambda i: tokens[i].value)
+			moon_phase = tokens.pop(i).value
+			if len(tokens) and i > 0:
+				match tokens[i - 1].text:
+					case "next":
+						moon_mode = "next"
 						tokens.pop(i - 1)
 						i -= 1
-				if len(tokens) > i:
-					match tokens[i]:
-						case "after":
-							moon_mode = "next"
-							tokens.pop(i)
-						case "before":
-							moon_mode = "last"
-							tokens.pop(i)
-				break
+					case "last":
+						moon_mode = "last"
+						tokens.pop(i - 1)
+						i -= 1
+					case "this":
+						moon_mode = None
+						tokens.pop(i - 1)
+						i -= 1
+				if i > 0 and tokens[i - 1].text == "the":
+					tokens.pop(i - 1)
+					i -= 1
+			if len(tokens) > i:
+				match tokens[i].text:
+					case "after":
+						moon_mode = "next"
+						tokens.pop(i)
+					case "before":
+						moon_mode = "last"
+						tokens.pop(i)
+		if profiler:
+			t = profiler.record("lunar", t)
 
 		mode = "next"
-		for i, token in enumerate(tuple(tokens)):
-			match token:
-				case "now":
-					tokens.pop(i)
-				case _ if token.startswith("now+") or token.startswith("now-"):
-					tokens[i] = token[3:]
-				case "noon":
-					tokens[i] = "12PM"
-				case "midnight":
-					tokens[i] = "12AM"
-				case _ if ts_re.match(token):
-					tokens[i] = token.split(":", 1)[-1].replace(">", ":").split(":", 1)[0] + ".0"
+		first = {}
+		for i, token in enumerate(tokens):
+			match token.kind:
+				case "discord":
 					parsed_as.append("discord_timestamp")
-		for m in ("last", "previous", "next", "this", "today", "tomorrow", "yesterday", "unix"):
-			try:
-				i = tokens.index(m)
-			except ValueError:
-				continue
-			if i == len(tokens) - 1 and m in ("last", "previous", "next", "this"):
+				case "relative" | "era":
+					first.setdefault(token.text, i)
+		for m in RELATIVE_WORDS:
+			i = first.get(m)
+			if i is None or i == len(tokens) - 1 and m in ("last", "previous", "next", "this"):
 				continue
 			tokens.pop(i)
-			if i > 0 and m in ("last", "previous", "next") and tokens[i - 1] == "the":
+			if i > 0 and m in ("last", "previous", "next") and tokens[i - 1].text == "the":
 				tokens.pop(i - 1)
-				i -= 1
 			mode = m
 			parsed_as.append("relative")
 			break
 
 		direction = None
-		if "bce" in tokens:
-			tokens.remove("bce")
-			direction = "bce"
-		elif "bc" in tokens:
-			tokens.remove("bc")
-			direction = "bce"
-		elif "ad" in tokens:
-			tokens.remove("ad")
-			direction = "ce"
-		elif "ce" in tokens:
-			tokens.remove("ce")
-			direction = "ce"
-		if direction is not None:
-			parsed_as.append("common_era")
+		for m in ERA_WORDS:
+			if m in first:
+				tokens.pop(next(i for i, token in enumerate(tokens) if token.text == m))
+				direction = ERA_WORDS[m]
+				parsed_as.append("common_era")
+				break
+		if profiler:
+			t = profiler.record("keywords", t)
 
 		tzinfo = None
 		if tokens:
 			try:
-				tzinfo = get_timezone(tokens[-1])
+				tzinfo = get_timezone(tokens[-1].text)
 				assert tzinfo, tzinfo
 			except (KeyError, AssertionError):
 				try:
-					tzinfo = get_timezone(tokens[0])
+					tzinfo = get_timezone(tokens[0].text)
 					assert tzinfo, tzinfo
 				except (KeyError, AssertionError):
 					pass
@@ -1412,73 +2682,53 @@ class DynamicDT(datetime.datetime):
 			else:
 				parsed_as.append("timezone")
 				tokens.pop(-1)
-				if tokens and tokens[-1] in ("in", "at"):
+				if tokens and tokens[-1].text in ("in", "at"):
 					tokens.pop(-1)
-		if not tzinfo:
-			if timezone:
-				tzinfo = get_timezone(timezone)
-			else:
-				tzinfo = datetime.timezone.utc
+		if profiler:
+			t = profiler.record("timezone", t)
 
-		s = " ".join(tokens)
+		s = " ".join(token.text for token in tokens)
 		if s and not is_number(s):
-			offset, s = cls.parse_delta(s, return_remainder=True)
+			offset, tokens = cls._parse_delta_tokens(tokens)
 		else:
 			offset = None
+		if profiler:
+			t = profiler.record("delta", t)
 
 		natural_language = False
-		tokens = s.split()
+		texts = [token.text for token in tokens]
 		i = 0
 		while i < len(tokens):
-			n = None
-			for j in range(i + 1, len(tokens) + 1):
-				temp = " ".join(tokens[i:j])
-				if is_number(temp):
-					continue
-				try:
-					n = parse_num_long(temp)
-				except Exception:
-					if n is not None:
-						natural_language = True
-						tokens = tokens[:i] + [str(n) + "."] + tokens[j:]
-						i = j
-						break
-			else:
-				if n is not None:
-					natural_language = True
-					tokens = tokens[:i] + [str(n) + "."] + tokens[j + 1:]
-					i = j + 1
-					continue
-				i += 1
+			# Replace spelled-out numbers, leaving runs of plain digits as they are
+			found = tokens[i].numeric() and match_number_words(texts, i)
+			if found and any(token[0].isalpha() for token in texts[i:found[1]]):
+				natural_language = True
+				tokens[i:found[1]] = [Token("number", str(found[0]) + ".")]
+				texts[i:found[1]] = [tokens[i].text]
+			i += 1
 		if natural_language:
 			parsed_as.append("natural_language")
-		s = " ".join(tokens)
-		self = None
+		if profiler:
+			t = profiler.record("number_words", t)
+		s = " ".join(texts)
 		if is_number(s):
 			n = parse_num(s)
 			if mode != "unix" and (s.endswith(".") or "." not in s and (direction is not None or 1970 <= n <= 2038)):
-				parsed_as.append("year")
-				self = cls(n, 1, 1, tzinfo=tzinfo)
+				plan.kind = "year"
 			elif mode != "unix" and ("." not in s and (direction is not None or 19700101 <= n <= 99991231 and (1 <= n % 10000 // 100 <= 12 and 1 <= n % 100 <= 31))):
-				parsed_as.append("yyyymmdd")
-				dt = dateutil.parser.parse(str(n), fuzzy=False)
-				self = cls.fromdatetime(dt, tz=tzinfo)
+				plan.kind = "yyyymmdd"
 			else:
-				parsed_as.append("unix_timestamp")
-				self = cls.fromtimestamp(n, tz=tzinfo)
+				plan.kind = "unix_timestamp"
+			parsed_as.append(plan.kind)
+			plan.number = n
 			s = ""
 		elif mode == "unix":
 			raise ValueError(f"Expected a number representing unix timestamp in seconds, got {repr(s)}")
 
-		if s and self is None:
-			if timestamp:
-				self = cls.fromtimestamp(timestamp, tz=tzinfo)
-			else:
-				self = cls.now(tz=tzinfo)
-			now = self.timestamp_exact()
-			self = self.replace(time=0)
-			temp = TemporaryDT()
-			replacers = {}
+		if s:
+			plan.kind = "value"
+			values = {}
+			deltas = ()
 			# Parse special indicators such as "last monday", "this month", "next year" etc
 			if mode not in ("yesterday", "today", "tomorrow"):
 				last_unit = None
@@ -1486,105 +2736,213 @@ class DynamicDT(datetime.datetime):
 			else:
 				last_unit = "days"
 				replaced_units = ["hour", "minute", "second"]
-			# Handle weeks separately since they are not an atomic datetime unit
-			unspec = False
+			# Handle weeks separately since they are not an atomic datetime unit; the unit itself is filled in from the reference time by `from_plan`
 			if mode in ("last", "this", "next"):
-				tokens = s.split()
-				if tokens[0] in replaced_units:
-					last_unit = tokens.pop(0)
-					if last_unit == "week":
-						temp = temp.replace(day=self.day)
-					else:
-						temp = temp.replace(**{last_unit: getattr(self, last_unit)})
+				if tokens[0].text in replaced_units:
+					last_unit = tokens.pop(0).text
+					plan.preset = "day" if last_unit == "week" else last_unit
 					last_unit += "s"
-					unspec = True
-				elif tokens[-1] in replaced_units:
-					last_unit = tokens.pop(-1)
-					if last_unit == "week":
-						temp = temp.replace(day=self.day)
-					else:
-						temp = temp.replace(**{last_unit: getattr(self, last_unit)})
+					plan.unspec = True
+				elif tokens[-1].text in replaced_units:
+					last_unit = tokens.pop(-1).text
+					plan.preset = "day" if last_unit == "week" else last_unit
 					last_unit += "s"
-					unspec = True
-				s = " ".join(tokens)
+					plan.unspec = True
 			# Parse remaining strings, storing in our intercepted datetime
-			if s:
+			if tokens:
 				parsed_as.append("value")
-				tokens = s.split()
-				for i, t in enumerate(tuple(tokens)):
-					if re.fullmatch(r"[+-]?[0-9]+[\-/\\.][0-9]+[\-/\\.][0-9]+", t):
-						coerced = t.replace(".", "-").replace("/", "-").replace("\\", "-").rsplit("-", 2)
+				rest = []
+				for token in tokens:
+					text = token.text
+					if token.kind == "date":
+						coerced = text.replace(".", "-").replace("/", "-").replace("\\", "-").rsplit("-", 2)
 						y, m, d = map(int, coerced)
 						if 1 <= m <= 12 and 1 <= d <= month_days(y, m):
-							temp = temp.replace(year=y, month=m, day=d)
-							tokens.pop(i)
-					elif re.fullmatch(r"[+-]?[0-9]{3,}", t):
-						temp = temp.replace(year=int(t))
-						tokens.pop(i)
-				if tokens:
-					s = " ".join(tokens)
-					temp = dateutil.parser.parse(s, default=temp, fuzzy=False)
-			# Zero out all units after the recognised ones; i.e. for "March 2020" the day is set to 1, and the hour, minute, second, etc are all set to 0
-			for unit in replaced_units:
-				if unit == "week":
-					continue
-				if unit in temp.set:
-					replacers[unit] = getattr(temp, unit)
-					if unspec:
-						last_unit = unit + "s"
-						unspec = False
-				elif replacers:
-					replacers[unit] = 1 if unit in ("month", "day") else 0
-				else:
-					last_unit = unit + "s"
-			# Update necessary units
-			self = self.replace(**replacers)
-			# dateutil relativedelta automatically adds; correct this behaviour to stay relative when the "this" keyword is used
-			if last_unit and mode == "this" and temp.deltas and self.weekday() > temp.deltas[-1].weekday.weekday:
-				self += TimeDelta(days=-7)
-			# Apply weekday update
-			for delta in temp.deltas:
-				self += delta
-			# Handle all cases of "last" and "next"
-			match mode:
-				case "tomorrow" if last_unit == "days":
-					self += TimeDelta(days=1)
-				case "next" | "in" if last_unit and temp.deltas and self.timestamp_exact() < now:
-					self += TimeDelta(days=7)
-				case "next" | "in" if last_unit == "weeks" and self.timestamp_exact() < now:
-					self += TimeDelta(days=7)
-				case "next" | "in" if last_unit and self.timestamp_exact() < now:
-					self += TimeDelta(**{last_unit: 1})
-				case "last" | "from" if last_unit and temp.deltas and self.timestamp_exact() > now:
-					self += TimeDelta(days=-7)
-				case "last" | "from" if last_unit == "weeks" and self.timestamp_exact() > now:
-					self += TimeDelta(days=-7)
-				case "last" | "from" if last_unit and self.timestamp_exact() > now:
-					self += TimeDelta(**{last_unit: -1})
-				case "yesterday" if last_unit == "days":
-					self += TimeDelta(days=-1)
-		elif self is None:
+							values.update(year=y, month=m, day=d)
+							continue
+					elif token.kind == "number" and year_re.fullmatch(text):
+						values["year"] = int(text)
+						continue
+					rest.append(text)
+				if rest:
+					if found := match_date_words(rest):
+						values.update(found[0])
+						if found[1] is not None:
+							deltas = (dateutil.relativedelta.relativedelta(weekday=found[1]),)
+					else:
+						# Fall back to dateutil for the less common forms, intercepting its output
+						if profiler:
+							d = time.perf_counter_ns()
+						temp = dateutil.parser.parse(" ".join(rest), default=TemporaryDT().replace(**values), fuzzy=False)
+						values = {k: getattr(temp, k) for k in temp.set}
+						deltas = tuple(temp.deltas)
+						if profiler:
+							# Counted separately from the rest of the value stage
+							t += profiler.record("dateutil", d) - d
+			plan.last_unit = last_unit
+			plan.replaced_units = tuple(replaced_units)
+			plan.values = values
+			plan.deltas = deltas
+		elif plan.kind is None:
+			plan.kind = "current"
 			parsed_as.append("current")
-			if timestamp:
-				self = cls.fromtimestamp(timestamp, tz=tzinfo)
-			else:
-				self = cls.now(tz=tzinfo)
-			# Treat day indicators with no time indicators as midnight
-			if mode in ("today", "yesterday", "tomorrow"):
-				self = self.replace(time=0)
-				if mode == "yesterday":
-					self += TimeDelta(days=-1)
-				elif mode == "tomorrow":
-					self += TimeDelta(days=1)
-		elif s:
-			raise ValueError(f"Failed to parse {s}")
-		if moon_phase is not None:
-			self = closest_lunar_phase(self, moon_phase, mode=moon_mode)
-
+		plan.mode = mode
+		plan.direction = direction
+		plan.tzinfo = tzinfo
+		plan.moon_phase = moon_phase
+		plan.moon_mode = moon_mode
 		if offset:
 			parsed_as.append("delta")
-			self += offset
-		if direction == "bce":
+			plan.offset = offset.frozen()
+		if profiler:
+			profiler.record("value", t)
+		return plan
+
+	@classmethod
+	def from_plan(cls, plan, timestamp=None, timezone=None, anchors=None):
+		"""Completes a `ParsePlan` against a reference time and default timezone. See `parse` for the meaning of the arguments; `anchors` is an optional dict used to share reference times between calls, as done by `parse_many`."""
+		profiler = PARSE_PROFILER
+		if profiler:
+			t = time.perf_counter_ns()
+		tzinfo = plan.tzinfo
+		if not tzinfo:
+			if timezone:
+				tzinfo = get_timezone(timezone)
+			else:
+				tzinfo = datetime.timezone.utc
+		mode = plan.mode
+		match plan.kind:
+			case "year":
+				self = cls(plan.number, 1, 1, tzinfo=tzinfo)
+			case "yyyymmdd":
+				dt = dateutil.parser.parse(str(plan.number), fuzzy=False)
+				self = cls.fromdatetime(dt, tz=tzinfo)
+			case "unix_timestamp":
+				self = cls.fromtimestamp(plan.number, tz=tzinfo)
+			case "value":
+				self = cls._reference(timestamp, tzinfo, anchors)
+				if profiler:
+					t = profiler.record("reference", t)
+				now = self.timestamp_exact()
+				self = self.replace(time=0)
+				values = plan.values
+				deltas = plan.deltas
+				last_unit = plan.last_unit
+				unspec = plan.unspec
+				replacers = {}
+				# Zero out all units after the recognised ones; i.e. for "March 2020" the day is set to 1, and the hour, minute, second, etc are all set to 0
+				for unit in plan.replaced_units:
+					if unit == "week":
+						continue
+					if unit in values or unit == plan.preset:
+						replacers[unit] = values[unit] if unit in values else getattr(self, unit)
+						if unspec:
+							last_unit = unit + "s"
+							unspec = False
+					elif replacers:
+						replacers[unit] = 1 if unit in ("month", "day") else 0
+					else:
+						last_unit = unit + "s"
+				# Update necessary units
+				self = self.replace(**replacers)
+				# dateutil relativedelta automatically adds; correct this behaviour to stay relative when the "this" keyword is used
+				if last_unit and mode == "this" and deltas and self.weekday() > deltas[-1].weekday.weekday:
+					self += TimeDelta(days=-7)
+				# Apply weekday update
+				for delta in deltas:
+					self += delta
+				# Handle all cases of "last" and "next"
+				match mode:
+					case "tomorrow" if last_unit == "days":
+						self += TimeDelta(days=1)
+					case "next" | "in" if last_unit and deltas and self.timestamp_exact() < now:
+						self += TimeDelta(days=7)
+					case "next" | "in" if last_unit == "weeks" and self.timestamp_exact() < now:
+						self += TimeDelta(days=7)
+					case "next" | "in" if last_unit and self.timestamp_exact() < now:
+						self += TimeDelta(**{last_unit: 1})
+					case "last" | "from" if last_unit and deltas and self.timestamp_exact() > now:
+						self += TimeDelta(days=-7)
+					case "last" | "from" if last_unit == "weeks" and self.timestamp_exact() > now:
+						self += TimeDelta(days=-7)
+					case "last" | "from" if last_unit and self.timestamp_exact() > now:
+						self += TimeDelta(**{last_unit: -1})
+					case "yesterday" if last_unit == "days":
+						self += TimeDelta(days=-1)
+			case _:
+				self = cls._reference(timestamp, tzinfo, anchors)
+				if profiler:
+					t = profiler.record("reference", t)
+				# Treat day indicators with no time indicators as midnight
+				if mode in ("today", "yesterday", "tomorrow"):
+					self = self.replace(time=0)
+					if mode == "yesterday":
+						self += TimeDelta(days=-1)
+					elif mode == "tomorrow":
+						self += TimeDelta(days=1)
+		if profiler:
+			t = profiler.record("relative" if plan.kind in ("value", "current") else "construct", t)
+		if plan.moon_phase is not None:
+			self = closest_lunar_phase(self, plan.moon_phase, mode=plan.moon_mode)
+			if profiler:
+				t = profiler.record("lunar_phase", t)
+
+		if plan.offset:
+			self += plan.offset
+		if plan.direction == "bce":
 			self = self.replace(year=-self.year)
-		self.parsed_as = parsed_as
-		return self
\ No newline at end of file
+		self.parsed_as = list(plan.parsed_as)
+		if profiler:
+			profiler.record("offset", t)
+		return self
+
+
+class NanoDT(DynamicDT):
+	"A `DynamicDT` in integer-nanosecond precision mode; sub-second values are rounded to the nearest nanosecond, in exchange for integer rather than Fraction arithmetic. Subclass `DynamicDT` with a different `tick_denominator` for other tick sizes."
+	__slots__ = ()
+	tick_denominator = 10 ** 9
+
+
+def _init_parse_worker():
+	"Initialiser for `DynamicDT.parse_parallel` worker processes; keeps parse plans cached across chunks."
+	if not PARSE_CACHE.maxsize:
+		PARSE_CACHE.resize(4096)
+
+def _parse_chunk(cls, strings, timestamp, timezone):
+	"Worker for `DynamicDT.parse_parallel`; returns a `(state, parsed_as)` tuple for each parsed string, or the exception raised for each failed one."
+	failures = []
+	results = [None if self is None else (self.__getstate__(), self.parsed_as) for self in cls.parse_many(strings, timestamp=timestamp, timezone=timezone, errors="none", failures=failures)]
+	for i, s, ex in failures:
+		results[i] = ex
+	return results
+
+# Names defined by the optional submodules, which are only imported when one of them is first accessed
+LAZY_EXPORTS = dict(
+	DynamicDTArray="arrays",
+	TimeDeltaArray="arrays",
+	scan="scanner",
+	dumps_many="codec",
+	loads_many="codec",
+	iter_loads="codec",
+	loads_one="codec",
+	Timeline="timeline",
+	IntervalIndex="intervals",
+	RRule="recurrence",
+	LunarRecurrence="recurrence",
+	next_lunar_phases="lunar",
+)
+
+def __getattr__(name):
+	try:
+		module = LAZY_EXPORTS[name]
+	except KeyError:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+	value = getattr(importlib.import_module("." + module, __name__), name)
+	globals()[name] = value
+	return value
+
+def __dir__():
+	return sorted(set(globals()) | set(LAZY_EXPORTS))
+
+# Star imports also bring in the lazily imported names, loading their submodules
+__all__ = [k for k in globals() if not k.startswith("_")] + list(LAZY_EXPORTS)
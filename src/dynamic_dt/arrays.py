@@ -0,0 +1,562 @@
+import array
+import datetime
+import fractions
+import itertools
+import math
+from . import DynamicDT, TimeDelta, UNIT_MONTH, YEAR, ERA, EPOCH, get_offset_table
+
+DEFAULT_DENOMINATOR = 10 ** 9
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+# Nominal length of a calendar month, as used by `TimeDelta.total_seconds`
+MONTH_SECONDS = UNIT_MONTH * 86400
+
+
+def get_numpy():
+	"Returns the numpy module if it is installed, otherwise None."
+	try:
+		import numpy
+	except ImportError:
+		return
+	return numpy
+
+def resolve_backend(backend=None) -> str:
+	"Resolves a backend name; None selects numpy where available, falling back to pure Python."
+	if backend is None:
+		return "numpy" if get_numpy() else "python"
+	if backend not in ("numpy", "python"):
+		raise ValueError(f"backend must be \"numpy\" or \"python\", got {repr(backend)}")
+	if backend == "numpy" and not get_numpy():
+		raise ImportError("The numpy backend requires numpy to be installed.")
+	return backend
+
+def int_column(values, backend):
+	"Builds an integer column, using int64 storage where every value fits and arbitrary-precision ints otherwise."
+	values = values if isinstance(values, (list, array.array)) else list(values)
+	if backend == "numpy":
+		np = get_numpy()
+		try:
+			return np.array(values, dtype=np.int64)
+		except OverflowError:
+			return np.array(values, dtype=object)
+	if isinstance(values, array.array):
+		return values
+	try:
+		return array.array("q", values)
+	except OverflowError:
+		return values
+
+def split_seconds(ts, denominator=DEFAULT_DENOMINATOR) -> tuple[int, int]:
+	"Splits a timestamp into whole seconds (floored) and sub-second ticks of 1/denominator seconds, rounding to the nearest tick."
+	if isinstance(ts, int):
+		return ts, 0
+	ts = fractions.Fraction(ts)
+	seconds = math.floor(ts)
+	ticks = round((ts - seconds) * denominator)
+	if ticks >= denominator:
+		seconds += 1
+		ticks -= denominator
+	return seconds, ticks
+
+def fixed_seconds(delta) -> fractions.Fraction | int:
+	"Returns the exact length in seconds of the fixed-length (day and smaller) part of a TimeDelta."
+	return (((delta.days * 24) + delta.hours) * 60 + delta.minutes) * 60 + delta.seconds + delta.fraction
+
+def split_delta(delta, denominator=DEFAULT_DENOMINATOR) -> tuple[int, int, int]:
+	"Splits a `TimeDelta`, `datetime.timedelta` or number of seconds into whole calendar months, whole seconds (floored) and sub-second ticks."
+	if isinstance(delta, TimeDelta):
+		months = delta.years * 12 + delta.months
+		if months % 1:
+			# Fractional calendar units spill over into days and smaller
+			years, months, days, hours, minutes, seconds, fraction = delta._normal_values()
+			months = years * 12 + months
+			fixed = (((days * 24) + hours) * 60 + minutes) * 60 + seconds + fraction
+		else:
+			fixed = fixed_seconds(delta)
+		return (int(months), *split_seconds(fixed, denominator))
+	if isinstance(delta, datetime.timedelta):
+		return (0, *split_seconds(fractions.Fraction(delta.days * 86400 + delta.seconds) + fractions.Fraction(delta.microseconds, 10 ** 6), denominator))
+	return (0, *split_seconds(delta, denominator))
+
+def max_abs(values) -> int:
+	"Returns the largest absolute value in an integer scalar or numpy column."
+	if isinstance(values, int):
+		return abs(values)
+	if not len(values):
+		return 0
+	return max(-int(values.min()), int(values.max()))
+
+def carry_add(seconds, ticks, other_seconds, other_ticks, denominator, backend, sign=1):
+	"Adds (or with `sign=-1`, subtracts) two sets of (seconds, ticks) columns, either of which may be a pair of scalars, carrying between ticks and seconds; int64 columns are widened to arbitrary precision where the result could overflow."
+	if backend == "numpy":
+		np = get_numpy()
+		if not isinstance(other_seconds, int) and other_seconds.dtype == object or max_abs(seconds) + max_abs(other_seconds) + 1 > INT64_MAX:
+			seconds = seconds.astype(object)
+		t = ticks + other_ticks if sign > 0 else ticks - other_ticks
+		carry = t // denominator
+		t = t % denominator
+		if seconds.dtype == object:
+			carry = carry.astype(object)
+		return (seconds + other_seconds if sign > 0 else seconds - other_seconds) + carry, t
+	if isinstance(other_seconds, int):
+		other_seconds, other_ticks = itertools.repeat(other_seconds), itertools.repeat(other_ticks)
+	s, t = [], []
+	for a, b, c, d in zip(seconds, ticks, other_seconds, other_ticks):
+		carry, y = divmod(b + d * sign, denominator)
+		s.append(a + c * sign + carry)
+		t.append(y)
+	return s, t
+
+
+class DynamicDTArray:
+	"""A columnar array of `DynamicDT` instants.
+	Each instant is stored as a whole number of seconds since the unix epoch (floored), plus a count of sub-second ticks of `1/denominator` seconds, plus an index into a small table of timezones. Columns are int64 where every value fits, falling back to arbitrary-precision ints for instants beyond roughly ±292 billion years. With the numpy backend the columns are numpy arrays and all operations are vectorised; otherwise they are `array.array` or list columns processed in plain Python loops, which is still far cheaper than per-object `Fraction` arithmetic.
+	Sub-second precision is limited to the chosen denominator (nanoseconds by default); values are rounded to the nearest tick on the way in.
+	"""
+
+	__slots__ = ("seconds", "ticks", "tz_codes", "timezones", "denominator", "backend")
+	__hash__ = None
+
+	def __init__(self, seconds, ticks, tz_codes, timezones, denominator=DEFAULT_DENOMINATOR, backend=None):
+		self.backend = backend = resolve_backend(backend)
+		self.seconds = int_column(seconds, backend)
+		self.ticks = int_column(ticks, backend)
+		if backend == "numpy" and denominator > 1 << 62:
+			# Leave headroom for adding two tick counts without overflowing int64
+			self.ticks = self.ticks.astype(object)
+		self.tz_codes = int_column(tz_codes, backend)
+		self.timezones = list(timezones)
+		self.denominator = denominator
+
+	@classmethod
+	def from_datetimes(cls, values, denominator=DEFAULT_DENOMINATOR, backend=None):
+		"Builds an array from an iterable of `DynamicDT` (or `datetime.datetime`) objects."
+		seconds, ticks, tz_codes = [], [], []
+		timezones, codes = [], {}
+		for dt in values:
+			if not isinstance(dt, DynamicDT):
+				dt = DynamicDT.fromdatetime(dt)
+			s, t = split_seconds(dt.timestamp_exact(), denominator)
+			seconds.append(s)
+			ticks.append(t)
+			tz = dt.tzinfo
+			try:
+				code = codes[tz]
+			except KeyError:
+				code = codes[tz] = len(timezones)
+				timezones.append(tz)
+			tz_codes.append(code)
+		return cls(seconds, ticks, tz_codes, timezones, denominator=denominator, backend=backend)
+
+	@classmethod
+	def from_timestamps(cls, timestamps, tz=datetime.timezone.utc, denominator=DEFAULT_DENOMINATOR, backend=None):
+		"Builds an array from an iterable of unix timestamps (ints, floats or Fractions), all in a single timezone."
+		seconds, ticks = [], []
+		for ts in timestamps:
+			s, t = split_seconds(ts, denominator)
+			seconds.append(s)
+			ticks.append(t)
+		return cls(seconds, ticks, [0] * len(seconds), [tz], denominator=denominator, backend=backend)
+
+	def _new(self, seconds, ticks, tz_codes=None, timezones=None):
+		return self.__class__(seconds, ticks, self.tz_codes if tz_codes is None else tz_codes, self.timezones if timezones is None else timezones, denominator=self.denominator, backend=self.backend)
+
+	def __len__(self):
+		return len(self.seconds)
+
+	def __repr__(self):
+		items = [self[i].as_time() for i in range(min(len(self), 6))]
+		if len(self) > 6:
+			items.append("...")
+		return f"{self.__class__.__name__}({items!r}, backend={self.backend!r})"
+
+	def timestamp_exact(self, i) -> fractions.Fraction | int:
+		"Returns the exact unix timestamp of the i-th element."
+		s, t = int(self.seconds[i]), int(self.ticks[i])
+		return fractions.Fraction(s * self.denominator + t, self.denominator) if t else s
+
+	def timestamps(self) -> list:
+		"Returns the exact unix timestamps of all elements."
+		return [self.timestamp_exact(i) for i in range(len(self))]
+
+	def __getitem__(self, k):
+		if isinstance(k, slice):
+			return self._new(self.seconds[k], self.ticks[k], self.tz_codes[k])
+		if k < 0:
+			k += len(self)
+		if not 0 <= k < len(self):
+			raise IndexError(k)
+		return DynamicDT.fromtimestamp(self.timestamp_exact(k), tz=self.timezones[int(self.tz_codes[k])])
+
+	def __iter__(self):
+		for i in range(len(self)):
+			yield self[i]
+
+	def to_list(self) -> list:
+		"Materialises every element as a `DynamicDT`."
+		return list(self)
+
+	def take(self, indices):
+		"Returns a new array containing the elements at the given indices, in order."
+		if self.backend == "numpy":
+			np = get_numpy()
+			indices = np.asarray(indices, dtype=np.intp)
+			return self._new(self.seconds[indices], self.ticks[indices], self.tz_codes[indices])
+		indices = list(indices)
+		return self._new([self.seconds[i] for i in indices], [self.ticks[i] for i in indices], [self.tz_codes[i] for i in indices])
+
+	def argsort(self):
+		"Returns the indices that would sort the array chronologically (stable)."
+		if self.backend == "numpy":
+			np = get_numpy()
+			if self.seconds.dtype == object:
+				return np.array(sorted(range(len(self)), key=lambda i: (self.seconds[i], self.ticks[i])), dtype=np.intp)
+			return np.lexsort((self.ticks, self.seconds))
+		seconds, ticks = self.seconds, self.ticks
+		return sorted(range(len(self)), key=lambda i: (seconds[i], ticks[i]))
+
+	def sort(self):
+		"Returns a chronologically sorted copy of the array."
+		return self.take(self.argsort())
+
+	def _offset_fallback(self, i, tz) -> int:
+		# Naive values and zones without an OffsetTable are left to the element itself
+		fixed = tz.utcoffset(None) if tz is not None else None
+		if fixed is not None:
+			return round(fixed.total_seconds())
+		dt = self[i]
+		return (dt._dt.replace(tzinfo=None) - EPOCH) // datetime.timedelta(seconds=1) + dt.offset * YEAR - int(self.seconds[i])
+
+	def utc_offsets(self):
+		"Returns the UTC offset in seconds of every element in its own timezone. Zones with an `OffsetTable` are resolved with one binary search per element (vectorised with numpy), rather than constructing and localising a datetime for each."
+		n = len(self)
+		np = get_numpy() if self.backend == "numpy" else None
+		out = np.zeros(n, dtype=np.int64) if np else [0] * n
+		for code, tz in enumerate(self.timezones):
+			if np:
+				indices = np.arange(n) if len(self.timezones) == 1 else np.flatnonzero(self.tz_codes == code)
+			else:
+				indices = range(n) if len(self.timezones) == 1 else [i for i, c in enumerate(self.tz_codes) if c == code]
+			if not len(indices):
+				continue
+			if not hasattr(tz, "_utc_transition_times"):
+				for i in indices:
+					out[i] = self._offset_fallback(int(i), tz)
+				continue
+			table = get_offset_table(tz)
+			if not np:
+				for i in indices:
+					out[i] = table.lookup(self.seconds[i])[0]
+				continue
+			seconds = self.seconds[indices]
+			if not table.cycle_built and int(seconds.max()) > table.transitions[-1]:
+				table.build_cycle()
+			history = np.array(table.transitions[1:], dtype=np.int64)
+			# Arbitrary-precision values are clamped, as anything beyond int64 is outside the history anyway
+			clamped = seconds if seconds.dtype != object else np.array([min(max(x, INT64_MIN), INT64_MAX) for x in seconds], dtype=np.int64)
+			result = np.array(table.offsets, dtype=np.int64)[np.searchsorted(history, clamped, "right")]
+			if table.cycle_start is not None:
+				later = seconds >= table.cycle_start
+				if later.any():
+					r = ((seconds[later] - table.cycle_start) % ERA).astype(np.int64)
+					positions = np.searchsorted(np.array(table.cycle_transitions, dtype=np.int64), r, "right") - 1
+					result[later] = np.array(table.cycle_offsets, dtype=np.int64)[positions]
+			out[indices] = result
+		return out
+
+	def local_seconds(self):
+		"Returns the wall-clock time of every element in its own timezone, as seconds since 1970-01-01 00:00 local time; e.g. `local_seconds() // 86400` buckets elements by local calendar day."
+		offsets = self.utc_offsets()
+		if self.backend == "numpy":
+			return self.seconds + offsets
+		return [s + o for s, o in zip(self.seconds, offsets)]
+
+	def cast(self, tz=datetime.timezone.utc):
+		"Returns the same instants in a different timezone; only the timezone column changes."
+		return self._new(self.seconds, self.ticks, [0] * len(self), [tz])
+	astimezone = cast
+
+	def _shift(self, seconds, ticks):
+		"Adds a fixed amount of whole seconds and ticks to every element, carrying between the columns."
+		return self._new(*carry_add(self.seconds, self.ticks, seconds, ticks, self.denominator, self.backend))
+
+	def __add__(self, other):
+		if isinstance(other, TimeDelta):
+			out = self
+			if other.years or other.months:
+				# Calendar units depend on each element's own date, so are applied elementwise
+				calendar = TimeDelta(years=other.years, months=other.months)
+				out = self.from_datetimes((dt + calendar for dt in self), denominator=self.denominator, backend=self.backend)
+				out = out._new(out.seconds, out.ticks, self.tz_codes, self.timezones)
+			return out._shift(*split_seconds(fixed_seconds(other), self.denominator))
+		if isinstance(other, datetime.timedelta):
+			return self._shift(*split_seconds(fractions.Fraction(other.days * 86400 + other.seconds) + fractions.Fraction(other.microseconds, 10 ** 6), self.denominator))
+		if isinstance(other, (int, float, fractions.Fraction)):
+			return self._shift(*split_seconds(other, self.denominator))
+		return NotImplemented
+	__radd__ = __add__
+
+	def __sub__(self, other):
+		if isinstance(other, (TimeDelta, datetime.timedelta, int, float, fractions.Fraction)):
+			return self + -other
+		if isinstance(other, (DynamicDTArray, datetime.datetime)):
+			# Elapsed time between instants, as exact seconds
+			s2, t2 = self._keys(other)
+			s, t = carry_add(self.seconds, self.ticks, s2, t2, self.denominator, self.backend, sign=-1)
+			return TimeDeltaArray([0] * len(self), s, t, denominator=self.denominator, backend=self.backend)
+		return NotImplemented
+
+	def _keys(self, other):
+		"Returns the (seconds, ticks) columns of `other` in this array's denominator, broadcasting scalars."
+		if isinstance(other, DynamicDTArray):
+			if len(other) != len(self):
+				raise ValueError(f"Length mismatch: {len(self)} != {len(other)}")
+			if other.denominator == self.denominator:
+				return other.seconds, other.ticks
+			pairs = [split_seconds(other.timestamp_exact(i), self.denominator) for i in range(len(other))]
+			return int_column([p[0] for p in pairs], self.backend), int_column([p[1] for p in pairs], self.backend)
+		if isinstance(other, datetime.datetime):
+			if not isinstance(other, DynamicDT):
+				other = DynamicDT.fromdatetime(other)
+			other = other.timestamp_exact()
+		if isinstance(other, (int, float, fractions.Fraction)):
+			s, t = split_seconds(other, self.denominator)
+			if self.backend == "numpy":
+				return s, t
+			n = len(self)
+			return [s] * n, [t] * n
+		return NotImplemented
+
+	def _compare(self, other, op):
+		keys = self._keys(other)
+		if keys is NotImplemented:
+			return NotImplemented
+		s2, t2 = keys
+		s1, t1 = self.seconds, self.ticks
+		if self.backend == "numpy":
+			match op:
+				case "eq":
+					return (s1 == s2) & (t1 == t2)
+				case "ne":
+					return (s1 != s2) | (t1 != t2)
+				case "lt":
+					return (s1 < s2) | ((s1 == s2) & (t1 < t2))
+				case "le":
+					return (s1 < s2) | ((s1 == s2) & (t1 <= t2))
+				case "gt":
+					return (s1 > s2) | ((s1 == s2) & (t1 > t2))
+				case "ge":
+					return (s1 > s2) | ((s1 == s2) & (t1 >= t2))
+		match op:
+			case "eq":
+				return [a == c and b == d for a, b, c, d in zip(s1, t1, s2, t2)]
+			case "ne":
+				return [a != c or b != d for a, b, c, d in zip(s1, t1, s2, t2)]
+			case "lt":
+				return [(a, b) < (c, d) for a, b, c, d in zip(s1, t1, s2, t2)]
+			case "le":
+				return [(a, b) <= (c, d) for a, b, c, d in zip(s1, t1, s2, t2)]
+			case "gt":
+				return [(a, b) > (c, d) for a, b, c, d in zip(s1, t1, s2, t2)]
+			case "ge":
+				return [(a, b) >= (c, d) for a, b, c, d in zip(s1, t1, s2, t2)]
+
+	def __eq__(self, other):
+		return self._compare(other, "eq")
+
+	def __ne__(self, other):
+		return self._compare(other, "ne")
+
+	def __lt__(self, other):
+		return self._compare(other, "lt")
+
+	def __le__(self, other):
+		return self._compare(other, "le")
+
+	def __gt__(self, other):
+		return self._compare(other, "gt")
+
+	def __ge__(self, other):
+		return self._compare(other, "ge")
+
+
+class TimeDeltaArray:
+	"""A columnar array of `TimeDelta` durations.
+	Each duration is stored as a whole number of calendar months (years count as 12 months), plus its exact fixed-length part as whole seconds (floored) and sub-second ticks of `1/denominator` seconds, in the same column types and backends as `DynamicDTArray`. Calendar months are kept separate because their length is only nominal; `total_seconds` and ordering use the same nominal month length as `TimeDelta.total_seconds`.
+	"""
+
+	__slots__ = ("months", "seconds", "ticks", "denominator", "backend")
+	__hash__ = None
+
+	def __init__(self, months, seconds, ticks, denominator=DEFAULT_DENOMINATOR, backend=None):
+		self.backend = backend = resolve_backend(backend)
+		self.months = int_column(months, backend)
+		self.seconds = int_column(seconds, backend)
+		self.ticks = int_column(ticks, backend)
+		if backend == "numpy" and denominator > 1 << 62:
+			self.ticks = self.ticks.astype(object)
+		self.denominator = denominator
+
+	@classmethod
+	def from_timedeltas(cls, values, denominator=DEFAULT_DENOMINATOR, backend=None):
+		"Builds an array from an iterable of `TimeDelta` or `datetime.timedelta` objects, or numbers of seconds."
+		months, seconds, ticks = [], [], []
+		for delta in values:
+			m, s, t = split_delta(delta, denominator)
+			months.append(m)
+			seconds.append(s)
+			ticks.append(t)
+		return cls(months, seconds, ticks, denominator=denominator, backend=backend)
+
+	@classmethod
+	def between(cls, starts, ends, denominator=DEFAULT_DENOMINATOR, backend=None):
+		"Builds the durations `ends[i] - starts[i]` of two equal-length sequences of `DynamicDT` objects (or `DynamicDTArray`s) in one call. Unlike `DynamicDT.__sub__`, no calendar breakdown is made; each duration is the exact elapsed time in seconds."
+		if not isinstance(starts, DynamicDTArray):
+			starts = DynamicDTArray.from_datetimes(starts, denominator=denominator, backend=backend)
+		if not isinstance(ends, DynamicDTArray):
+			ends = DynamicDTArray.from_datetimes(ends, denominator=denominator, backend=backend)
+		return ends - starts
+
+	def _new(self, months, seconds, ticks):
+		return self.__class__(months, seconds, ticks, denominator=self.denominator, backend=self.backend)
+
+	def __len__(self):
+		return len(self.seconds)
+
+	def __repr__(self):
+		items = [self[i].to_short() for i in range(min(len(self), 6))]
+		if len(self) > 6:
+			items.append("...")
+		return f"{self.__class__.__name__}({items!r}, backend={self.backend!r})"
+
+	def __getitem__(self, k):
+		if isinstance(k, slice):
+			return self._new(self.months[k], self.seconds[k], self.ticks[k])
+		if k < 0:
+			k += len(self)
+		if not 0 <= k < len(self):
+			raise IndexError(k)
+		return self._delta(int(self.months[k]), int(self.seconds[k]), int(self.ticks[k]))
+
+	def _delta(self, months, seconds, ticks):
+		return TimeDelta(months=months, seconds=seconds, fraction=fractions.Fraction(ticks, self.denominator)).normalise()
+
+	def __iter__(self):
+		for i in range(len(self)):
+			yield self[i]
+
+	def to_list(self) -> list:
+		"Materialises every element as a `TimeDelta`."
+		return list(self)
+
+	def total_seconds(self):
+		"Returns the (nominal, for calendar months) length of every element in seconds, as floats."
+		if self.backend == "numpy":
+			np = get_numpy()
+			return self.months.astype(np.float64) * float(MONTH_SECONDS) + self.seconds.astype(np.float64) + self.ticks.astype(np.float64) / self.denominator
+		month_seconds = float(MONTH_SECONDS)
+		return [m * month_seconds + s + t / self.denominator for m, s, t in zip(self.months, self.seconds, self.ticks)]
+
+	def _exact_keys(self) -> list:
+		"Returns exact integer sort keys for every element, in units of `1/(MONTH_SECONDS.denominator * denominator)` seconds."
+		n, q = MONTH_SECONDS.numerator * self.denominator, MONTH_SECONDS.denominator
+		return [m * n + q * (s * self.denominator + t) for m, s, t in zip(map(int, self.months), map(int, self.seconds), map(int, self.ticks))]
+
+	def _extreme(self, reverse=False):
+		if not len(self):
+			raise ValueError(f"{'max' if reverse else 'min'}() of an empty {self.__class__.__name__}")
+		if self.backend == "numpy" and self.seconds.dtype != object and not self.months.any():
+			# Fixed-length durations only; compare seconds first, then ticks among ties
+			np = get_numpy()
+			best = self.seconds.max() if reverse else self.seconds.min()
+			candidates = np.flatnonzero(self.seconds == best)
+			ticks = self.ticks[candidates]
+			i = int(candidates[int(ticks.argmax() if reverse else ticks.argmin())])
+		else:
+			keys = self._exact_keys()
+			i = (max if reverse else min)(range(len(keys)), key=keys.__getitem__)
+		return self[i]
+
+	def min(self) -> TimeDelta:
+		"Returns the shortest duration."
+		return self._extreme()
+
+	def max(self) -> TimeDelta:
+		"Returns the longest duration."
+		return self._extreme(reverse=True)
+
+	def _sums(self) -> tuple[int, int, int]:
+		if self.backend == "numpy":
+			np = get_numpy()
+			out = []
+			for column in (self.months, self.seconds, self.ticks):
+				if column.dtype != object and max_abs(column) * len(column) <= INT64_MAX:
+					out.append(int(np.sum(column)))
+				else:
+					out.append(sum(column.tolist()))
+			return tuple(out)
+		return sum(self.months), sum(self.seconds), sum(self.ticks)
+
+	def sum(self) -> TimeDelta:
+		"Returns the exact total of all durations."
+		months, seconds, ticks = self._sums()
+		carry, ticks = divmod(ticks, self.denominator)
+		return self._delta(months, seconds + carry, ticks)
+
+	def mean(self) -> TimeDelta:
+		"Returns the exact mean of all durations; fractional calendar months are spread into days and smaller as in `TimeDelta.normalise`."
+		if not len(self):
+			raise ValueError(f"mean() of an empty {self.__class__.__name__}")
+		months, seconds, ticks = self._sums()
+		return TimeDelta(months=fractions.Fraction(months, len(self)), fraction=fractions.Fraction(seconds * self.denominator + ticks, self.denominator * len(self))).normalise()
+
+	def __neg__(self):
+		if self.backend == "numpy":
+			zeros = self.seconds * 0
+			months = -self.months
+		else:
+			zeros = [0] * len(self)
+			months = [-m for m in self.months]
+		return self._new(months, *carry_add(zeros, zeros, self.seconds, self.ticks, self.denominator, self.backend, sign=-1))
+
+	def __add__(self, other):
+		if isinstance(other, TimeDeltaArray):
+			if len(other) != len(self):
+				raise ValueError(f"Length mismatch: {len(self)} != {len(other)}")
+			if other.denominator != self.denominator:
+				other = self.from_timedeltas(other, denominator=self.denominator, backend=self.backend)
+			months = self.months + other.months if self.backend == "numpy" else [a + b for a, b in zip(self.months, other.months)]
+			return self._new(months, *carry_add(self.seconds, self.ticks, other.seconds, other.ticks, self.denominator, self.backend))
+		if isinstance(other, (TimeDelta, datetime.timedelta, int, float, fractions.Fraction)):
+			m, s, t = split_delta(other, self.denominator)
+			months = self.months
+			if m:
+				months = months + m if self.backend == "numpy" else [x + m for x in months]
+			return self._new(months, *carry_add(self.seconds, self.ticks, s, t, self.denominator, self.backend))
+		return NotImplemented
+	__radd__ = __add__
+
+	def __sub__(self, other):
+		if isinstance(other, (TimeDeltaArray, TimeDelta, datetime.timedelta, int, float, fractions.Fraction)):
+			return self + -other
+		return NotImplemented
+
+	def _format(self, method, *args) -> list:
+		# Durations in reports repeat often, so each distinct value is only formatted once
+		cache = {}
+		out = []
+		for key in zip(map(int, self.months), map(int, self.seconds), map(int, self.ticks)):
+			try:
+				text = cache[key]
+			except KeyError:
+				text = cache[key] = getattr(self._delta(*key), method)(*args)
+			out.append(text)
+		return out
+
+	def to_short(self) -> list:
+		"Formats every element with `TimeDelta.to_short`."
+		return self._format("to_short")
+
+	def to_string(self, precision=9) -> list:
+		"Formats every element with `TimeDelta.to_string`."
+		return self._format("to_string", precision)
@@ -0,0 +1,10 @@
+"Regenerates the prebuilt timezone alias index shipped with the package. Run `python -m dynamic_dt.build_index` after upgrading pytz or editing wikipedia_data.txt."
+import pytz
+from . import TIMEZONE_INDEX_PATH, save_timezone_index
+
+def main():
+	index = save_timezone_index()
+	print(f"Wrote {len(index)} timezone aliases (pytz {pytz.__version__}) to {TIMEZONE_INDEX_PATH}")
+
+if __name__ == "__main__":
+	main()
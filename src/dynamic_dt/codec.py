@@ -0,0 +1,207 @@
+"""A compact, versioned binary encoding of `DynamicDT` and `TimeDelta` values, for storing large numbers of them.
+Layout of an encoded buffer (varints are unsigned LEB128; signed values are zigzag-encoded first):
+	version (1 byte), varint timezone count, then each timezone name as a varint length and UTF-8 bytes, then varint record count, then the records.
+	DynamicDT record: flags (kind 0, plus HAS_FRACTION and HAS_TIMEZONE), signed era (whole `ERA`s since the epoch), seconds into the era, [fraction numerator, denominator], [timezone index].
+	TimeDelta record: flags (kind 1, or 2 for `FrozenTimeDelta`, plus HAS_FRACTION if any field is not an integer), a byte with a bit set for each nonzero field, then for each of those a signed numerator, [and its denominator, if HAS_FRACTION].
+Timezones are stored by name (as in `DynamicDT.__getstate__`) once per buffer, and resolved once per buffer when decoding.
+"""
+import datetime
+import fractions
+import functools
+from . import DynamicDT, TimeDelta, FrozenTimeDelta, ERA, ERA_YEARS, get_name, get_timezone, split_era
+
+CODEC_VERSION = 1
+KIND_DATETIME = 0
+KIND_DELTA = 1
+KIND_FROZEN_DELTA = 2
+KIND_MASK = 3
+HAS_FRACTION = 4
+HAS_TIMEZONE = 8
+
+
+def write_varint(out, n):
+	"Appends a non-negative integer to a bytearray as an unsigned LEB128 varint."
+	while n > 0x7f:
+		out.append(n & 0x7f | 0x80)
+		n >>= 7
+	out.append(n)
+
+def write_signed(out, n):
+	"Appends an integer of any sign to a bytearray as a zigzag-encoded varint."
+	write_varint(out, n << 1 if n >= 0 else (~n << 1) | 1)
+
+def read_varint(buf, i) -> tuple[int, int]:
+	"Reads an unsigned varint from a buffer of bytes at index `i`, returning its value and the index past it."
+	b = buf[i]
+	if b < 0x80:
+		return b, i + 1
+	n = b & 0x7f
+	shift = 7
+	while True:
+		i += 1
+		b = buf[i]
+		n |= (b & 0x7f) << shift
+		if b < 0x80:
+			return n, i + 1
+		shift += 7
+
+def read_signed(buf, i) -> tuple[int, int]:
+	"Reads a zigzag-encoded varint from a buffer of bytes at index `i`, returning its value and the index past it."
+	n, i = read_varint(buf, i)
+	return (~(n >> 1) if n & 1 else n >> 1), i
+
+@functools.lru_cache(maxsize=256)
+def load_timezone(name):
+	"Resolves a stored timezone name, memoised since buffers tend to share a handful of zones."
+	return get_timezone(name)
+
+def from_parts(cls, whole, f, tzinfo):
+	"Equivalent to `cls.fromtimestamp(whole + f, tzinfo)` for whole seconds and a fraction in [0, 1), filling in the slots directly rather than going through the constructor."
+	offs, dt = split_era(whole, tzinfo)
+	if dt.year < 2000:
+		# The wrapped datetime is kept in the years 2000-2399
+		dt = dt.replace(year=dt.year + ERA_YEARS)
+		offs -= ERA_YEARS
+	self = datetime.datetime.__new__(cls, 1, 1, 1)
+	self._dt = dt
+	self._offset = offs
+	self._fraction = 0
+	self._ts = self._key = self._ticks = self.parsed_as = None
+	if f:
+		if cls.tick_denominator:
+			self.set_fraction(f)
+		else:
+			self._fraction = f
+			self._ts = whole + f
+	elif not cls.tick_denominator:
+		self._ts = whole
+	return self
+
+
+def dumps_many(objects) -> bytes:
+	"""Encodes any number of `DynamicDT` and `TimeDelta` values into a single buffer, storing each distinct timezone once.
+	Args:
+		objects (Iterable[DynamicDT | TimeDelta]): The values to encode, which may be mixed.
+	Returns:
+		bytes: The encoded buffer, readable by `loads_many`.
+	"""
+	zones = {}
+	records = bytearray()
+	count = 0
+	for obj in objects:
+		count += 1
+		if isinstance(obj, DynamicDT):
+			ts = obj.timestamp_exact()
+			if type(ts) is int:
+				whole, f = ts, 0
+			else:
+				# Timestamps given to `fromtimestamp` as floats are kept as they are
+				ts = fractions.Fraction(ts)
+				whole, f = divmod(ts.numerator, ts.denominator)
+			era, seconds = divmod(whole, ERA)
+			tzinfo = obj.tzinfo
+			records.append(KIND_DATETIME | (HAS_FRACTION if f else 0) | (HAS_TIMEZONE if tzinfo is not None else 0))
+			write_signed(records, era)
+			write_varint(records, seconds)
+			if f:
+				write_varint(records, f)
+				write_varint(records, ts.denominator)
+			if tzinfo is not None:
+				write_varint(records, zones.setdefault(get_name(tzinfo), len(zones)))
+		elif isinstance(obj, TimeDelta):
+			values = obj._values()
+			for v in values:
+				if type(v) is not int and not isinstance(v, fractions.Fraction):
+					raise ValueError(f"Cannot encode non-finite TimeDelta field {v!r}.")
+			fractional = any(type(v) is not int for v in values)
+			records.append((KIND_FROZEN_DELTA if isinstance(obj, FrozenTimeDelta) else KIND_DELTA) | (HAS_FRACTION if fractional else 0))
+			records.append(sum(1 << k for k, v in enumerate(values) if v))
+			for v in values:
+				if v:
+					if fractional:
+						v = fractions.Fraction(v)
+						write_signed(records, v.numerator)
+						write_varint(records, v.denominator)
+					else:
+						write_signed(records, v)
+		else:
+			raise TypeError(f"Cannot encode {obj.__class__.__name__} objects.")
+	out = bytearray((CODEC_VERSION,))
+	write_varint(out, len(zones))
+	for name in zones:
+		name = name.encode("utf-8")
+		write_varint(out, len(name))
+		out += name
+	write_varint(out, count)
+	out += records
+	return bytes(out)
+
+def iter_loads(buffer, cls=DynamicDT):
+	"""Lazily decodes a buffer produced by `dumps_many`, reading directly from the given memory without copying it.
+	Args:
+		buffer (bytes | bytearray | memoryview | mmap.mmap): The encoded buffer, or any object supporting the buffer protocol.
+		cls (type): The `DynamicDT` subclass to decode datetimes as.
+	Yields:
+		DynamicDT | TimeDelta: The decoded values, in order.
+	"""
+	buf = memoryview(buffer)
+	if buf.format != "B" or buf.ndim != 1:
+		buf = buf.cast("B")
+	if not len(buf) or buf[0] != CODEC_VERSION:
+		raise ValueError(f"Unsupported encoding version {buf[0] if len(buf) else None!r}.")
+	n, i = read_varint(buf, 1)
+	zones = []
+	for _ in range(n):
+		size, i = read_varint(buf, i)
+		zones.append(load_timezone(str(buf[i:i + size], "utf-8")))
+		i += size
+	count, i = read_varint(buf, i)
+	for _ in range(count):
+		flags = buf[i]
+		i += 1
+		kind = flags & KIND_MASK
+		if kind == KIND_DATETIME:
+			era, i = read_signed(buf, i)
+			seconds, i = read_varint(buf, i)
+			f = 0
+			if flags & HAS_FRACTION:
+				numerator, i = read_varint(buf, i)
+				denominator, i = read_varint(buf, i)
+				f = fractions.Fraction(numerator, denominator)
+			tzinfo = None
+			if flags & HAS_TIMEZONE:
+				index, i = read_varint(buf, i)
+				tzinfo = zones[index]
+			yield from_parts(cls, era * ERA + seconds, f, tzinfo)
+		elif kind == KIND_DELTA or kind == KIND_FROZEN_DELTA:
+			mask = buf[i]
+			i += 1
+			values = [0] * 7
+			for k in range(7):
+				if mask >> k & 1:
+					v, i = read_signed(buf, i)
+					if flags & HAS_FRACTION:
+						denominator, i = read_varint(buf, i)
+						if denominator != 1:
+							v = fractions.Fraction(v, denominator)
+					values[k] = v
+			yield (FrozenTimeDelta if kind == KIND_FROZEN_DELTA else TimeDelta)._from_values(values)
+		else:
+			raise ValueError(f"Unknown record kind {kind} at offset {i - 1}.")
+
+def loads_many(buffer, cls=DynamicDT) -> list:
+	"Decodes every value in a buffer produced by `dumps_many`; see `iter_loads`."
+	return list(iter_loads(buffer, cls=cls))
+
+def loads_one(buffer, cls):
+	"Decodes a buffer holding exactly one value, as produced by `to_bytes`, as an instance of `cls`."
+	is_datetime = issubclass(cls, DynamicDT)
+	found = loads_many(buffer, cls=cls if is_datetime else DynamicDT)
+	if len(found) != 1:
+		raise ValueError(f"Expected one encoded value, found {len(found)}.")
+	obj = found[0]
+	if not isinstance(obj, DynamicDT if is_datetime else TimeDelta):
+		raise TypeError(f"Expected an encoded {cls.__name__}, found {obj.__class__.__name__}.")
+	if not is_datetime and type(obj) is not cls:
+		obj = cls._from_values(obj._values())
+	return obj
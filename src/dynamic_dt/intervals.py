@@ -0,0 +1,188 @@
+"An index of `DynamicDT` intervals answering stabbing and overlap queries on exact precomputed keys."
+import bisect
+import datetime
+import itertools
+from . import DynamicDT
+
+# Intervals per block; blocks are split when they reach twice this
+BLOCK_SIZE = 256
+
+
+def time_key(dt) -> tuple:
+	"Returns the exact `(whole_seconds, fraction)` key ordering a `DynamicDT` or `datetime.datetime` chronologically, as used by `DynamicDT` comparisons."
+	if isinstance(dt, DynamicDT):
+		return dt.sort_key()
+	if isinstance(dt, datetime.datetime):
+		return DynamicDT.fromdatetime(dt).sort_key()
+	raise TypeError(f"Expected a DynamicDT or datetime, got {dt.__class__.__name__}.")
+
+
+class IntervalIndex:
+	"""A mutable collection of half-open `[start, end)` intervals of `DynamicDT`s, each with an optional value, supporting fast "which intervals contain this instant" and "which intervals overlap this range" queries.
+	Intervals are kept sorted by start in blocks, each recording the latest end among its intervals in a max segment tree, so that queries skip every block that starts too late, and jump over any run of blocks that all end too early in logarithmic time. Endpoints are reduced once to exact `DynamicDT.sort_key` keys on insertion; queries never recompute timestamps, and fractional seconds and dates in any era compare exactly.
+	Args:
+		intervals (Iterable[tuple]): `(start, end)` or `(start, end, value)` tuples to bulk load, sorting them once.
+		block_size (int): The number of intervals per block.
+	"""
+
+	def __init__(self, intervals=(), block_size=BLOCK_SIZE):
+		self.block_size = block_size
+		self.counter = itertools.count()
+		self.build(sorted(self.entry(*interval) for interval in intervals))
+
+	def __repr__(self):
+		return f"{self.__class__.__name__}({len(self)} intervals)"
+
+	def __len__(self):
+		return self.size
+
+	def __iter__(self):
+		"Yields every `(start, end, value)` interval, ordered by start and then end."
+		for block in self.blocks:
+			for entry in block:
+				yield entry[3:]
+
+	def entry(self, start, end, value=None) -> tuple:
+		# The insertion counter breaks ties between equal intervals, so that values are never compared
+		a, b = time_key(start), time_key(end)
+		if b < a:
+			raise ValueError(f"Interval ends before it starts: {start!r} > {end!r}.")
+		return a, b, next(self.counter), start, end, value
+
+	def build(self, entries):
+		"Replaces the contents with already sorted entries."
+		size = self.block_size
+		self.blocks = [entries[i:i + size] for i in range(0, len(entries), size)]
+		# The sort key of the first entry of each block, and its start alone
+		self.firsts = [block[0][:3] for block in self.blocks]
+		self.starts = [block[0][0] for block in self.blocks]
+		self.max_ends = [max(entry[1] for entry in block) for block in self.blocks]
+		self.size = len(entries)
+		self.build_tree()
+
+	def build_tree(self):
+		"Rebuilds the max segment tree over `max_ends`, after blocks are added or removed."
+		# Leaves start at index `leaves` and the children of node j are 2j and 2j+1; unused leaves hold (), which is less than every key
+		self.leaves = leaves = 1 << max(0, len(self.max_ends) - 1).bit_length()
+		tree = self.tree = [()] * (leaves * 2)
+		tree[leaves:leaves + len(self.max_ends)] = self.max_ends
+		for j in range(leaves - 1, 0, -1):
+			tree[j] = max(tree[j * 2], tree[j * 2 + 1])
+
+	def set_max_end(self, i, end):
+		"Records a new latest end for block `i`, updating its ancestors in the segment tree."
+		self.max_ends[i] = end
+		tree = self.tree
+		j = i + self.leaves
+		tree[j] = end
+		while j > 1:
+			j >>= 1
+			tree[j] = max(tree[j * 2], tree[j * 2 + 1])
+
+	def next_block(self, i, low) -> int:
+		"Returns the index of the first block from `i` onwards containing an interval ending after the key `low`, or the number of blocks if there is none."
+		if i >= len(self.blocks):
+			return len(self.blocks)
+		tree = self.tree
+		j = i + self.leaves
+		while tree[j] <= low:
+			# Climb while j is a right child, then move to the subtree immediately to its right
+			while j & 1:
+				j >>= 1
+			if not j:
+				return len(self.blocks)
+			j += 1
+		while j < self.leaves:
+			j *= 2
+			if tree[j] <= low:
+				j += 1
+		return j - self.leaves
+
+	def add(self, start, end, value=None):
+		"""Inserts an interval.
+		Args:
+			start (DynamicDT): The start of the interval, which it contains.
+			end (DynamicDT): The end of the interval, which it does not contain.
+			value (object, optional): Data returned alongside the interval by queries.
+		"""
+		entry = self.entry(start, end, value)
+		if not self.blocks:
+			self.build([entry])
+			return
+		i = max(0, bisect.bisect_right(self.firsts, entry[:3]) - 1)
+		block = self.blocks[i]
+		bisect.insort(block, entry)
+		self.firsts[i] = block[0][:3]
+		self.starts[i] = block[0][0]
+		if entry[1] > self.max_ends[i]:
+			self.set_max_end(i, entry[1])
+		self.size += 1
+		if len(block) >= self.block_size * 2:
+			half = len(block) // 2
+			self.blocks[i:i + 1] = block[:half], block[half:]
+			self.firsts[i:i + 1] = block[0][:3], block[half][:3]
+			self.starts[i:i + 1] = block[0][0], block[half][0]
+			self.max_ends[i:i + 1] = max(entry[1] for entry in block[:half]), max(entry[1] for entry in block[half:])
+			self.build_tree()
+
+	def update(self, intervals):
+		"Inserts many `(start, end)` or `(start, end, value)` intervals at once, re-sorting the whole index a single time."
+		entries = [entry for block in self.blocks for entry in block]
+		entries.extend(self.entry(*interval) for interval in intervals)
+		entries.sort()
+		self.build(entries)
+
+	def remove(self, start, end, value=None):
+		"Removes one interval with the given endpoints and value, raising ValueError if there is none."
+		key = (time_key(start), time_key(end))
+		i = max(0, bisect.bisect_left(self.firsts, key) - 1)
+		while i < len(self.blocks) and self.firsts[i][:2] <= key:
+			block = self.blocks[i]
+			j = bisect.bisect_left(block, key)
+			while j < len(block) and block[j][:2] == key:
+				if block[j][5] == value:
+					del block[j]
+					self.size -= 1
+					if block:
+						self.firsts[i] = block[0][:3]
+						self.starts[i] = block[0][0]
+						self.set_max_end(i, max(entry[1] for entry in block))
+					else:
+						del self.blocks[i], self.firsts[i], self.starts[i], self.max_ends[i]
+						self.build_tree()
+					return
+				j += 1
+			i += 1
+		raise ValueError(f"Interval not found: {start!r}, {end!r}, {value!r}.")
+
+	def scan(self, low, high, closed):
+		"Yields the intervals starting before `high` (or at it, if `closed`) and ending after `low`, given as keys."
+		stop = (bisect.bisect_right if closed else bisect.bisect_left)(self.starts, high)
+		i = self.next_block(0, low)
+		while i < stop:
+			for entry in self.blocks[i]:
+				if entry[0] > high or not closed and entry[0] == high:
+					break
+				if entry[1] > low:
+					yield entry[3:]
+			i = self.next_block(i + 1, low)
+
+	def at(self, instant):
+		"""Lazily yields the intervals containing an instant, i.e. with `start <= instant < end`.
+		Args:
+			instant (DynamicDT): The instant.
+		Yields:
+			tuple[DynamicDT, DynamicDT, object]: Each matching `(start, end, value)`, ordered by start.
+		"""
+		key = time_key(instant)
+		return self.scan(key, key, True)
+
+	def overlap(self, start, end):
+		"""Lazily yields the intervals overlapping the half-open range `[start, end)`, i.e. with `start < interval end` and `interval start < end`.
+		Args:
+			start (DynamicDT): The start of the range.
+			end (DynamicDT): The end of the range.
+		Yields:
+			tuple[DynamicDT, DynamicDT, object]: Each matching `(start, end, value)`, ordered by start.
+		"""
+		return self.scan(time_key(start), time_key(end), False)
@@ -0,0 +1,89 @@
+"Bulk lunar phase computation over many instants, and iteration over successive occurrences of a phase, in exact integer arithmetic."
+import datetime
+import fractions
+from . import DynamicDT, LUNATION_0, LUNATION_SECONDS, closest_lunar_phase, get_lunar_phase, lunar_phase_names, lunar_phase_ticks
+from .arrays import DynamicDTArray, get_numpy
+from .codec import from_parts
+
+# Lunation length in seconds as numerator / denominator; an integer timestamp t is (t - LUNATION_0) * LUNATION_DENOMINATOR % LUNATION_NUMERATOR units of 1/LUNATION_NUMERATOR lunations into its cycle
+LUNATION_NUMERATOR = LUNATION_SECONDS.numerator
+LUNATION_DENOMINATOR = LUNATION_SECONDS.denominator
+# Splits products into halves small enough for int64 multiplication modulo LUNATION_NUMERATOR
+MULMOD_SPLIT = 1 << 19
+
+
+def phase_units(seconds) -> int:
+	"Returns how far into its lunar cycle a whole unix second is, in units of `1/LUNATION_NUMERATOR` lunations."
+	return (seconds - LUNATION_0) * LUNATION_DENOMINATOR % LUNATION_NUMERATOR
+
+def phase_units_numpy(seconds):
+	"Vectorised `phase_units` over an int64 numpy array, exact and without overflowing."
+	np = get_numpy()
+	r = (seconds % LUNATION_NUMERATOR - LUNATION_0 % LUNATION_NUMERATOR) % LUNATION_NUMERATOR
+	high, low = np.divmod(r, MULMOD_SPLIT)
+	return (high * LUNATION_DENOMINATOR % LUNATION_NUMERATOR * MULMOD_SPLIT + low * LUNATION_DENOMINATOR) % LUNATION_NUMERATOR
+
+def exact_phase(value) -> fractions.Fraction:
+	"Returns the exact lunar phase of a `DynamicDT`, `datetime.datetime` or unix timestamp."
+	if isinstance(value, datetime.datetime):
+		return get_lunar_phase(value if isinstance(value, DynamicDT) else DynamicDT.fromdatetime(value))
+	if type(value) is int:
+		return lunar_phase_ticks(value)
+	if not isinstance(value, fractions.Fraction):
+		value = fractions.Fraction(value)
+	return lunar_phase_ticks(value.numerator, value.denominator)
+
+def lunar_phases(values, exact=True):
+	"""Computes the lunar phase of many instants at once, as fractions of the cycle from new moon (0) through full moon (1/2).
+	Every phase is found with a single integer reduction rather than a chain of `Fraction` divisions. A `DynamicDTArray` is read directly from its columns, and with `exact=False` on the numpy backend the whole computation is vectorised.
+	Args:
+		values (DynamicDTArray | Iterable): A `DynamicDTArray`, or `DynamicDT`s, `datetime.datetime`s or unix timestamps (ints, floats or Fractions), which may be mixed.
+		exact (bool): Whether to return exact Fractions. Otherwise floats are returned, still reduced exactly to the current cycle first so that they are accurate for any era.
+	Returns:
+		list[Fraction] | list[float] | numpy.ndarray: The phases, in order; a float64 numpy array for a numpy-backed array with `exact=False`.
+	"""
+	if isinstance(values, DynamicDTArray):
+		denominator = values.denominator
+		if exact:
+			return [lunar_phase_ticks(int(s) * denominator + int(t), denominator) for s, t in zip(values.seconds, values.ticks)]
+		if values.backend == "numpy" and values.seconds.dtype != object:
+			units = phase_units_numpy(values.seconds)
+			phases = (units + values.ticks * (LUNATION_DENOMINATOR / denominator)) / LUNATION_NUMERATOR
+			return phases % 1.0
+		return [(phase_units(int(s)) + int(t) * LUNATION_DENOMINATOR / denominator) / LUNATION_NUMERATOR % 1.0 for s, t in zip(values.seconds, values.ticks)]
+	phases = [exact_phase(value) for value in values]
+	return phases if exact else [float(phase) for phase in phases]
+
+def lunations(first, step=LUNATION_SECONDS, count=None):
+	"""Lazily yields `first` followed by instants `step` seconds apart, each built directly from its exact timestamp rather than by repeated `DynamicDT` addition.
+	Args:
+		first (DynamicDT): The first instant, which also supplies the class and timezone.
+		step (Fraction): The spacing in seconds.
+		count (int, optional): The number of instants; unlimited if None.
+	Yields:
+		DynamicDT: Each instant.
+	"""
+	cls, tzinfo = first.__class__, first.tzinfo
+	ts = fractions.Fraction(first.timestamp_exact())
+	step = fractions.Fraction(step)
+	n = 0
+	while count is None or n < count:
+		whole, f = divmod(ts.numerator, ts.denominator)
+		yield from_parts(cls, whole, fractions.Fraction(f, ts.denominator) if f else 0, tzinfo)
+		ts += step
+		n += 1
+
+def next_lunar_phases(phase=0, start=None, count=None):
+	"""Lazily yields the successive occurrences of a lunar phase from an instant onwards, one exact mean lunation apart.
+	Args:
+		phase (str | number): The phase, as a name such as "full moon" or a fraction of the lunar cycle (0 being new moon).
+		start (DynamicDT): The earliest possible occurrence, which also supplies the timezone. Defaults to the current time in UTC.
+		count (int, optional): The number of occurrences; unlimited if None.
+	Yields:
+		DynamicDT: Each occurrence, in order.
+	"""
+	if isinstance(phase, str):
+		phase = lunar_phase_names[phase.casefold()]
+	if start is None:
+		start = DynamicDT.now(tz=datetime.timezone.utc)
+	return lunations(closest_lunar_phase(start, fractions.Fraction(phase), mode="next"), count=count)
@@ -0,0 +1,287 @@
+"Recurrence rules (a subset of iCalendar RRULE, and lunar phases) yielding `DynamicDT` occurrences lazily."
+import abc
+import datetime
+import fractions
+from . import DynamicDT, LUNATION_SECONDS, WEEKDAY_WORDS, closest_lunar_phase, get_offset_table, lunar_phase_names, month_days, resolve_wall
+from .codec import from_parts
+from .lunar import lunations
+
+FREQUENCIES = ("yearly", "monthly", "weekly", "daily", "hourly", "minutely", "secondly")
+# Length in seconds of the periods of the sub-daily frequencies
+PERIOD_SECONDS = dict(hourly=3600, minutely=60, secondly=1)
+# Periods per 400-year Gregorian cycle; a rule with no occurrence in that many consecutive periods never has one
+CYCLE_PERIODS = dict(yearly=400, monthly=4800, weekly=20871, daily=146097, hourly=146097 * 24, minutely=146097 * 1440, secondly=146097 * 86400)
+
+
+def days_from_civil(year, month, day) -> int:
+	"Returns the number of days from 1970-01-01 to a date of the proleptic Gregorian calendar, for any year."
+	year -= month <= 2
+	era, yoe = divmod(year, 400)
+	doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+	return era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+
+def civil_from_days(days) -> tuple[int, int, int]:
+	"Returns the `(year, month, day)` a number of days from 1970-01-01, the inverse of `days_from_civil`."
+	era, doe = divmod(days + 719468, 146097)
+	yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+	doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+	mp = (5 * doy + 2) // 153
+	month = mp + (3 if mp < 10 else -9)
+	return yoe + era * 400 + (month <= 2), month, doy - (153 * mp + 2) // 5 + 1
+
+def to_wall(ts, tzinfo) -> int:
+	"Converts unix seconds to the wall-clock time in a timezone, as seconds since 1970-01-01 00:00 local time."
+	return ts + get_offset_table(tzinfo).at(ts)
+
+def as_set(values, default, names=None) -> list:
+	"Normalises a `by*` rule argument (a value, sequence or None) to a sorted list, mapping names where given."
+	if values is None:
+		return default
+	if isinstance(values, (int, str)):
+		values = (values,)
+	return sorted({names[v.casefold()] if isinstance(v, str) and names else v for v in values})
+
+
+class Recurrence(abc.ABC):
+	"Abstract base class of recurrence rules, which generate successive occurrences from the previous one."
+
+	def __iter__(self):
+		return self.occurrences()
+
+	@abc.abstractmethod
+	def occurrences(self, after=None, inclusive=False):
+		"Lazily yields the occurrences of the rule, optionally only those after (or at, if `inclusive`) a given instant."
+
+	def after(self, dt, inclusive=False):
+		"Returns the first occurrence after (or at, if `inclusive`) a given instant, or None if there is none."
+		return next(self.occurrences(dt, inclusive=inclusive), None)
+
+	def between(self, start, stop):
+		"Lazily yields the occurrences from `start` (inclusive) to `stop` (exclusive)."
+		for dt in self.occurrences(start, inclusive=True):
+			if dt >= stop:
+				return
+			yield dt
+
+
+class RRule(Recurrence):
+	"""A recurrence rule following a subset of iCalendar's RRULE (RFC 5545), evaluated in wall-clock time so that e.g. "every thursday at 6pm" stays at 6pm across daylight saving changes, for dates in any era.
+	Occurrences are generated period by period (each year, month, week etc. of the frequency), advancing from the previous period rather than re-solving from the start; for rules without `count`, `after` and `occurrences(after=...)` jump straight to the period containing the given instant.
+	Args:
+		freq (str): One of "yearly", "monthly", "weekly", "daily", "hourly", "minutely" or "secondly".
+		start (DynamicDT): The first possible occurrence, which also supplies the timezone, the fractional second, and the defaults of the `by*` fields as in RRULE. Defaults to the current time in UTC.
+		interval (int): The number of periods between each period with occurrences.
+		count (int, optional): The maximum number of occurrences.
+		until (DynamicDT, optional): The last possible occurrence.
+		bymonth, bymonthday, byweekday, byhour, byminute, bysecond (int | str | Iterable, optional): Restrict or expand the occurrences within each period. Month days may be negative to count from the end of the month; weekdays are 0 (Monday) to 6, or names such as "thursday".
+	"""
+
+	def __init__(self, freq, start=None, interval=1, count=None, until=None, bymonth=None, bymonthday=None, byweekday=None, byhour=None, byminute=None, bysecond=None):
+		freq = freq.casefold()
+		if freq not in FREQUENCIES:
+			raise ValueError(f"freq must be one of {', '.join(FREQUENCIES)}, got {freq!r}")
+		if interval < 1:
+			raise ValueError("interval must be positive.")
+		self.freq = freq
+		self.start = start = start if start is not None else DynamicDT.now(tz=datetime.timezone.utc)
+		self.cls = start.__class__
+		self.tzinfo = start.tzinfo or datetime.timezone.utc
+		self.interval = interval
+		self.count = count
+		self.until = until
+		self.fraction = start.fraction
+		day = days_from_civil(start.year, start.month, start.day)
+		self.wall = day * 86400 + start.hour * 3600 + start.minute * 60 + start.second
+		self.bymonth = as_set(bymonth, None)
+		self.byweekday = as_set(byweekday, None, WEEKDAY_WORDS)
+		self.bymonthday = as_set(bymonthday, None)
+		coarse = FREQUENCIES.index(freq)
+		if freq == "yearly" and self.bymonth is None and self.bymonthday is None and self.byweekday is None:
+			self.bymonth = [start.month]
+		if freq in ("yearly", "monthly") and self.bymonthday is None and self.byweekday is None:
+			self.bymonthday = [start.day]
+		if freq == "weekly" and self.byweekday is None and self.bymonthday is None:
+			self.byweekday = [(day + 3) % 7]
+		# Time fields default to those of the start when coarser than the frequency, and are otherwise filters
+		self.byhour = as_set(byhour, [start.hour] if coarse <= 3 else None)
+		self.byminute = as_set(byminute, [start.minute] if coarse <= 4 else None)
+		self.bysecond = as_set(bysecond, [start.second] if coarse <= 5 else None)
+
+	def __repr__(self):
+		fields = ("freq", "start", "interval", "count", "until", "bymonth", "bymonthday", "byweekday", "byhour", "byminute", "bysecond")
+		return self.__class__.__name__ + "(" + ", ".join(f"{k}={getattr(self, k)!r}" for k in fields if getattr(self, k) is not None) + ")"
+
+	def period(self, wall) -> int:
+		"Returns the index of the period containing a wall-clock time, counted in periods of the frequency (ignoring `interval`) from the one containing the start."
+		freq = self.freq
+		if freq in PERIOD_SECONDS:
+			size = PERIOD_SECONDS[freq]
+			return wall // size - self.wall // size
+		day = wall // 86400
+		if freq == "daily":
+			return day - self.wall // 86400
+		if freq == "weekly":
+			# Weeks start on Monday
+			return (day + 3) // 7 - (self.wall // 86400 + 3) // 7
+		year, month, _ = civil_from_days(day)
+		y0, m0, _ = civil_from_days(self.wall // 86400)
+		if freq == "monthly":
+			return (year - y0) * 12 + month - m0
+		return year - y0
+
+	def matches_day(self, day) -> bool:
+		"Whether a day passes the day-level filters of the rule."
+		if self.bymonth is not None or self.bymonthday is not None:
+			year, month, d = civil_from_days(day)
+			if self.bymonth is not None and month not in self.bymonth:
+				return False
+			if self.bymonthday is not None and d not in self.bymonthday and d - month_days(year, month) - 1 not in self.bymonthday:
+				return False
+		return self.byweekday is None or (day + 3) % 7 in self.byweekday
+
+	def month_candidates(self, year, month) -> list:
+		"Returns the days of a month selected by `bymonthday` or `byweekday`."
+		length = month_days(year, month)
+		first = days_from_civil(year, month, 1)
+		if self.bymonthday is not None:
+			days = sorted({d if d > 0 else length + d + 1 for d in self.bymonthday})
+			days = [first + d - 1 for d in days if 1 <= d <= length]
+			if self.byweekday is not None:
+				days = [d for d in days if (d + 3) % 7 in self.byweekday]
+			return days
+		return [d for d in range(first, first + length) if (d + 3) % 7 in self.byweekday]
+
+	def candidates(self, p) -> list:
+		"Returns the wall-clock times of the occurrences in period `p`, in order."
+		freq = self.freq
+		if freq in PERIOD_SECONDS:
+			size = PERIOD_SECONDS[freq]
+			base = (self.wall // size + p) * size
+			if not self.matches_day(base // 86400):
+				return []
+			hour, minute = base // 3600 % 24, base // 60 % 60
+			if self.byhour is not None and hour not in self.byhour:
+				return []
+			if freq == "hourly":
+				return [base + m * 60 + s for m in self.byminute for s in self.bysecond]
+			if self.byminute is not None and minute not in self.byminute:
+				return []
+			if freq == "minutely":
+				return [base + s for s in self.bysecond]
+			return [base] if self.bysecond is None or base % 60 in self.bysecond else []
+		day0 = self.wall // 86400
+		if freq == "daily":
+			days = [day0 + p] if self.matches_day(day0 + p) else []
+		elif freq == "weekly":
+			monday = day0 - (day0 + 3) % 7 + p * 7
+			days = [d for d in (monday + w for w in self.byweekday or range(7)) if self.matches_day(d)]
+		else:
+			y0, m0, _ = civil_from_days(day0)
+			if freq == "monthly":
+				year, month = divmod(y0 * 12 + m0 - 1 + p, 12)
+				months = [month + 1] if self.bymonth is None or month + 1 in self.bymonth else []
+			else:
+				year = y0 + p
+				months = self.bymonth or range(1, 13)
+			days = [d for month in months for d in self.month_candidates(year, month)]
+		times = sorted(h * 3600 + m * 60 + s for h in self.byhour for m in self.byminute for s in self.bysecond)
+		return [d * 86400 + t for d in days for t in times]
+
+	def next_period(self, p) -> int:
+		"Returns the period to try after an empty period `p`. Sub-daily frequencies skip to the next day, hour or minute that could pass the filter that rejected `p`."
+		interval = self.interval
+		size = PERIOD_SECONDS.get(self.freq)
+		if size is None:
+			return p + interval
+		base = (self.wall // size + p) * size
+		if not self.matches_day(base // 86400):
+			unit = 86400
+		elif self.byhour is not None and base // 3600 % 24 not in self.byhour:
+			unit = 3600
+		elif size < 60 and self.byminute is not None and base // 60 % 60 not in self.byminute:
+			unit = 60
+		else:
+			return p + interval
+		# The first period of the next unit, rounded up to a multiple of the interval
+		target = -(-(base // unit + 1) * unit // size) - self.wall // size
+		return p + max(1, -(-(target - p) // interval)) * interval
+
+	def occurrences(self, after=None, inclusive=False):
+		cls, tzinfo, f = self.cls, self.tzinfo, self.fraction
+		interval = self.interval
+		until = self.until.sort_key() if self.until is not None else None
+		threshold = after.sort_key() if after is not None else None
+		p = 0
+		if threshold is not None and self.count is None:
+			# Skip straight to the period containing the instant; earlier periods cannot contribute
+			p = max(0, self.period(to_wall(threshold[0], tzinfo)) // interval * interval)
+		emitted = empty = 0
+		last = None
+		while True:
+			found = False
+			for wall in self.candidates(p):
+				if wall < self.wall:
+					continue
+				found = True
+				ts = resolve_wall(wall, tzinfo)
+				key = (ts, f)
+				if last is not None and key <= last:
+					# A time skipped by a daylight saving transition lands on the next real one, and duplicates count once
+					continue
+				last = key
+				if until is not None and key > until:
+					return
+				emitted += 1
+				if threshold is None or key > threshold or inclusive and key == threshold:
+					yield from_parts(cls, ts, f, tzinfo)
+				if emitted == self.count:
+					return
+			if found:
+				empty = 0
+				p += interval
+			else:
+				q = self.next_period(p)
+				empty += q - p
+				p = q
+			if empty >= CYCLE_PERIODS[self.freq]:
+				return
+
+
+class LunarRecurrence(Recurrence):
+	"""Successive occurrences of a lunar phase, as found by `closest_lunar_phase`. Each occurrence is the previous one plus an exact mean lunation, and the first occurrence after any instant is found directly.
+	Args:
+		phase (str | number): The phase, as a name such as "full moon" or a fraction of the lunar cycle (0 being new moon).
+		start (DynamicDT): The earliest possible occurrence, which also supplies the timezone. Defaults to the current time in UTC.
+		interval (int): The number of lunations between occurrences.
+		count (int, optional): The maximum number of occurrences.
+		until (DynamicDT, optional): The last possible occurrence.
+	"""
+
+	def __init__(self, phase=0, start=None, interval=1, count=None, until=None):
+		if isinstance(phase, str):
+			phase = lunar_phase_names[phase.casefold()]
+		self.phase = fractions.Fraction(phase)
+		self.start = start if start is not None else DynamicDT.now(tz=datetime.timezone.utc)
+		self.interval = interval
+		self.count = count
+		self.until = until
+		self.first = closest_lunar_phase(self.start, self.phase, mode="next")
+
+	def __repr__(self):
+		return f"{self.__class__.__name__}(phase={self.phase!r}, start={self.start!r}, interval={self.interval}, count={self.count!r}, until={self.until!r})"
+
+	def occurrences(self, after=None, inclusive=False):
+		step = LUNATION_SECONDS * self.interval
+		first = self.first
+		n = 0
+		if after is not None and after >= first:
+			# Index of the first occurrence at or after the instant, computed directly
+			n = -((first.timestamp_exact() - after.timestamp_exact()) // step)
+		dt = first + n * step if n else first
+		if after is not None and not inclusive and dt == after:
+			n += 1
+			dt += step
+		for dt in lunations(dt, step, None if self.count is None else max(0, self.count - n)):
+			if self.until is not None and dt > self.until:
+				return
+			yield dt
@@ -0,0 +1,154 @@
+"Streaming extraction of timestamps from logs and other large text, built on `DynamicDT.parse`."
+import functools
+import io
+import mmap
+import os
+import re
+from . import DynamicDT, ParsePlan, ParseCache, PARSE_CACHE, iso_re, get_timezone, parse_num
+
+MONTHS = "jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec"
+MONTH_NAMES = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+CLOCK = r"[0-9]{1,2}:[0-9]{2}(?::[0-9]{2}(?:\.[0-9]+)?)?(?: ?[ap]\.?m\.?)?"
+ZONE = r"(?: ?(?:utc|gmt|z)?[+-][0-9]{2}:?[0-9]{2}| (?:utc|gmt))?"
+# Candidate timestamp spans, one named group per kind. All but `natural` are unambiguous and skip the natural language parser
+SCAN_PATTERN = "|".join((
+	# ISO 8601, as accepted by `DynamicDT.fromisoformat` (with its groups made non-capturing)
+	r"(?P<iso>(?<![\w+\-.:])" + re.sub(r"\((?!\?)", "(?:", iso_re.pattern) + r"(?![0-9]))",
+	# Common Log Format, e.g. [08/Dec/2024:06:13:27 +0000]
+	r"(?P<clf>(?<![\w/])[0-9]{2}/(?i:" + MONTHS + r")/[0-9]{4}:[0-9]{2}:[0-9]{2}:[0-9]{2} [+-][0-9]{4})",
+	r"(?P<discord><t:[+-]?[0-9]+(?::[a-zA-Z])?>)",
+	r"(?P<yyyymmdd>(?<![\w.])(?:19[7-9][0-9]|[2-9][0-9]{3})(?:0[1-9]|1[0-2])(?:0[1-9]|[12][0-9]|3[01])(?![\w]|\.[0-9]))",
+	# Unix seconds between 2001-09-09 and 2033-05-18, optionally fractional; other magnitudes are too easily confused with ordinary numbers
+	r"(?P<unix>(?<![\w.])1[0-9]{9}(?:\.[0-9]+)?(?![\w]|\.[0-9]))",
+	# Anything else date-like: month names (e.g. syslog's "Dec  8 06:13:27") and slashed dates, routed through `DynamicDT.parse`
+	r"(?P<natural>(?i:(?<![\w])(?:"
+		+ r"(?:(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*,? +)?" + MONTH_NAMES + r" +[0-9]{1,2}(?:st|nd|rd|th)?(?:,? +[0-9]{4}(?![0-9:]))?"
+		+ r"|[0-9]{1,2}(?:st|nd|rd|th)? +" + MONTH_NAMES + r",? +[0-9]{4}"
+		+ r"|[0-9]{4}/[0-9]{1,2}/[0-9]{1,2}|[0-9]{1,2}/[0-9]{1,2}/[0-9]{4}"
+		+ r")(?:,? +(?:at +)?" + CLOCK + r")?" + ZONE + r"(?![\w])))",
+))
+# Longest span considered when deciding whether a match near the end of a chunk might continue into the next one
+MAX_SPAN = 256
+# Characters kept before a chunk boundary so that lookbehind assertions still see them
+CONTEXT = 16
+MONTH_NUMBERS = {m: i for i, m in enumerate(MONTHS.split("|"), 1)}
+
+
+@functools.cache
+def get_scan_re(binary=False) -> re.Pattern:
+	"Returns `SCAN_PATTERN` compiled for str input (or bytes, if `binary`), compiling it on first use rather than on import."
+	return re.compile(SCAN_PATTERN.encode("ascii") if binary else SCAN_PATTERN)
+
+def read_chunks(source, chunksize):
+	"Yields str or bytes chunks from a path, file object or iterable; paths are memory-mapped where possible and yielded as a single `mmap` object."
+	if isinstance(source, (str, bytes, os.PathLike)):
+		with open(source, "rb") as f:
+			try:
+				with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+					yield mm
+					return
+			except (ValueError, OSError):
+				# Empty files and streams that cannot be mapped are read normally
+				pass
+			yield from read_chunks(f, chunksize)
+		return
+	if isinstance(source, (io.IOBase, io.TextIOBase)) or hasattr(source, "read"):
+		while chunk := source.read(chunksize):
+			yield chunk
+		return
+	yield from source
+
+
+class Scanner:
+	"""Finds and parses the timestamps in a stream of text; see `scan`.
+	Holds the state shared across a scan: the reference time, the default timezone, the reference `DynamicDT` of each timezone (as in `DynamicDT.parse_many`), and a plan cache for the natural language spans.
+	"""
+
+	def __init__(self, timestamp=None, timezone=None, natural=True, cls=DynamicDT):
+		self.cls = cls
+		self.timestamp = timestamp or cls.unix()
+		self.timezone = get_timezone(timezone) if timezone else None
+		self.natural = natural
+		self.anchors = {}
+		self.cache = PARSE_CACHE if PARSE_CACHE.maxsize else ParseCache(1024)
+
+	def plan(self, kind, number, parsed_as) -> DynamicDT:
+		# Equivalent to the plan `DynamicDT.parse_plan` would produce for the span, without tokenising it
+		plan = ParsePlan()
+		plan.kind = kind
+		plan.number = number
+		plan.parsed_as = parsed_as
+		return self.cls.from_plan(plan, timestamp=self.timestamp, timezone=self.timezone, anchors=self.anchors)
+
+	def convert(self, kind, span):
+		"Parses a span matched as the given kind, returning None if it turns out not to be a valid timestamp."
+		cls = self.cls
+		try:
+			match kind:
+				case "iso":
+					return cls._parse_iso(span, self.timezone)
+				case "clf":
+					day, month, rest = span.split("/", 2)
+					year, clock = rest.split(":", 1)
+					clock, zone = clock.split(" ")
+					return cls._parse_iso(f"{year}-{MONTH_NUMBERS[month.casefold()]:02}-{day}T{clock}{zone[:3]}:{zone[3:]}", self.timezone)
+				case "discord":
+					return self.plan("unix_timestamp", int(span[3:-1].split(":", 1)[0]), ["discord_timestamp", "unix_timestamp"])
+				case "yyyymmdd":
+					return self.plan("yyyymmdd", int(span), ["yyyymmdd"])
+				case "unix":
+					return self.plan("unix_timestamp", parse_num(span), ["unix_timestamp"])
+				case "natural":
+					if self.natural:
+						return cls.from_plan(cls._plan(span, self.cache), timestamp=self.timestamp, timezone=self.timezone, anchors=self.anchors)
+		except Exception:
+			# Candidates are only date-like; anything the parser rejects is simply not a timestamp
+			return
+
+	def scan(self, source, chunksize=1 << 20):
+		"Yields `(offset, span, DynamicDT)` for each timestamp found in the source; see `scan`."
+		buffer = None
+		# Stream offset of the start of the buffer, and the position in the buffer up to which it has been scanned
+		base = pos = 0
+		for chunk in read_chunks(source, chunksize):
+			if isinstance(chunk, mmap.mmap):
+				# A whole memory-mapped file is scanned in place, without copying
+				yield from self._matches(get_scan_re(True), chunk, 0, 0, len(chunk))
+				continue
+			regex = get_scan_re(not isinstance(chunk, str))
+			buffer = chunk if buffer is None else buffer + chunk
+			pos = yield from self._matches(regex, buffer, base, pos, len(buffer) - MAX_SPAN)
+			cut = max(0, pos - CONTEXT)
+			buffer = buffer[cut:]
+			base += cut
+			pos -= cut
+		if buffer:
+			yield from self._matches(regex, buffer, base, pos, len(buffer))
+
+	def _matches(self, regex, buffer, base, pos, limit):
+		"Yields the timestamps of matches in `buffer[pos:]` ending by `limit`, and returns the position up to which the buffer has been consumed."
+		for m in regex.finditer(buffer, pos):
+			if m.end() > limit:
+				# May continue into the next chunk
+				return m.start()
+			span = m.group()
+			if not isinstance(span, str):
+				span = span.decode("ascii")
+			value = self.convert(m.lastgroup, span)
+			if value is not None:
+				yield base + m.start(), span, value
+		return max(pos, limit)
+
+def scan(source, timestamp=None, timezone=None, natural=True, chunksize=1 << 20):
+	"""Lazily extracts timestamps from a large body of text, such as a log file.
+	Candidate spans are located with a single precompiled regex covering ISO 8601, Common Log Format, Discord `<t:...>` tokens, `yyyymmdd` dates and unix seconds, which are converted directly; only the remaining date-like spans (month names, slashed dates) go through the natural language parser. Memory use is bounded by `chunksize` regardless of the size of the input.
+	Args:
+		source (str | os.PathLike | file | Iterable[str | bytes]): A path (memory-mapped where possible), a text or binary file object (read in chunks of `chunksize`), or any iterable of str or bytes pieces of one continuous stream, such as lines. To scan a string directly, wrap it in a list.
+		timestamp (number, optional): The reference unix timestamp for relative spans, as in `DynamicDT.parse`. Defaults to the time the scan starts.
+		timezone (str | tzinfo, optional): The timezone for spans without one, as in `DynamicDT.parse`.
+		natural (bool): Whether to parse the ambiguous, natural language spans at all.
+		chunksize (int): The size of the reads from file objects.
+	Yields:
+		tuple[int, str, DynamicDT]: The offset of each timestamp in the stream (in bytes for binary sources and paths, otherwise characters), the matched text, and its value.
+	"""
+	return Scanner(timestamp=timestamp, timezone=timezone, natural=natural).scan(source, chunksize=chunksize)
@@ -0,0 +1,186 @@
+"Append-only, memory-mapped files of `DynamicDT`-keyed records, with binary-search range queries."
+import datetime
+import fractions
+import mmap
+import os
+import struct
+from . import DynamicDT, ERA
+from .codec import from_parts
+
+MAGIC = b"DDTL"
+TIMELINE_VERSION = 1
+# Magic, format version, value size
+HEADER = struct.Struct(">4sHH")
+# Era (biased so that the key bytes sort in time order), seconds into the era, and attoseconds
+KEY = struct.Struct(">QQQ")
+ERA_BIAS = 1 << 63
+# Sub-second resolution of keys; fractions are rounded down to it, so keys never order two instants the wrong way round
+KEY_DENOMINATOR = 10 ** 18
+
+
+def encode_key(dt) -> bytes:
+	"Returns the fixed-width key of a `DynamicDT`, whose bytes compare in the same order as the instants they represent."
+	whole, f = dt.sort_key()
+	era, seconds = divmod(whole, ERA)
+	if not -ERA_BIAS <= era < ERA_BIAS:
+		raise OverflowError(f"{dt!r} is too far from the epoch to be stored in a Timeline.")
+	return KEY.pack(era + ERA_BIAS, seconds, f * KEY_DENOMINATOR // 1 if f else 0)
+
+def decode_key(key, cls=DynamicDT, tzinfo=None) -> DynamicDT:
+	"Converts a key produced by `encode_key` back to a `DynamicDT` in the given timezone."
+	era, seconds, atto = KEY.unpack(key)
+	return from_parts(cls, (era - ERA_BIAS) * ERA + seconds, fractions.Fraction(atto, KEY_DENOMINATOR) if atto else 0, tzinfo)
+
+
+class Timeline:
+	"""A sorted, append-only file of `(DynamicDT, bytes)` records, covering any range of years (including BCE and the far future) at attosecond resolution.
+	Records are fixed-width: a 24-byte time key followed by `value_size` bytes of user data. The file is memory-mapped rather than read, so opening is constant-time and lookups and iteration only touch the pages they need. Records must be appended in non-decreasing time order; a partially written record at the end of the file (e.g. after a crash) is ignored.
+	Args:
+		path (str | os.PathLike): The file, created if it does not exist.
+		value_size (int): The size of each record's value in bytes. Only used when creating the file; existing files keep their own.
+		timezone (tzinfo, optional): The timezone of the returned `DynamicDT`s. Defaults to UTC.
+		cls (type): The `DynamicDT` subclass to return.
+	"""
+
+	def __init__(self, path, value_size=8, timezone=datetime.timezone.utc, cls=DynamicDT):
+		self.path = path
+		self.tzinfo = timezone
+		self.cls = cls
+		exists = os.path.exists(path) and os.path.getsize(path) > 0
+		self.file = open(path, "r+b" if exists else "w+b")
+		if exists:
+			try:
+				header = self.file.read(HEADER.size)
+				if len(header) < HEADER.size:
+					raise ValueError(f"{path!r} is too short to be a Timeline file.")
+				magic, version, value_size = HEADER.unpack(header)
+				if magic != MAGIC:
+					raise ValueError(f"{path!r} is not a Timeline file.")
+				if version != TIMELINE_VERSION:
+					raise ValueError(f"Unsupported Timeline version {version}.")
+			except BaseException:
+				self.file.close()
+				raise
+		else:
+			self.file.write(HEADER.pack(MAGIC, TIMELINE_VERSION, value_size))
+			self.file.flush()
+		self.value_size = value_size
+		self.record_size = KEY.size + value_size
+		self.count = (os.fstat(self.file.fileno()).st_size - HEADER.size) // self.record_size
+		self.map = None
+		self.mapped = 0
+		self.last = None
+
+	def __repr__(self):
+		return f"{self.__class__.__name__}({self.path!r}, records={self.count})"
+
+	def __len__(self):
+		return self.count
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def close(self):
+		"Flushes pending appends and releases the file and its mapping."
+		if self.map is not None:
+			self.map.close()
+			self.map = None
+		if not self.file.closed:
+			self.file.close()
+
+	def flush(self):
+		"Writes pending appends to the file."
+		self.file.flush()
+
+	def view(self):
+		"Returns a read-only mapping of the file covering every record, remapping it after appends."
+		if self.map is None or self.mapped < self.count:
+			self.file.flush()
+			# Any previous mapping is left for iterators still reading it, and closed once they are done
+			self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+			self.mapped = self.count
+		return self.map
+
+	def append(self, dt, value=b""):
+		"""Appends a record, which must not be earlier than the last one.
+		Args:
+			dt (DynamicDT): The time of the record.
+			value (bytes): Its data, at most `value_size` bytes; shorter values are padded with zero bytes.
+		"""
+		key = encode_key(dt)
+		if self.last is None and self.count:
+			self.last = self.key(self.count - 1)
+		if self.last is not None and key < self.last:
+			raise ValueError(f"Timeline records must be appended in time order; {dt!r} is earlier than the last record.")
+		if len(value) > self.value_size:
+			raise ValueError(f"Value of {len(value)} bytes exceeds the value size of {self.value_size}.")
+		if self.file.tell() != HEADER.size + self.count * self.record_size:
+			# Overwrites any partial record left at the end
+			self.file.seek(HEADER.size + self.count * self.record_size)
+		self.file.write(key + bytes(value).ljust(self.value_size, b"\0"))
+		self.last = key
+		self.count += 1
+
+	def extend(self, records):
+		"Appends each `(dt, value)` pair of an iterable, as with `append`."
+		for dt, value in records:
+			self.append(dt, value)
+
+	def key(self, i) -> bytes:
+		"Returns the raw key of the record at index `i`."
+		offset = HEADER.size + i * self.record_size
+		return self.view()[offset:offset + KEY.size]
+
+	def __getitem__(self, i):
+		if i < 0:
+			i += self.count
+		if not 0 <= i < self.count:
+			raise IndexError("Timeline index out of range.")
+		return self.record(self.view(), i)
+
+	def record(self, view, i) -> tuple:
+		"Decodes the record at index `i` of a mapping returned by `view`."
+		offset = HEADER.size + i * self.record_size
+		return decode_key(view[offset:offset + KEY.size], self.cls, self.tzinfo), view[offset + KEY.size:offset + self.record_size]
+
+	def bisect(self, dt, right=False) -> int:
+		"""Finds the index at which a record at the given time would be inserted, in `O(log n)` key comparisons.
+		Args:
+			dt (DynamicDT): The time to look for.
+			right (bool): Whether to return the index after any records at exactly this time, rather than before.
+		Returns:
+			int: The index.
+		"""
+		key = encode_key(dt)
+		view = self.view()
+		size = self.record_size
+		lo, hi = 0, self.count
+		while lo < hi:
+			mid = (lo + hi) // 2
+			offset = HEADER.size + mid * size
+			k = view[offset:offset + KEY.size]
+			if k < key or right and k == key:
+				lo = mid + 1
+			else:
+				hi = mid
+		return lo
+
+	def range(self, start=None, stop=None):
+		"""Lazily yields the records from `start` (inclusive) to `stop` (exclusive), reading only the pages they occupy.
+		Args:
+			start (DynamicDT, optional): The lower bound; defaults to the first record.
+			stop (DynamicDT, optional): The upper bound; defaults to past the last record.
+		Yields:
+			tuple[DynamicDT, bytes]: Each record's time and value, in time order.
+		"""
+		i = 0 if start is None else self.bisect(start)
+		j = self.count if stop is None else self.bisect(stop)
+		view = self.view()
+		for k in range(i, j):
+			yield self.record(view, k)
+
+	def __iter__(self):
+		return self.range()
@@ -1,12 +1,24 @@
+import datetime
+import gc
+import io
+import itertools
+import json
+import os
+import tempfile
 import unittest
+import warnings
 from fractions import Fraction
 
 # src/dynamic_dt/test___init__.py
 from dynamic_dt import (
-	is_number, cast_str, to_fraction, round_min, round_frac, parse_num, parse_num_long,
+	is_number, cast_str, to_fraction, round_min, round_frac, parse_num, parse_num_long, match_number_words,
 	strnum, time_disp, time_parse, get_name, get_offset, retrieve_tz, get_timezone,
-	get_time, month_days, TimeDelta, DynamicDT
+	get_time, month_days, TimeDelta, FrozenTimeDelta, DynamicDT, NanoDT, TimezoneRegistry, DELTA_GRAMMAR, PARSE_CACHE, ParseProfiler, DynamicDTArray, TimeDeltaArray,
+	TIMEZONE_INDEX_FORMAT, load_timezone_index, scan, lex, match_date_words, dumps_many, loads_many, Timeline, IntervalIndex, RRule, LunarRecurrence, next_lunar_phases, get_lunar_phase
 )
+from dynamic_dt.lunar import lunar_phases
+from dynamic_dt.recurrence import Recurrence
+from dynamic_dt.arrays import get_numpy
 
 class TestDynamicDT(unittest.TestCase):
 
@@ -40,6 +52,15 @@ class TestDynamicDT(unittest.TestCase):
 
 	def test_parse_num_long(self):
 		self.assertEqual(parse_num_long("one hundred twenty three"), 123)
+		self.assertEqual(parse_num_long("three hundred and twelve thousand and seventy one"), 312071)
+		self.assertEqual(parse_num_long("a million"), 1000000)
+		self.assertEqual(parse_num_long("minus twenty-one"), -21)
+		self.assertEqual(parse_num_long("twenty second"), 22)
+		self.assertEqual(parse_num_long("22nd"), 22)
+		self.assertEqual(parse_num_long("twenty twenty four"), 2024)
+		self.assertEqual(parse_num_long("5 thousand"), 5000)
+		self.assertRaises(ValueError, parse_num_long, "twelve days")
+		self.assertEqual(match_number_words("in two hundred and five days".split(), 1), (205, 5))
 
 	def test_strnum(self):
 		self.assertEqual(strnum(123.456789), "123.456789")
@@ -60,14 +81,50 @@ class TestDynamicDT(unittest.TestCase):
 	def test_get_offset(self):
 		tzinfo = get_timezone("UTC")
 		self.assertEqual(get_offset(tzinfo), 0)
+		tzinfo = get_timezone("America/New_York")
+		self.assertEqual(get_offset(tzinfo, DynamicDT(2023, 7, 1, tzinfo=tzinfo)), -14400)
+		self.assertEqual(get_offset(tzinfo, DynamicDT(2023, 1, 1, tzinfo=tzinfo)), -18000)
+		# Before the first transition, local mean time applies, as in pytz
+		self.assertEqual(get_offset(tzinfo, DynamicDT(-5000000, 7, 1, tzinfo=tzinfo)), -17760)
+		self.assertIn(get_offset(tzinfo), (-14400, -18000))
+		# Beyond pytz's transitions, the zone's rules continue through the 400-year cycle
+		summer = DynamicDT(31690708, 7, 4, 12, tzinfo=datetime.timezone.utc).cast(tzinfo)
+		winter = DynamicDT(31690708, 12, 4, 12, tzinfo=datetime.timezone.utc).cast(tzinfo)
+		self.assertEqual((summer.hour, winter.hour), (8, 7))
+		self.assertEqual(get_offset(tzinfo, summer), -14400)
 
 	def test_retrieve_tz(self):
 		tzinfo = retrieve_tz("UTC")
 		self.assertEqual(get_name(tzinfo), "UTC")
 
+	def test_TimezoneRegistry(self):
+		with tempfile.TemporaryDirectory() as d:
+			path = os.path.join(d, "timezone_index.json")
+			cache_path = os.path.join(d, "cache", "timezone_index.json")
+			# An index built against another pytz version is still used, and zone names are checked when resolved
+			with open(path, "w") as f:
+				json.dump(dict(format=TIMEZONE_INDEX_FORMAT, pytz="0", timezones={"old": "Not/A_Zone", "aqtt": [300, "AQTT"]}), f)
+			registry = TimezoneRegistry(path=path, cache_path=cache_path)
+			self.assertEqual(registry["europe/london"].zone, "Europe/London")
+			self.assertEqual(get_name(registry["aqtt"]), "AQTT")
+			self.assertNotIn("not a timezone", registry)
+			self.assertNotIn("old", registry)
+			self.assertFalse(registry.loaded)
+			self.assertFalse(os.path.exists(cache_path))
+			# An unreadable index is rebuilt into the cache, never over the original
+			with open(path, "w") as f:
+				f.write("{")
+			registry = TimezoneRegistry(path=path, cache_path=cache_path)
+			self.assertEqual(get_name(registry["aqtt"]), "AQTT")
+			with open(path) as f:
+				self.assertEqual(f.read(), "{")
+			self.assertEqual(load_timezone_index(cache_path), registry.index())
+			self.assertEqual(os.listdir(os.path.dirname(cache_path)), ["timezone_index.json"])
+
 	def test_get_timezone(self):
 		tzinfo = get_timezone("UTC")
 		self.assertEqual(get_name(tzinfo), "UTC")
+		self.assertEqual(get_offset(get_timezone("utc-1:30")), -5400)
 
 	def test_get_time(self):
 		dt = get_time("UTC")
@@ -83,6 +140,21 @@ class TestDynamicDT(unittest.TestCase):
 		self.assertEqual(td.months, 2)
 		self.assertEqual(td.days, 3)
 
+	def test_FrozenTimeDelta(self):
+		a = TimeDelta(days=1, hours=23)
+		b = TimeDelta(hours=2)
+		self.assertEqual((a + b).to_dict()["hours"], 1)
+		self.assertEqual(a.hours, 23)
+		DynamicDT(2023, 1, 1) - b
+		self.assertEqual(b.hours, 2)
+		f = b.frozen()
+		self.assertIsInstance(f, FrozenTimeDelta)
+		with self.assertRaises(AttributeError):
+			f.hours = 3
+		self.assertEqual(f.negate().hours, -2)
+		self.assertEqual(f.hours, 2)
+		self.assertEqual({f: 1}[FrozenTimeDelta(minutes=120)], 1)
+
 	def test_DynamicDT(self):
 		dt = DynamicDT(2023, 1, 1)
 		self.assertEqual(dt.year, 2023)
@@ -100,16 +172,371 @@ class TestDynamicDT(unittest.TestCase):
 		td = dt1 - dt2
 		self.assertEqual(td.days, 1)
 
+	def test_DynamicDT_compare(self):
+		a = DynamicDT.fromtimestamp(Fraction(1, 10 ** 12))
+		b = DynamicDT.fromtimestamp(Fraction(2, 10 ** 12))
+		self.assertTrue(a < b and b > a and a <= b and a != b)
+		self.assertEqual(sorted([b, a]), [a, b])
+		self.assertEqual(a, a.copy())
+		self.assertEqual(len({a, a.copy(), b}), 2)
+		self.assertEqual(hash(DynamicDT.fromtimestamp(5)), hash(5))
+		self.assertEqual(NanoDT.fromtimestamp(1.5), DynamicDT.fromtimestamp(1.5))
+		# Microseconds given positionally are counted once
+		c = DynamicDT(2024, 1, 1, 0, 0, 0, 750000, tzinfo=datetime.timezone.utc)
+		d = DynamicDT(2024, 1, 1, 0, 0, 1, 250000, tzinfo=datetime.timezone.utc)
+		self.assertTrue(c < d)
+		self.assertEqual(sorted([d, c]), [c, d])
+		self.assertEqual(c.sort_key(), (1704067200, Fraction(3, 4)))
+		self.assertEqual(c.timestamp_exact(), Fraction(6816268803, 4))
+		self.assertEqual(c, DynamicDT.fromtimestamp(Fraction(6816268803, 4)))
+		self.assertEqual(NanoDT(2024, 1, 1, 0, 0, 0, 750000, tzinfo=datetime.timezone.utc), c)
+		# Instances sharing a tick size compare by their integer tick counts, consistently with the sort key
+		ticks = [NanoDT.fromticks(t) for t in (-10 ** 30, -1, 0, 1, 999999999, 10 ** 9, 1733638407333333333)]
+		shuffled = ticks[::-1]
+		self.assertEqual(sorted(shuffled), ticks)
+		self.assertEqual(sorted(shuffled, key=NanoDT.sort_key), ticks)
+		for x, y in itertools.product(ticks, repeat=2):
+			self.assertEqual(x < y, x.timestamp_ticks() < y.timestamp_ticks())
+			self.assertEqual(x >= y, x.sort_key() >= y.sort_key())
+			self.assertEqual(x == y, x.timestamp_exact() == y.timestamp_exact())
+		nano = ticks[-1]
+		self.assertEqual((nano + Fraction(1, 10 ** 9)).timestamp_ticks(), nano.timestamp_ticks() + 1)
+		self.assertTrue(nano < nano + Fraction(1, 10 ** 9) and nano == nano.copy())
+
 	def test_DynamicDT_replace(self):
 		dt = DynamicDT(2023, 1, 1)
 		dt = dt.replace(year=2024)
 		self.assertEqual(dt.year, 2024)
 
+	def test_NanoDT(self):
+		dt = NanoDT.fromtimestamp(Fraction(1733638407) + Fraction(1, 3))
+		self.assertEqual(dt.timestamp_ticks(), 1733638407333333333)
+		self.assertEqual(dt.fraction, Fraction(333333333, 10 ** 9))
+		later = dt + 0.7
+		self.assertIsInstance(later, NanoDT)
+		self.assertEqual(later.timestamp_ticks(), 1733638408033333333)
+		self.assertEqual((later - 0.7).timestamp_ticks(), dt.timestamp_ticks())
+		self.assertTrue(dt < later)
+		self.assertEqual(dt, dt.copy())
+		self.assertEqual(NanoDT.fromticks(-10 ** 30).timestamp_ticks(), -10 ** 30)
+		# Rounding up to a whole second carries into the seconds
+		self.assertEqual(NanoDT(2023, 1, 1, 23, 59, 59, fraction=Fraction(9999999999, 10 ** 10)).day, 2)
+
+	def test_DeltaGrammar(self):
+		# DELTA_GRAMMAR is shared by the whole process, so the added unit is removed again afterwards
+		tables = dict(DELTA_GRAMMAR.timechecks), list(DELTA_GRAMMAR.abbreviation_names), dict(DELTA_GRAMMAR.special_values), dict(DELTA_GRAMMAR.subsecond_values)
+		def restore():
+			DELTA_GRAMMAR.timechecks, DELTA_GRAMMAR.abbreviation_names, DELTA_GRAMMAR.special_values, DELTA_GRAMMAR.subsecond_values = tables
+			DELTA_GRAMMAR.compile()
+			PARSE_CACHE.clear()
+		self.addCleanup(restore)
+		DELTA_GRAMMAR.add_unit("jiffies", ("jiffy", "jiffies"), abbreviations=("jf",), subsecond=100)
+		self.assertEqual(DynamicDT.parse_delta("3 jiffies").fraction, Fraction(3, 100))
+		self.assertEqual(DynamicDT.parse_delta("1s5jf").fraction, Fraction(1, 20))
+		self.assertEqual(DynamicDT.parse_delta("2w3d").days, 17)
+		self.assertEqual(DynamicDT.parse_delta("2 centuries").years, 200)
+		restore()
+		with self.assertRaises(ValueError):
+			DynamicDT.parse_delta("3 jiffies")
+
+	def test_lex(self):
+		tokens = lex("next full moon, 3 days before 1mo2d in twenty-one dec 2024/01/02 bce")
+		self.assertEqual([t.kind for t in tokens], ["relative", "lunar_phase", "number", "unit", "direction", "abbreviation", "direction", "number_word", "word", "date", "era"])
+		self.assertEqual(tokens[1].value, Fraction(1, 2))
+		self.assertEqual(tokens[3].value, "days")
+		self.assertEqual([t.text for t in lex("now+1h at noon", shorthands=True)], ["+1h", "at", "12PM"])
+		self.assertEqual(DynamicDT.parse_delta("1 day 2 hours after tomorrow", return_remainder=True), (TimeDelta(days=1, hours=2), "tomorrow"))
+
+	def test_match_date_words(self):
+		self.assertEqual(match_date_words(["3", "october"]), ({"month": 10, "day": 3}, None))
+		self.assertEqual(match_date_words(["december", "22nd", "at", "6:30:15.25", "pm"]), ({"month": 12, "hour": 18, "minute": 30, "second": 15, "microsecond": 250000, "day": 22}, None))
+		self.assertEqual(match_date_words(["thursday", "12AM"]), ({"hour": 0}, 3))
+		self.assertEqual(match_date_words(["25/12/2024"]), ({"year": 2024, "month": 12, "day": 25}, None))
+		self.assertIsNone(match_date_words(["12", "8"]))
+		self.assertIsNone(match_date_words(["may", "of", "12"]))
+		self.assertEqual(DynamicDT.parse("12/25/2024 6pm", timestamp=1733638407), DynamicDT.parse("2024-12-25 18:00", timestamp=1733638407))
+
 	def test_DynamicDT_parse(self):
 		dt = DynamicDT.parse("2023-01-01")
 		self.assertEqual(dt.year, 2023)
 		self.assertEqual(dt.month, 1)
 		self.assertEqual(dt.day, 1)
 
+	def test_DynamicDT_fromisoformat(self):
+		dt = DynamicDT.fromisoformat("2024-12-08T06:13:27.7125025Z")
+		self.assertEqual(dt.timestamp_exact(), Fraction(17336384077125025, 10000000))
+		for iso in ("2024-12-08T06:13:27.7125025Z", "-0300-06-09T18:00:00+5", "+1001962-12-09T01:58:59.999687929Z", "2016-10-03T00:00:00-4", "2024-12-08T06:13:27+5:30"):
+			self.assertEqual(DynamicDT.fromisoformat(iso).as_iso(), iso)
+			self.assertEqual(DynamicDT.parse(iso).parsed_as, ["iso"])
+		self.assertEqual(DynamicDT.parse("2024-12-08 06:13:27", timezone="est").as_iso(), "2024-12-08T06:13:27-5")
+		# Named zones take the offset in effect at the given wall-clock time, including DST and local mean time
+		self.assertEqual(DynamicDT.parse("2024-07-15T12:00:00", timezone="america/new_york").timestamp(), 1721059200)
+		self.assertEqual(DynamicDT.parse("2024-01-15 12:00:00", timezone="america/new_york").timestamp(), 1705338000)
+		self.assertEqual(DynamicDT.parse("2024-07-15T12:00:00.5", timezone="europe/london").timestamp_exact(), Fraction(3442082401, 2))
+		self.assertEqual(DynamicDT.parse("1850-07-15T12:00:00", timezone="america/new_york").timestamp(), -3769916640)
+		self.assertEqual(DynamicDT.parse("2024-03-10T02:30:00", timezone="america/new_york").timestamp(), 1710055800)
+		self.assertEqual(DynamicDT.fromisoformat("2024-07-15T12:00:00", tz=get_timezone("asia/kolkata")).timestamp(), 1721025000)
+		self.assertEqual(list(DynamicDT.parse_many(["2024-07-15 12:00:00"], timezone="america/new_york"))[0].timestamp(), 1721059200)
+		# as_iso writes the offset in effect at the instant, so named zones round-trip in both seasons and before standard time
+		new_york = get_timezone("america/new_york")
+		for ts, iso in ((1705320000, "2024-01-15T07:00:00-5"), (1721059200, "2024-07-15T12:00:00-4"), (-3769916640, "1850-07-15T12:00:00-4:56")):
+			dt = DynamicDT.fromtimestamp(ts, tz=new_york)
+			self.assertEqual(dt.as_iso(), iso)
+			self.assertEqual(DynamicDT.fromisoformat(iso).timestamp(), ts)
+		self.assertEqual(DynamicDT.parse("1850-07-15T12:00:00", timezone="europe/london").as_iso(), "1850-07-15T12:00:00-0:01")
+		with self.assertRaises(ValueError):
+			DynamicDT.fromisoformat("next friday")
+
+	def test_DynamicDT_parse_many(self):
+		ts = 1733638407
+		strings = ["tomorrow", "not a date at all", "2020", "in 2 hours"]
+		failures = []
+		results = list(DynamicDT.parse_many(strings, timestamp=ts, timezone="est", errors="none", failures=failures))
+		self.assertEqual(results[0], DynamicDT.parse("tomorrow", timestamp=ts, timezone="est"))
+		self.assertIsNone(results[1])
+		self.assertEqual(results[3], DynamicDT.parse("in 2 hours", timestamp=ts, timezone="est"))
+		self.assertEqual([f[:2] for f in failures], [(1, "not a date at all")])
+		self.assertEqual(len(list(DynamicDT.parse_many(strings, timestamp=ts, errors="skip"))), 3)
+		with self.assertRaises(ValueError):
+			list(DynamicDT.parse_many(strings, timestamp=ts))
+
+	def test_DynamicDT_parse_parallel(self):
+		ts = 1733638407
+		strings = ["tomorrow", "not a date at all", "300-06-09 bce 6pm aqtt", "in 2 hours utc-1:30"] * 3
+		failures = []
+		results = list(DynamicDT.parse_parallel(strings, workers=2, chunksize=5, timestamp=ts, errors="none", failures=failures))
+		expected = list(DynamicDT.parse_many(strings, timestamp=ts, errors="none"))
+		self.assertEqual([r and r.as_time() for r in results], [r and r.as_time() for r in expected])
+		self.assertEqual([f[0] for f in failures], [1, 5, 9])
+
+	def test_DynamicDTArray(self):
+		values = [DynamicDT(2023, 1, 2, fraction=Fraction(1, 3)), DynamicDT(-500, 6, 1), DynamicDT(123456789, 5, 11, tzinfo=get_timezone("est"))]
+		backends = ["python"] + (["numpy"] if get_numpy() else [])
+		for backend in backends:
+			arr = DynamicDTArray.from_datetimes(values, backend=backend)
+			self.assertEqual(len(arr), 3)
+			self.assertEqual(arr[1], values[1])
+			self.assertEqual(arr[2].tzinfo, values[2].tzinfo)
+			self.assertEqual(arr[0].fraction, Fraction(333333333, 10 ** 9))
+			self.assertEqual(list(arr.argsort()), [1, 0, 2])
+			self.assertEqual([dt.year for dt in arr.sort()], [-500, 2023, 123456789])
+			shifted = arr + TimeDelta(days=1, fraction=Fraction(1, 2))
+			self.assertEqual(shifted[1].as_time(), "0500-06-02 00:00:00.5 BCE")
+			self.assertEqual(list(shifted - TimeDelta(days=1, fraction=Fraction(1, 2)) == arr), [True] * 3)
+			self.assertEqual((arr + TimeDelta(months=1))[0].month, 2)
+			self.assertEqual(list(arr < values[0]), [False, True, False])
+			self.assertEqual(len(arr[1:]), 2)
+			self.assertEqual([int(x) for x in arr.utc_offsets()], [0, 0, -18000])
+
+	def test_TimeDeltaArray(self):
+		starts = [DynamicDT(2023, 1, 1), DynamicDT(2023, 1, 2, fraction=Fraction(1, 4)), DynamicDT(2023, 3, 1)]
+		ends = [DynamicDT(2023, 1, 1, 1), DynamicDT(2023, 1, 1), DynamicDT(2023, 3, 1, 0, 0, 30)]
+		backends = ["python"] + (["numpy"] if get_numpy() else [])
+		for backend in backends:
+			arr = TimeDeltaArray.between(starts, ends, backend=backend)
+			self.assertEqual(arr.to_short(), ["1h", "-1d0.2s", "30s"])
+			self.assertEqual(list(arr.total_seconds()), [3600, -86400.25, 30])
+			self.assertEqual(arr.max().hours, 1)
+			self.assertEqual(arr.min().to_short(), "-1d0.2s")
+			self.assertEqual(arr.sum().to_string(), "-22 hours -59 minutes -30.25 seconds")
+			self.assertEqual((-arr)[0].hours, -1)
+			self.assertEqual((arr + TimeDelta(months=1)).to_short()[2], "1mo30s")
+			self.assertEqual((arr - arr).to_short(), ["0s"] * 3)
+
+	def test_ParseCache(self):
+		ts = 1733638407
+		expected = DynamicDT.parse("next friday 6pm est", timestamp=ts)
+		PARSE_CACHE.resize(1).clear()
+		try:
+			self.assertEqual(DynamicDT.parse("Next Friday  6pm EST", timestamp=ts), expected)
+			self.assertEqual(DynamicDT.parse("next friday 6pm est", timestamp=ts), expected)
+			self.assertEqual(DynamicDT.parse("next friday 6pm est", timestamp=ts + 604800), expected + 604800)
+			DynamicDT.parse("tomorrow", timestamp=ts)
+			self.assertEqual(PARSE_CACHE.info(), dict(hits=2, misses=2, evictions=1, size=1, maxsize=1))
+		finally:
+			PARSE_CACHE.resize(0).clear()
+
+	def test_ParseProfiler(self):
+		import dynamic_dt
+		with ParseProfiler() as profiler:
+			self.assertIs(dynamic_dt.PARSE_PROFILER, profiler)
+			DynamicDT.parse("next friday 6pm est", timestamp=1733638407)
+			DynamicDT.parse("2024-12-08T06:13:27Z")
+		self.assertIsNone(dynamic_dt.PARSE_PROFILER)
+		stats = profiler.histograms()
+		self.assertEqual(stats["parse"]["count"], 2)
+		self.assertEqual(stats["iso"]["count"], 2)
+		for stage in ("plan", "lex", "lunar", "keywords", "timezone", "delta", "number_words", "value", "reference", "relative", "offset"):
+			self.assertEqual(stats[stage]["count"], 1, stage)
+		self.assertEqual(sum(n for _, n in stats["parse"]["histogram"]), 2)
+		self.assertLessEqual(stats["plan"]["total_ns"], stats["parse"]["total_ns"])
+		self.assertIn("number_words", profiler.report())
+		# Common forms never reach dateutil
+		self.assertNotIn("dateutil", stats)
+		DynamicDT.parse("tomorrow", timestamp=1733638407)
+		self.assertEqual(profiler.histograms()["parse"]["count"], 2)
+		with profiler:
+			DynamicDT.parse("3 october 2016", timestamp=1733638407)
+		self.assertNotIn("dateutil", profiler.histograms())
+
+	def test_codec(self):
+		values = [
+			DynamicDT.parse("2024-12-08T06:13:27.7125025Z"), DynamicDT.parse("300-06-09 bce 6pm aqtt", timestamp=1733638407), DynamicDT.parse("-123456789/05/11"),
+			DynamicDT.parse("1 yoctosecond from now", timestamp=1733638407), DynamicDT.fromtimestamp(12.5), TimeDelta(years=1.5, seconds=-3), FrozenTimeDelta(days=2),
+		]
+		for value in values:
+			data = value.to_bytes()
+			self.assertLess(len(data), 32)
+			decoded = value.__class__.from_bytes(memoryview(data))
+			self.assertIs(decoded.__class__, value.__class__)
+			self.assertEqual(decoded, value)
+			if isinstance(value, DynamicDT):
+				self.assertEqual(repr(decoded), repr(value))
+			else:
+				self.assertEqual(decoded._values(), value._values())
+		data = dumps_many(values * 3)
+		self.assertEqual(loads_many(memoryview(bytearray(data))), values * 3)
+		nano = NanoDT.parse("1984-12-08T06:13:27.7125025Z")
+		self.assertEqual(NanoDT.from_bytes(nano.to_bytes()).timestamp_ticks(), nano.timestamp_ticks())
+		with self.assertRaises(TypeError):
+			DynamicDT.from_bytes(TimeDelta(days=1).to_bytes())
+		with self.assertRaises(ValueError):
+			DynamicDT.from_bytes(data)
+
+	def test_Timeline(self):
+		times = [DynamicDT.parse(s) for s in ("-123456789/05/11", "300-06-09 bce", "2024-12-08T06:13:27.7125025Z", "2024-12-08T06:13:27.7125026Z", "99999-01-01")]
+		with tempfile.TemporaryDirectory() as tmp:
+			path = os.path.join(tmp, "events.ddtl")
+			with Timeline(path, value_size=2) as timeline:
+				for i, dt in enumerate(times):
+					timeline.append(dt, bytes([i]))
+				with self.assertRaises(ValueError):
+					timeline.append(times[0])
+				self.assertEqual([dt for dt, _ in timeline], times)
+			with Timeline(path) as timeline:
+				self.assertEqual(len(timeline), 5)
+				self.assertEqual(timeline.value_size, 2)
+				self.assertEqual(timeline[-1], (times[-1], b"\x04\x00"))
+				self.assertEqual([dt for dt, _ in timeline.range(DynamicDT.parse("0001-01-01"), times[3])], times[2:3])
+				self.assertEqual(timeline.bisect(times[2], right=True), 3)
+			# Invalid headers raise ValueError without leaking the file handle
+			for header in (b"DDT", b"NOPE\0\1\0\2", b"DDTL\0\x09\0\2"):
+				with open(path, "wb") as f:
+					f.write(header)
+				with warnings.catch_warnings(record=True) as caught:
+					warnings.simplefilter("always", ResourceWarning)
+					with self.assertRaises(ValueError):
+						Timeline(path)
+					gc.collect()
+				self.assertEqual([w for w in caught if issubclass(w.category, ResourceWarning)], [])
+
+	def test_IntervalIndex(self):
+		t = [DynamicDT.parse(s) for s in ("-123456789/05/11", "300-06-09 bce", "2024-12-08T06:13:27.7125025Z", "2024-12-08T06:13:27.7125026Z", "99999-01-01")]
+		index = IntervalIndex([(t[0], t[4], "all"), (t[1], t[2], "bce"), (t[2], t[3], "tiny")], block_size=2)
+		index.add(t[2], t[2], "empty")
+		index.add(t[3], t[4], "future")
+		self.assertEqual([v for _, _, v in index.at(t[2])], ["all", "tiny"])
+		self.assertEqual([v for _, _, v in index.at(t[3])], ["all", "future"])
+		self.assertEqual(sorted(v for _, _, v in index.overlap(t[1], t[2])), ["all", "bce"])
+		self.assertEqual(sorted(v for _, _, v in index.overlap(t[2], t[3])), ["all", "tiny"])
+		index.remove(t[0], t[4], "all")
+		with self.assertRaises(ValueError):
+			index.remove(t[0], t[4], "all")
+		self.assertEqual(len(index), 4)
+		self.assertEqual([v for _, _, v in index.at(t[0])], [])
+		with self.assertRaises(ValueError):
+			index.add(t[1], t[0])
+		# Queries agree with a linear search as blocks split and empty, with long intervals hidden among short ones
+		base = DynamicDT.fromtimestamp(1733638407)
+		intervals = [(i * 10, i * 10 + (5000 if i % 37 == 0 else 3)) for i in range(400)]
+		index = IntervalIndex([(base + a, base + b, (a, b)) for a, b in intervals[::2]], block_size=4)
+		for a, b in intervals[1::2]:
+			index.add(base + a, base + b, (a, b))
+		removed = set(intervals[::3] + intervals[100:140])
+		for a, b in removed:
+			index.remove(base + a, base + b, (a, b))
+		remaining = [iv for iv in intervals if iv not in removed]
+		self.assertEqual(len(index), len(remaining))
+		for x in range(-5, 4100, 7):
+			self.assertEqual([v for _, _, v in index.at(base + x)], sorted(iv for iv in remaining if iv[0] <= x < iv[1]))
+			self.assertEqual([v for _, _, v in index.overlap(base + x, base + x + 25)], sorted(iv for iv in remaining if iv[0] < x + 25 and x < iv[1]))
+
+	def test_RRule(self):
+		start = DynamicDT.parse("2024-01-01 00:00", timezone="America/New_York")
+		rule = RRule("weekly", start=start, byweekday="thursday", byhour=18, byminute=0, bysecond=0)
+		times = list(itertools.islice(rule, 20))
+		self.assertEqual(times[0], DynamicDT.parse("2024-01-04 18:00 est"))
+		self.assertEqual({(dt.weekday(), dt.hour, dt.minute) for dt in times}, {(3, 18, 0)})
+		# 18:00 on both sides of the March daylight saving change
+		self.assertEqual(times[10] - times[9], TimeDelta(days=7, hours=-1))
+		mid = times[12] + TimeDelta(hours=1)
+		self.assertEqual(rule.after(mid), times[13])
+		self.assertEqual(rule.after(times[12], inclusive=True), times[12])
+		self.assertEqual(list(rule.between(times[3], times[6])), times[3:6])
+		counted = RRule("monthly", start=DynamicDT.parse("2024-01-31 12:00 utc"), bymonthday=-1, count=3)
+		self.assertEqual([dt.as_iso() for dt in counted], ["2024-01-31T12:00:00Z", "2024-02-29T12:00:00Z", "2024-03-31T12:00:00Z"])
+		until = RRule("secondly", start=DynamicDT.parse("2024-03-28 16:35:32 utc"), bymonth=2, until=DynamicDT.parse("2025-02-01 00:00:02 utc"))
+		self.assertEqual(len(list(until)), 3)
+		self.assertEqual(list(RRule("yearly", start=start, bymonth=2, bymonthday=31)), [])
+		# 02:00 does not exist on 2024-03-10 in New York; it falls on 03:00, which is produced only once
+		hourly = list(RRule("hourly", start=DynamicDT.parse("2024-03-09 22:00 est").cast(get_timezone("America/New_York")), count=8))
+		self.assertEqual([dt.timestamp() for dt in hourly], [1710039600, 1710043200, 1710046800, 1710050400, 1710054000, 1710057600, 1710061200, 1710064800])
+		self.assertEqual(len(set(hourly)), 8)
+		minutely = RRule("minutely", start=DynamicDT.parse("2024-03-10 01:00 est").cast(get_timezone("America/New_York")), interval=30, byhour=[1, 2, 3])
+		times = [dt.timestamp() for dt in itertools.islice(minutely, 5)]
+		self.assertEqual(times, sorted(set(times)))
+
+	def test_LunarRecurrence(self):
+		start = DynamicDT.parse("2024-12-08T06:13:27Z")
+		moons = list(itertools.islice(LunarRecurrence("full moon", start=start), 5))
+		self.assertEqual(moons[0], DynamicDT.parse("the next full moon after", timestamp=start.timestamp()))
+		for a, b in zip(moons, moons[1:]):
+			self.assertEqual(b.timestamp_exact() - a.timestamp_exact(), Fraction("29.5305888531") * 86400)
+		rule = LunarRecurrence("full moon", start=start, count=4)
+		self.assertEqual(rule.after(moons[1]), moons[2])
+		self.assertEqual(rule.after(moons[1], inclusive=True), moons[1])
+		self.assertEqual(rule.after(moons[3]), None)
+		with self.assertRaises(TypeError):
+			type("Incomplete", (Recurrence,), {})()
+
+	def test_lunar_phases(self):
+		ts = [0, -10 ** 12, 1733638407, Fraction(17336384077125025, 10 ** 7), 1733638407.5, 10 ** 15]
+		expected = [(Fraction(t) - 947182440) / 86400 / Fraction("29.5305888531") % 1 for t in ts]
+		self.assertEqual(lunar_phases(ts), expected)
+		self.assertEqual(lunar_phases([DynamicDT.fromtimestamp(t) for t in ts]), expected)
+		self.assertEqual([get_lunar_phase(NanoDT.fromtimestamp(t)) for t in ts[:4]], expected[:4])
+		for backend in ("python", "numpy"):
+			try:
+				array = DynamicDTArray.from_timestamps(ts, backend=backend)
+			except ImportError:
+				continue
+			self.assertEqual(lunar_phases(array), expected)
+			for phase, e in zip(lunar_phases(array, exact=False), expected):
+				self.assertAlmostEqual(phase, float(e), places=12)
+		start = DynamicDT.parse("2024-12-08T06:13:27Z")
+		moons = list(next_lunar_phases("full moon", start, count=3))
+		self.assertEqual(moons, list(LunarRecurrence("full moon", start=start, count=3)))
+		self.assertEqual([get_lunar_phase(dt) for dt in moons], [Fraction(1, 2)] * 3)
+		self.assertEqual(moons[0], DynamicDT.parse("the next full moon after", timestamp=start.timestamp()))
+
+	def test_scan(self):
+		ts = 1733638407
+		text = "2024-12-08T06:13:27Z start\n[08/Dec/2024:06:13:27 +0000] GET\nDec  8 06:13:27 sshd: ok <t:1733638407:F>, build 20241208 at 1733638407.5, v1.2.3 id 12345678901234\n"
+		found = list(scan([text], timestamp=ts, timezone="est"))
+		self.assertEqual([s for _, s, _ in found], ["2024-12-08T06:13:27Z", "08/Dec/2024:06:13:27 +0000", "Dec  8 06:13:27", "<t:1733638407:F>", "20241208", "1733638407.5"])
+		for offset, s, dt in found:
+			self.assertEqual(text[offset:offset + len(s)], s)
+		self.assertEqual(found[1][2], found[0][2])
+		for _, s, dt in found[2:]:
+			expected = DynamicDT.parse(s, timestamp=ts, timezone="est")
+			self.assertEqual((dt, dt.parsed_as), (expected, expected.parsed_as))
+		for chunksize in (1, 10, 1000):
+			self.assertEqual([(o, s) for o, s, _ in scan(io.StringIO(text * 5), timestamp=ts, chunksize=chunksize)], [(o, s) for o, s, _ in scan([text] * 5, timestamp=ts)])
+		with tempfile.TemporaryDirectory() as tmp:
+			path = os.path.join(tmp, "log.txt")
+			with open(path, "w") as f:
+				f.write(text * 3)
+			self.assertEqual([o for o, _, _ in scan(path, timestamp=ts)], [o + len(text) * i for i in range(3) for o, _, _ in found])
+
 if __name__ == "__main__":
 	unittest.main()
\ No newline at end of file